@@ -1,2 +1,2 @@
 # backend/app/api/routes/__init__.py
-from . import ingest, actions, chat, analyze
+from . import ingest, actions, chat, analyze, workspaces
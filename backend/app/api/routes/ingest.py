@@ -130,4 +130,37 @@ async def ingest_audio(
     # Save to history
     services["history"].save_entry("audio", res, query=f"Meeting: {file.filename}")
 
-    return res
\ No newline at end of file
+    return res
+
+
+@router.get("/jobs")
+async def list_ingestion_jobs(workspace_id: Optional[str] = None):
+    """Codebase ingestion jobs, newest first."""
+    return [job.to_dict() for job in services["jobs"].list(workspace_id)]
+
+@router.get("/jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """Status, progress (files/chunks done, throughput, ETA) and errors of an ingestion job."""
+    job = services["jobs"].get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job: {job_id}")
+    return job.to_dict()
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_ingestion_job(job_id: str):
+    """Stop an ingestion job; files stored so far stay indexed and are skipped on resume."""
+    if services["jobs"].get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job: {job_id}")
+    job = await services["jobs"].cancel(job_id)
+    return job.to_dict()
+
+@router.post("/jobs/{job_id}/resume")
+async def resume_ingestion_job(job_id: str):
+    """Run a failed, cancelled or interrupted ingestion job again from its checkpoint."""
+    if services["jobs"].get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job: {job_id}")
+    try:
+        job = services["jobs"].resume(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return job.to_dict()
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, HTTPException, Path
+from app.models.schemas import (
+    WORKSPACE_ID_PATTERN, WorkspaceConfigRequest, ProjectionRebuildRequest,
+    WorkspaceExportRequest, WorkspaceImportRequest, WorkspaceWatchRequest
+)
+
+
+# Populated by the lifespan hook in main.py
+services = {}
+
+router = APIRouter(prefix="/workspaces", tags=["workspaces"])
+
+# Workspace ids become file names: anything else is rejected with a 422
+WorkspaceId = Path(..., pattern=WORKSPACE_ID_PATTERN)
+
+@router.post("/{workspace_id}/config")
+async def configure_workspace(request: WorkspaceConfigRequest, workspace_id: str = WorkspaceId):
+    """Set per-workspace index options such as the quantization mode."""
+    options = request.model_dump(exclude_none=True)
+    try:
+        config = await services["vector_store"].configure_workspace(workspace_id, **options)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"workspace_id": workspace_id, "config": config}
+
+@router.post("/{workspace_id}/projection/rebuild")
+async def rebuild_projection(request: ProjectionRebuildRequest, workspace_id: str = WorkspaceId):
+    """Fit a new projection version and re-project stored vectors (no re-embedding)."""
+    try:
+        projection = await services["vector_store"].rebuild_projection(
+            workspace_id, dim=request.dim, method=request.method
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"workspace_id": workspace_id, "projection": projection}
+
+@router.post("/{workspace_id}/export")
+async def export_workspace(request: WorkspaceExportRequest, workspace_id: str = WorkspaceId):
+    """Write the workspace index to a single snapshot archive on the server."""
+    try:
+        snapshot = await services["vector_store"].export_workspace(workspace_id, path=request.path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"workspace_id": workspace_id, "snapshot": snapshot}
+
+@router.post("/{workspace_id}/import")
+async def import_workspace(request: WorkspaceImportRequest, workspace_id: str = WorkspaceId):
+    """Load a snapshot archive into the workspace without re-embedding."""
+    try:
+        result = await services["vector_store"].import_workspace(
+            request.path, workspace_id=workspace_id, overwrite=request.overwrite
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Snapshot not found: {request.path}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return result
+
+@router.post("/{workspace_id}/watch")
+async def watch_workspace(request: WorkspaceWatchRequest, workspace_id: str = WorkspaceId):
+    """Reindex the workspace in the background as files under ``repo_path`` change."""
+    try:
+        watcher = await services["watchers"].start(workspace_id, request.repo_path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"workspace_id": workspace_id, "watch": watcher}
+
+@router.delete("/{workspace_id}/watch")
+async def unwatch_workspace(workspace_id: str = WorkspaceId):
+    """Stop watching the workspace's repository."""
+    if not await services["watchers"].stop(workspace_id):
+        raise HTTPException(status_code=404, detail=f"Workspace {workspace_id} is not being watched")
+
+    return {"workspace_id": workspace_id, "watching": False}
@@ -19,6 +19,34 @@ class Settings(BaseSettings):
     # Vector Store
     CHROMA_PERSIST_DIR: str = "./chroma_db"
     EMBEDDING_DIM: int = 4096
+    VECTOR_BACKEND: str = "chroma"  # "chroma" or "mmap" (float16 memmap per workspace)
+    VECTOR_QUANTIZATION: str = "none"  # mmap default: "none", "int8" or "binary"
+    QUANTIZATION_RESCORE_FACTOR: int = 10  # candidates rescored per requested result
+    PROJECTION_DIM: int = 0  # mmap: reduce stored vectors to this dim (0 = keep EMBEDDING_DIM)
+    PROJECTION_METHOD: str = "pca"  # "pca" or "random" (orthogonal)
+    PROJECTION_SAMPLE_SIZE: int = 5000  # vectors sampled to fit a projection
+    LEXICAL_INDEX: bool = True  # BM25 index built at ingestion, fused into hybrid_search
+    RRF_K: int = 60  # reciprocal rank fusion constant
+    MMR_LAMBDA: float = 0.7  # hybrid_search relevance vs diversity trade-off (1.0 = relevance only)
+    MERGE_OVERLAPPING_RESULTS: bool = True  # merge hits with overlapping line ranges in one file
+    PARENT_CONTEXT_MIN_HITS: int = 2  # attach a class outline once this many of its members are hits (0 = never)
+    LLM_RERANK: bool = False  # let SambaNova re-rank contexts when local scores are ambiguous
+    LLM_RERANK_MARGIN: float = 0.02  # local score gap at the cut-off below which the LLM decides
+    CHUNK_DEDUP: bool = True  # embed/store identical chunk content once per workspace
+    FILTER_LOCAL_SCORING_LIMIT: int = 20000  # chroma: score filtered candidates locally up to this many
+    FEDERATED_SEARCH_TIMEOUT: float = 5.0  # seconds a workspace may take in a multi-workspace search
+    OPEN_HANDLES_MAX: int = 64  # open collections/stores/indexes kept per kind (LRU)
+    OPEN_HANDLES_IDLE_SECONDS: float = 900.0  # drop handles unused this long (0 = never)
+    CONVERSATION_TTL: float = 30 * 24 * 3600.0  # seconds since a session's last message before it expires (0 = never)
+    CONVERSATION_BATCH_SIZE: int = 32  # queued messages that trigger a write-behind flush
+    CONVERSATION_FLUSH_INTERVAL: float = 0.5  # seconds a queued message waits at most before flushing
+    VECTOR_STORE_WORKERS: int = 4  # threads running blocking vector-store calls
+    VECTOR_STORE_TIMEOUT: float = 30.0  # seconds awaited per read operation
+    VECTOR_STORE_WRITE_TIMEOUT: float = 600.0  # seconds awaited per upsert/rebuild
+    QUERY_CACHE_SIZE: int = 2048  # cached query embeddings (0 disables the cache)
+    QUERY_CACHE_TTL: float = 3600.0  # seconds a cached query embedding stays valid
+    QUERY_CACHE_PERSIST: bool = False  # save the cache under CHROMA_PERSIST_DIR on shutdown
+    SNAPSHOT_DIR: str = ""  # workspace export/import archives stay under this directory ("" = CHROMA_PERSIST_DIR/snapshots)
     
     # Audio (Whisper local or API)
     WHISPER_MODEL: str = "base"  # Local fallback
@@ -26,6 +54,20 @@ class Settings(BaseSettings):
     
     # Code Processing
     MAX_FILE_SIZE: int = 1024 * 1024  # 1MB
+    INGEST_WORKERS: int = 0  # parser processes for repository ingestion (0 = one per CPU)
+    INGEST_READ_CONCURRENCY: int = 8  # files read/hashed concurrently (threads)
+    INGEST_EMBED_CONCURRENCY: int = 4  # chunk batches embedded concurrently
+    INGEST_STORE_CONCURRENCY: int = 1  # batches upserted concurrently (1 keeps deletes and upserts in order)
+    INGEST_EMBED_BATCH: int = 100  # chunks per embed/upsert batch
+    INGEST_QUEUE_SIZE: int = 256  # capacity of each queue between ingestion stages
+    INGEST_CHECKPOINT_INTERVAL: float = 5.0  # seconds between manifest checkpoints during an ingestion (0 = only at the end)
+    INGEST_RESUME_ON_STARTUP: bool = True  # resume ingestion jobs interrupted by a shutdown or crash
+    INGEST_JOB_HISTORY: int = 200  # finished ingestion jobs kept (in memory and on disk)
+    INGEST_STATUS_MIN_INTERVAL: float = 0.25  # shortest interval between WebSocket ingest_progress messages (seconds)
+    WATCH_DEBOUNCE: float = 1.0  # quiet seconds before a burst of file changes is reindexed
+    WATCH_MAX_DELAY: float = 10.0  # reindex at most this long after the first change, even while changes keep coming
+    WATCH_POLL_INTERVAL: float = 2.0  # seconds between scans when polling (no inotify)
+    WATCH_FORCE_POLLING: bool = False  # poll even where inotify is available (e.g. network or container mounts)
     SUPPORTED_EXTENSIONS: set = {
         '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.go', 
         '.rs', '.cpp', '.c', '.h', '.rb', '.php', '.swift',
@@ -1,24 +1,33 @@
 # backend/app/main.py
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, Depends, BackgroundTasks, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, Depends, HTTPException
 import uuid
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import asyncio
 import json
-from typing import Optional
+from collections import defaultdict
+from typing import Dict, Optional, Set
 
 from app.config import get_settings
 from app.services.sambanova_client import SambaNovaOrchestrator
 from app.services.ingestion.audio_processor import AudioProcessor
 from app.services.ingestion.vision_processor import VisionProcessor
 from app.services.ingestion.code_ingester import CodeIngester
+from app.services.ingestion.git_source import GitChangeSet, GitError, GitRepository
+from app.services.ingestion.jobs import IngestionJob, JobManager
+from app.services.ingestion.manifest import IngestionManifest
 from app.services.memory.vector_store import CodebaseVectorStore
+from app.services.memory.conversation_store import ConversationStore
+from app.services.ingestion.pipeline import ChangeSet, IngestionPipeline, pipeline_metrics
+from app.services.ingestion.watcher import PathChangeSet, WatchManager
+from app.services.memory.store_executor import get_store_executor
+from app.services.memory.embedding_cache import get_query_embedding_cache
 from app.services.history_manager import HistoryManager
 from app.models.schemas import (
     AnalysisRequest, AnalysisResponse, SuggestedAction,
     IngestedContext, IngestionType, CodebaseIngestRequest
 )
-from app.api.routes import ingest, actions
+from app.api.routes import ingest, actions, workspaces
 
 
 # Global service instances
@@ -39,16 +48,28 @@ async def lifespan(app: FastAPI):
     # Vector DB
     vector_store = CodebaseVectorStore()
     services["vector_store"] = vector_store
+    services["conversation_store"] = ConversationStore()
     
     # Ingester
     services["ingester"] = CodeIngester()
+    services["watchers"] = WatchManager(_reindex_changed_paths, services["ingester"].walker)
+    services["jobs"] = JobManager(settings.CHROMA_PERSIST_DIR + "/jobs", _run_ingestion_job)
+    services["jobs"].recover()
     
     # Register services with routes
     ingest.services = services
     actions.services = services
+    workspaces.services = services
     
     print("✅ [Core] All services initialized")
     yield
+    await services["jobs"].shutdown()
+    await services["watchers"].stop_all()
+    await services["conversation_store"].close()
+    services["ingester"].close()
+    get_query_embedding_cache().save()
+    get_store_executor().shutdown(wait=True)
+    get_store_executor.cache_clear()
     print("👋 [Core] Cleanup complete")
 
 
@@ -65,6 +86,7 @@ app.add_middleware(
 
 app.include_router(ingest.router)
 app.include_router(actions.router)
+app.include_router(workspaces.router)
 
 @app.get("/history")
 async def get_history():
@@ -78,43 +100,87 @@ async def clear_history():
     return {"status": "cleared"}
 
 @app.post("/ingest/codebase")
-async def ingest_codebase(
-    request: CodebaseIngestRequest,
-    background_tasks: BackgroundTasks
-):
-    """Trigger async codebase ingestion."""
-    background_tasks.add_task(
-        _ingest_codebase_task,
-        request.repo_path,
-        request.workspace_id
-    )
-    
+async def ingest_codebase(request: CodebaseIngestRequest):
+    """Start a codebase ingestion job; follow it at ``/ingest/jobs/{job_id}``."""
+    options = {}
+    if request.git or request.from_commit or request.to_commit:
+        manifest = IngestionManifest(str(services["vector_store"].manifest_path(request.workspace_id)))
+        from_commit = request.from_commit
+        if from_commit is None and request.to_commit is not None:
+            from_commit = manifest.commit
+            if from_commit is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="from_commit is required: the workspace was not ingested at a known commit"
+                )
+        repo = GitRepository(request.repo_path)
+        try:
+            # Fail fast on a non-repository or an unknown revision; pin revisions so a resume is identical
+            options = {"git": True, "from_commit": None, "to_commit": None}
+            if from_commit is not None:
+                options["from_commit"] = await asyncio.to_thread(repo.resolve, from_commit)
+                options["to_commit"] = await asyncio.to_thread(repo.resolve, request.to_commit or "HEAD")
+            else:
+                await asyncio.to_thread(repo.resolve, "HEAD")
+        except GitError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    job = services["jobs"].submit(request.workspace_id, request.repo_path, options)
     return {
-        "status": "processing",
+        "status": job.status,
+        "job_id": job.id,
         "workspace_id": request.workspace_id,
+        "mode": "walk" if not options else ("git-commits" if options["from_commit"] else "git-index"),
         "message": "Codebase ingestion started in background"
     }
 
 
-async def _ingest_codebase_task(repo_path: str, workspace_id: str):
-    """Background task for codebase ingestion."""
-    chunks = []
-    
-    async for chunk in services["ingester"].ingest_repository(repo_path):
-        if chunk.get("type") == "error":
-            continue
-        chunks.append(chunk)
-        
-        # Batch process every 100 chunks
-        if len(chunks) >= 100:
-            await services["vector_store"].ingest_code_chunks(workspace_id, chunks)
-            chunks = []
-    
-    # Process remaining
-    if chunks:
-        await services["vector_store"].ingest_code_chunks(workspace_id, chunks)
-    
-    print(f"✅ Completed ingestion for workspace {workspace_id}")
+# One ingestion per workspace at a time: each loads, updates and saves its manifest
+_ingest_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+async def _ingest_codebase_task(
+    repo_path: str,
+    workspace_id: str,
+    changes: Optional[ChangeSet] = None,
+    background: bool = False,
+    job: Optional[IngestionJob] = None
+):
+    """
+    Background task for codebase ingestion.
+    Incremental: the workspace manifest lets unchanged files be skipped,
+    and chunks of changed or removed files are deleted. Runs as a staged
+    pipeline (discover → read → parse → embed → store), see ``IngestionPipeline``.
+    With ``changes``, only files whose git blob changed are read (see ``GitChangeSet``).
+    The manifest is saved even when the ingestion fails or is cancelled:
+    it only lists stored chunks, so running again resumes.
+    """
+    async with _ingest_locks[workspace_id]:
+        vector_store = services["vector_store"]
+        manifest = IngestionManifest(str(vector_store.manifest_path(workspace_id)))
+        pipeline = IngestionPipeline(vector_store, services["ingester"], workspace_id, manifest, background)
+        if job is not None:
+            job.pipeline = pipeline
+            pipeline.on_checkpoint = lambda: services["jobs"].checkpoint(job)
+        try:
+            summary = await pipeline.run(repo_path, changes)
+        finally:
+            manifest.save()
+
+    print(f"✅ Completed ingestion for workspace {workspace_id}: {json.dumps(summary)}")
+    return summary
+
+
+async def _run_ingestion_job(job: IngestionJob):
+    changes = None
+    if job.options.get("git"):
+        changes = GitChangeSet(job.repo_path, job.options.get("from_commit"), job.options.get("to_commit"))
+    return await _ingest_codebase_task(job.repo_path, job.workspace_id, changes, job=job)
+
+
+async def _reindex_changed_paths(workspace_id: str, repo_path: str, paths: Set[str]):
+    """Watcher callback: re-chunk the changed files at background priority."""
+    return await _ingest_codebase_task(repo_path, workspace_id, PathChangeSet(repo_path, paths), background=True)
 
 
 # ═════════════════════════════════════════════════════════════════
@@ -132,7 +198,7 @@ async def analyze(request: AnalysisRequest, workspace_id: str = "default"):
     # Ensure at least 1 result is requested to avoid ChromaDB error
     top_k_value = 10 if request.include_codebase else 1
     contexts = await services["vector_store"].hybrid_search(
-    workspace_id=workspace_id,
+    workspace_id=request.workspace_ids or workspace_id,
     query=request.query,
     code_location=request.code_location,
     top_k=top_k_value
@@ -274,7 +340,17 @@ async def analyze(request: AnalysisRequest, workspace_id: str = "default"):
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket for real-time streaming analysis."""
     await websocket.accept()
-    
+    # Ingestion jobs streamed to this client, followed alongside the receive loop
+    followers: Dict[str, asyncio.Task] = {}
+
+    async def follow_job(job_id: str, interval: float):
+        try:
+            async for snapshot in services["jobs"].follow(job_id, interval=interval):
+                await websocket.send_json({"type": "ingest_progress", "job": snapshot})
+        finally:
+            if followers.get(job_id) is asyncio.current_task():
+                del followers[job_id]
+
     try:
         while True:
             # Receive message
@@ -292,7 +368,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 
                 # Get context
                 contexts = await services["vector_store"].hybrid_search(
-                    workspace_id=workspace_id,
+                    workspace_id=request.workspace_ids or workspace_id,
                     query=request.query,
                     code_location=request.code_location,
                     top_k=10
@@ -335,13 +411,33 @@ async def websocket_endpoint(websocket: WebSocket):
                     "actions": []  # Simplified for streaming
                 })
                 
+            elif data.get("type") == "ingest_status":
+                # Follow an ingestion job until it finishes
+                job_id = data.get("job_id")
+                if services["jobs"].get(job_id) is None:
+                    await websocket.send_json({"type": "error", "content": f"Unknown ingestion job: {job_id}"})
+                    continue
+                interval = max(float(data.get("interval", 1.0)), get_settings().INGEST_STATUS_MIN_INTERVAL)
+                if job_id in followers:
+                    followers[job_id].cancel()
+                followers[job_id] = asyncio.create_task(follow_job(job_id, interval))
+
+            elif data.get("type") == "ingest_cancel":
+                job_id = data.get("job_id")
+                if services["jobs"].get(job_id) is None:
+                    await websocket.send_json({"type": "error", "content": f"Unknown ingestion job: {job_id}"})
+                    continue
+                job = await services["jobs"].cancel(job_id)
+                await websocket.send_json({"type": "ingest_progress", "job": job.to_dict()})
+
             elif data.get("type") == "agent_loop":
                 # Advanced autonomous mode
                 result = await services["sambanova"].agent_loop(
                     initial_query=data["query"],
-                    context_retriever=lambda q: services["vector_store"].search(
+                    context_retriever=lambda queries: services["vector_store"].search_many(
                         workspace_id=data.get("workspace_id", "default"),
-                        query=q
+                        queries=queries,
+                        dedupe=True
                     ),
                     action_executor=lambda a: {"status": "simulated", "action": a}
                 )
@@ -359,6 +455,9 @@ async def websocket_endpoint(websocket: WebSocket):
             "content": str(e)
         })
         print(f"WS Error: {e}")
+    finally:
+        for task in followers.values():
+            task.cancel()
 
 
 # ═════════════════════════════════════════════════════════════════
@@ -377,6 +476,19 @@ async def health():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics for the storage layer."""
+    return {
+        "vector_store_executor": get_store_executor().metrics(),
+        "query_embedding_cache": get_query_embedding_cache().stats(),
+        "chunk_dedupe": services["vector_store"].dedupe_metrics() if "vector_store" in services else {},
+        "open_handles": services["vector_store"].handle_stats() if "vector_store" in services else {},
+        "ingestion": pipeline_metrics(),
+        "watch": services["watchers"].metrics() if "watchers" in services else {}
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
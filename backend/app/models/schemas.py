@@ -6,6 +6,10 @@ import uuid
 from enum import Enum
 
 
+# Workspace ids name files and directories on the server
+WORKSPACE_ID_PATTERN = r"^[A-Za-z0-9_-]+$"
+
+
 class IngestionType(str, Enum):
     SCREENSHOT = "screenshot"
     AUDIO = "audio"
@@ -38,7 +42,30 @@ class IngestedContext(BaseModel):
 
 class CodebaseIngestRequest(BaseModel):
     repo_path: str
-    workspace_id: str = "default"
+    workspace_id: str = Field("default", pattern=WORKSPACE_ID_PATTERN)
+    git: bool = False                   # List changes with git (blob ids) instead of walking the tree
+    from_commit: Optional[str] = None   # Delta from this commit (default: the one last ingested, if to_commit is set)
+    to_commit: Optional[str] = None     # ... to this one (default HEAD); read from git objects
+
+class WorkspaceConfigRequest(BaseModel):
+    quantization: Optional[Literal["none", "int8", "binary"]] = None
+    rescore_factor: Optional[int] = Field(default=None, ge=1)
+    projection_dim: Optional[int] = Field(default=None, ge=0)
+    projection_method: Optional[Literal["pca", "random"]] = None
+
+class ProjectionRebuildRequest(BaseModel):
+    dim: Optional[int] = Field(default=None, ge=1)
+    method: Optional[Literal["pca", "random"]] = None
+
+class WorkspaceExportRequest(BaseModel):
+    path: Optional[str] = None      # Archive path within SNAPSHOT_DIR (default <workspace_id>.cvsnap)
+
+class WorkspaceImportRequest(BaseModel):
+    path: str                       # Archive path within SNAPSHOT_DIR
+    overwrite: bool = False
+
+class WorkspaceWatchRequest(BaseModel):
+    repo_path: str
 
 class AnalysisRequest(BaseModel):
     query: str
@@ -46,6 +73,7 @@ class AnalysisRequest(BaseModel):
     analysis_type: AnalysisType
     code_location: Optional[CodeLocation] = None
     include_codebase: bool = True
+    workspace_ids: List[str] = []   # Search several workspaces together (overrides workspace_id)
     stream: bool = False
 
 class SuggestedAction(BaseModel):
@@ -1,8 +1,10 @@
 # backend/app/services/analysis/context_engine.py
 from typing import List, Dict, Any, Optional
-import asyncio
+from collections import OrderedDict
 import json
 from app.services.memory.vector_store import CodebaseVectorStore
+from app.services.analysis.reranker import LocalReranker
+from app.services.analysis.history_cache import HistoryEmbeddingCache
 from app.services.sambanova_client import SambaNovaOrchestrator
 from app.config import get_settings
 
@@ -12,10 +14,17 @@ class ContextEngine:
     Combines vector search with recent conversations and user-provided hints.
     """
 
+    LLM_RERANK_CACHE_SIZE = 256
+    HISTORY_CACHE_SESSIONS = 128
+
     def __init__(self):
         self.settings = get_settings()
         self.sambanova = SambaNovaOrchestrator()
         self.vector_store = CodebaseVectorStore()
+        self.reranker = LocalReranker()
+        # (query, analysis type, candidate ids) → LLM-ranked candidate ids
+        self._llm_rerank_cache: "OrderedDict[tuple, List[str]]" = OrderedDict()
+        self.history_cache = HistoryEmbeddingCache(self.HISTORY_CACHE_SESSIONS)
 
     async def retrieve_context(
         self,
@@ -24,10 +33,13 @@ class ContextEngine:
         analysis_type: str,
         code_location: Optional[Dict[str, Any]] = None,
         conversation_history: Optional[List[Dict[str, str]]] = None,
-        max_contexts: int = 10
+        max_contexts: int = 10,
+        session_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve and rank relevant contexts from multiple sources.
+        ``session_id`` keys the conversation embedding cache (default: the
+        first message of ``conversation_history``).
         """
         # 1. Semantic search from vector store
         code_contexts = await self.vector_store.hybrid_search(
@@ -41,60 +53,89 @@ class ContextEngine:
         conversation_contexts = []
         if conversation_history:
             conversation_contexts = await self._extract_relevant_conversations(
-                query, conversation_history
+                query, conversation_history, session_id
             )
 
         # 3. Combine and re-rank
         all_contexts = code_contexts + conversation_contexts
 
-        # Re-rank with SambaNova for relevance
-        reranked = await self._rerank_contexts(query, all_contexts, analysis_type)
+        # Re-rank locally (SambaNova only breaks ambiguous cut-offs, if enabled)
+        reranked = await self._rerank_contexts(
+            query, all_contexts, analysis_type, code_location, max_contexts
+        )
 
         return reranked[:max_contexts]
 
     async def _extract_relevant_conversations(
         self,
         query: str,
-        history: List[Dict[str, str]]
+        history: List[Dict[str, str]],
+        session_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Embed and search within recent conversation history.
+        Only messages the session's cache has not seen are embedded, in the
+        same request as the query.
         """
-        # Simple embedding-based search
-        history_embeddings = await asyncio.gather(*[
-            self.sambanova.create_embedding(msg["content"])
-            for msg in history
-        ])
+        if not history:
+            return []
+        session_id = session_id or "history:" + self.history_cache.message_key(history[0]["content"])
+        contents = [msg["content"] for msg in history]
 
-        query_embedding = await self.sambanova.create_embedding(query)
-
-        # Compute cosine similarities
-        from sklearn.metrics.pairwise import cosine_similarity
-        similarities = cosine_similarity([query_embedding], history_embeddings)[0]
+        new_contents = self.history_cache.missing(session_id, contents)
+        embeddings = await self.sambanova.create_embeddings(new_contents + [query])
+        self.history_cache.add(session_id, new_contents, embeddings[:-1])
 
         # Select top 3
-        top_indices = similarities.argsort()[-3:][::-1]
+        top_indices, similarities = self.history_cache.top_k(session_id, contents, embeddings[-1], 3)
         return [
             {
                 "id": f"conv_{i}",
                 "content": history[i]["content"],
                 "metadata": {"type": "conversation", "role": history[i]["role"]},
-                "score": similarities[i]
+                "score": float(score)
             }
-            for i in top_indices if similarities[i] > 0.7
+            for i, score in zip(top_indices, similarities) if score > 0.7
         ]
 
     async def _rerank_contexts(
+        self,
+        query: str,
+        contexts: List[Dict[str, Any]],
+        analysis_type: str,
+        code_location: Optional[Dict[str, Any]] = None,
+        max_contexts: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank contexts with the local scorer. With ``LLM_RERANK`` enabled,
+        SambaNova re-ranks only when the local scores cannot separate the
+        contexts that make the ``max_contexts`` cut from those that do not.
+        """
+        ranked, scores = self.reranker.rank(query, contexts, code_location)
+        for ctx, score in zip(ranked, scores):
+            ctx["rerank_score"] = float(score)
+
+        if not self.settings.LLM_RERANK or len(ranked) <= max_contexts:
+            return ranked
+        if scores[max_contexts - 1] - scores[max_contexts] >= self.settings.LLM_RERANK_MARGIN:
+            return ranked
+        return await self._llm_rerank(query, ranked, analysis_type)
+
+    async def _llm_rerank(
         self,
         query: str,
         contexts: List[Dict[str, Any]],
         analysis_type: str
     ) -> List[Dict[str, Any]]:
         """
-        Use SambaNova to re-rank contexts for better precision.
+        Use SambaNova to re-rank contexts, cached per (query, candidate set).
+        Falls back to the given order if the response cannot be parsed.
         """
-        if len(contexts) <= 5:
-            return contexts  # No need for small sets
+        key = (query, analysis_type, tuple(sorted(str(ctx.get("id")) for ctx in contexts)))
+        by_id = {str(ctx.get("id")): ctx for ctx in contexts}
+        if key in self._llm_rerank_cache:
+            self._llm_rerank_cache.move_to_end(key)
+            return [by_id[i] for i in self._llm_rerank_cache[key]]
 
         # Format for model
         system_prompt = f"""You are a context relevance ranker for {analysis_type} tasks.
@@ -117,7 +158,18 @@ Output only a JSON array of indices in descending relevance order."""
 
         try:
             ranked_indices = json.loads(response.choices[0].message.content)
-            return [contexts[i] for i in ranked_indices if i < len(contexts)]
-        except Exception:
-            # Fallback to original order
-            return sorted(contexts, key=lambda x: x.get("score", 0), reverse=True)
\ No newline at end of file
+            order = list(dict.fromkeys(
+                i for i in ranked_indices if isinstance(i, int) and 0 <= i < len(contexts)
+            ))
+        except (json.JSONDecodeError, TypeError) as e:
+            print(f"⚠️ [ContextEngine] Unparsable LLM rerank, keeping local order: {e}")
+            return contexts
+
+        # Contexts the model left out keep their local order at the end
+        seen = set(order)
+        order += [i for i in range(len(contexts)) if i not in seen]
+        reranked = [contexts[i] for i in order]
+        self._llm_rerank_cache[key] = [str(ctx.get("id")) for ctx in reranked]
+        while len(self._llm_rerank_cache) > self.LLM_RERANK_CACHE_SIZE:
+            self._llm_rerank_cache.popitem(last=False)
+        return reranked
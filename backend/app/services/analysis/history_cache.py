@@ -0,0 +1,92 @@
+# backend/app/services/analysis/history_cache.py
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class _SessionEmbeddings:
+    """Unit-normalised message embeddings of one session in a growing matrix."""
+
+    INITIAL_ROWS = 64
+
+    def __init__(self):
+        self.matrix: Optional[np.ndarray] = None
+        self.rows = 0
+        self.row_of: Dict[str, int] = {}
+
+    def append(self, keys: List[str], embeddings: List[List[float]]):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms > 0, norms, 1.0)
+        if self.matrix is None:
+            self.matrix = np.empty((max(self.INITIAL_ROWS, len(keys)), vectors.shape[1]), dtype=np.float32)
+        if self.rows + len(keys) > len(self.matrix):
+            # Grow by doubling so appends stay amortised O(1) per row
+            capacity = max(2 * len(self.matrix), self.rows + len(keys))
+            grown = np.empty((capacity, self.matrix.shape[1]), dtype=np.float32)
+            grown[:self.rows] = self.matrix[:self.rows]
+            self.matrix = grown
+        self.matrix[self.rows:self.rows + len(keys)] = vectors
+        for i, key in enumerate(keys):
+            self.row_of[key] = self.rows + i
+        self.rows += len(keys)
+
+
+class HistoryEmbeddingCache:
+    """
+    Per-session cache of conversation message embeddings, so a growing
+    history only embeds the messages it has not seen before. Messages are
+    keyed by content hash; sessions are kept in an LRU of ``max_sessions``.
+    """
+
+    def __init__(self, max_sessions: int = 128):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, _SessionEmbeddings]" = OrderedDict()
+
+    @staticmethod
+    def message_key(content: str) -> str:
+        return hashlib.md5(content.encode("utf-8")).hexdigest()
+
+    def session(self, session_id: str) -> _SessionEmbeddings:
+        if session_id in self._sessions:
+            self._sessions.move_to_end(session_id)
+        else:
+            self._sessions[session_id] = _SessionEmbeddings()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return self._sessions[session_id]
+
+    def missing(self, session_id: str, contents: List[str]) -> List[str]:
+        """Distinct contents of ``contents`` not embedded yet in this session."""
+        row_of = self.session(session_id).row_of
+        return list(dict.fromkeys(c for c in contents if self.message_key(c) not in row_of))
+
+    def add(self, session_id: str, contents: List[str], embeddings: List[List[float]]):
+        if contents:
+            self.session(session_id).append([self.message_key(c) for c in contents], embeddings)
+
+    def top_k(
+        self,
+        session_id: str,
+        contents: List[str],
+        query_embedding: List[float],
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Indices into ``contents`` of the ``k`` messages most similar to the
+        query (best first) and their cosine similarities: one matrix-vector
+        product, with ``argpartition`` picking the top ``k``.
+        """
+        session = self.session(session_id)
+        rows = np.fromiter((session.row_of[self.message_key(c)] for c in contents), dtype=np.int64)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        similarities = session.matrix[rows] @ query
+        k = min(k, len(similarities))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        return top, similarities[top]
@@ -0,0 +1,95 @@
+# backend/app/services/analysis/reranker.py
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from app.services.memory.lexical_index import tokenize_code
+
+
+class LocalReranker:
+    """
+    Scores retrieved contexts locally as a weighted sum of features,
+    computed for all candidates at once as a (n_contexts, n_features) matrix:
+
+    - vector: cosine similarity from the vector store
+    - bm25: BM25 score, scaled by the best one in the candidate set
+    - proximity: same file / directory / extension as the code location
+    - construct: prior per construct type (definitions over line windows)
+    - recency: exponential decay on when the chunk was (re-)indexed
+    - identifier: share of the query's identifiers found in the chunk
+    """
+
+    FEATURES = ("vector", "bm25", "proximity", "construct", "recency", "identifier")
+    WEIGHTS = np.array([0.40, 0.20, 0.15, 0.05, 0.05, 0.15], dtype=np.float32)
+
+    CONSTRUCT_PRIORS = {
+        "function_definition": 1.0,
+        "class_definition": 1.0,
+        "method": 1.0,
+        "type_definition": 1.0,
+        "module_block": 0.6,
+        "chunk": 0.5,
+    }
+    RECENCY_HALF_LIFE = 7 * 24 * 3600.0  # seconds
+
+    def features(
+        self,
+        query: str,
+        contexts: List[Dict[str, Any]],
+        code_location: Optional[Dict[str, Any]] = None
+    ) -> np.ndarray:
+        """Feature matrix of shape (len(contexts), len(FEATURES)), each column in [0, 1]."""
+        metadatas = [ctx.get("metadata") or {} for ctx in contexts]
+
+        vector = np.clip([float(ctx.get("score", 0.0)) for ctx in contexts], 0.0, 1.0)
+
+        bm25 = np.array([float(ctx.get("bm25_score", 0.0)) for ctx in contexts])
+        if bm25.max(initial=0.0) > 0:
+            bm25 = bm25 / bm25.max()
+
+        target = Path((code_location or {}).get("file_path", "") or "")
+        proximity = np.zeros(len(contexts))
+        if str(target) not in ("", "."):
+            for i, meta in enumerate(metadatas):
+                file_path = Path(meta.get("file_path", "") or "")
+                if file_path == target:
+                    proximity[i] = 1.0
+                elif file_path.parent == target.parent:
+                    proximity[i] = 0.6
+                elif file_path.suffix and file_path.suffix == target.suffix:
+                    proximity[i] = 0.3
+
+        construct = np.array([
+            self.CONSTRUCT_PRIORS.get(meta.get("construct_type"), 0.5) for meta in metadatas
+        ])
+
+        indexed_at = np.array([float(meta.get("indexed_at", 0.0)) for meta in metadatas])
+        age = np.maximum(time.time() - indexed_at, 0.0)
+        recency = np.where(indexed_at > 0, np.exp2(-age / self.RECENCY_HALF_LIFE), 0.0)
+
+        query_terms = set(tokenize_code(query))
+        identifier = np.zeros(len(contexts))
+        if query_terms:
+            for i, (ctx, meta) in enumerate(zip(contexts, metadatas)):
+                name_terms = set(tokenize_code(meta.get("name", "") or ""))
+                content_terms = set(tokenize_code(ctx.get("content", "")))
+                # A hit on the chunk's own name counts double
+                hits = len(query_terms & content_terms) + len(query_terms & name_terms)
+                identifier[i] = min(hits / len(query_terms), 1.0)
+
+        return np.column_stack([vector, bm25, proximity, construct, recency, identifier]).astype(np.float32)
+
+    def rank(
+        self,
+        query: str,
+        contexts: List[Dict[str, Any]],
+        code_location: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Contexts best first, with their (descending) local scores."""
+        if not contexts:
+            return [], np.zeros(0, dtype=np.float32)
+        scores = self.features(query, contexts, code_location) @ self.WEIGHTS
+        order = np.argsort(-scores, kind="stable")
+        return [contexts[i] for i in order], scores[order]
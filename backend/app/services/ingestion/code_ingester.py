@@ -1,138 +1,549 @@
 # backend/app/services/ingestion/code_ingester.py
 import os
 import ast
-import tree_sitter_python as tspython
-from tree_sitter import Language, Parser
-from typing import List, Dict, Any, Generator
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from tree_sitter import Parser
+from typing import List, Dict, Any, Generator, Optional, Tuple
 from pathlib import Path
 import hashlib
+import textwrap
 from app.config import get_settings   # ← ADD THIS IMPORT
+from app.services.ingestion.git_source import git_blob_id
+from app.services.ingestion.languages import LanguageSpec, parser_for, spec_for
+from app.services.ingestion.manifest import IngestionManifest
+from app.services.ingestion.walker import RepositoryWalker
+
+# Per-process ingester of parser pool workers (each with its own tree-sitter Parser)
+_worker_ingester: Optional["CodeIngester"] = None
+
+
+def _init_parser_worker():
+    global _worker_ingester
+    _worker_ingester = CodeIngester(workers=1)
+
+
+def _parse_files(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Pool task: records (chunks, file status, errors) for a batch of files."""
+    records = []
+    for job in jobs:
+        records.extend(_worker_ingester._parse_job(job))
+    return records
+
+
+def _parse_source(job: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Pool task: chunks of one file whose content was read by the caller."""
+    try:
+        return _worker_ingester._process_file(Path(job["path"]), job["repo_root"], content=job["content"])
+    except Exception as e:
+        return [{"type": "error", "file_path": job["path"], "error": str(e)}]
+
 
 class CodeIngester:
     """
     Ingest entire codebases with AST parsing for intelligent chunking.
     Optimized for retrieval-augmented generation.
+
+    Files are parsed by a pool of ``INGEST_WORKERS`` processes; the event
+    loop only walks the repository (``RepositoryWalker``: ignored
+    directories are pruned, binaries skipped) and streams back parsed
+    batches in completion order.
     """
 
-    def __init__(self):
+    FILES_PER_TASK = 8  # files parsed per pool task
+    DEFAULT_IGNORE_PATTERNS = [
+        'node_modules', '.git', '__pycache__', '.venv',
+        'dist', 'build', '*.min.js', '*.pyc'
+    ]
+    TASKS_IN_FLIGHT_PER_WORKER = 4  # bounds read-ahead while the consumer is busy
+    CLASS_SPLIT_LINES = 60  # longer classes / impls are chunked as an outline plus one chunk per member
+    MODULE_BLOCK_LINES = 50  # module-level statements grouped per chunk (up to this many lines)
+    MAX_CONSTRUCT_CHARS = 10000  # larger constructs are split into line windows
+
+    def __init__(self, workers: Optional[int] = None):
         self.settings = get_settings()  # ← ADD THIS LINE
-        self.parser = Parser(Language(tspython.language()))
-        self.supported_langs = {
-            '.py': tspython.language(),
-            # Add more tree-sitter grammars as needed
+        self.workers = workers or self.settings.INGEST_WORKERS or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned, not forked: the API process runs threads (store executor, Chroma)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_parser_worker
+            )
+        return self._pool
+
+    async def _run_in_pool(self, task, payload, paths: List[str]) -> List[Dict[str, Any]]:
+        pool = self._get_pool()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, task, payload)
+        except BrokenProcessPool as e:
+            # A worker died (e.g. a parser crash): report the files, start a fresh pool
+            if self._pool is pool:
+                self._pool = None
+            return [{"type": "error", "file_path": path, "error": f"parser worker died: {e}"} for path in paths]
+
+    async def _parse(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return await self._run_in_pool(_parse_files, jobs, [job["path"] for job in jobs])
+
+    async def parse_source(self, file_path: Path, repo_root: str, content: str) -> List[Dict[str, Any]]:
+        """Chunk already-read file content in the parser pool."""
+        job = {"path": str(file_path), "repo_root": repo_root, "content": content}
+        return await self._run_in_pool(_parse_source, job, [job["path"]])
+
+    def walker(self, repo_path: str, ignore_patterns: List[str] = None) -> RepositoryWalker:
+        """
+        Walker over the supported, non-ignored text files of ``repo_path``.
+        ``ignore_patterns`` are gitignore-style globs (the repository's own
+        ``.gitignore`` files apply as well).
+        """
+        return RepositoryWalker(
+            repo_path,
+            patterns=ignore_patterns or self.DEFAULT_IGNORE_PATTERNS,
+            extensions=self.settings.SUPPORTED_EXTENSIONS,
+            max_file_size=self.settings.MAX_FILE_SIZE
+        )
+
+    @staticmethod
+    def read_file(
+        file_path: Path,
+        repo_root: str,
+        known_hash: Optional[str]
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Read and hash a tracked file. Returns its file record (status
+        included) and its text, or ``None`` as text when the content hash
+        equals ``known_hash`` (touched but identical).
+        """
+        stat = file_path.stat()
+        raw = file_path.read_bytes()
+        return CodeIngester.file_record(
+            str(file_path.relative_to(repo_root)), raw, stat.st_size, stat.st_mtime_ns, known_hash
+        )
+
+    @staticmethod
+    def file_record(
+        rel_path: str,
+        raw: bytes,
+        size: int,
+        mtime_ns: int,
+        known_hash: Optional[str]
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        File record and text of already-read content, as ``read_file``.
+        The content hash is the git blob id, so worktree and git-object
+        ingestions agree on it.
+        """
+        file_record = {
+            "type": "file",
+            "file_path": rel_path,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "content_hash": git_blob_id(raw)
         }
+        if known_hash == file_record["content_hash"]:
+            return {**file_record, "status": "unchanged"}, None
+        status = "changed" if known_hash else "added"
+        return {**file_record, "status": status}, raw.decode("utf-8", errors="ignore")
+
+    def close(self):
+        """Shut the parser pool down (it is restarted on the next ingestion)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
 
     async def ingest_repository(
         self,
         repo_path: str,
-        ignore_patterns: List[str] = None
+        ignore_patterns: List[str] = None,
+        manifest: Optional[IngestionManifest] = None
     ) -> Generator[Dict[str, Any], None, None]:
         """
         Stream-process repository for vector store ingestion.
         Yields structured code chunks with metadata.
+
+        With a ``manifest``, files whose size and mtime are unchanged are
+        skipped without being read (or sniffed), and a ``{"type": "file"}`` record with
+        status added / changed / unchanged / removed follows each file.
         """
-        ignore_patterns = ignore_patterns or [
-            'node_modules', '.git', '__pycache__', '.venv',
-            'dist', 'build', '*.min.js', '*.pyc'
-        ]
+        seen = set()
+        max_in_flight = self.workers * self.TASKS_IN_FLIGHT_PER_WORKER
+        in_flight = set()
+        jobs = []
 
-        repo = Path(repo_path)
+        unchanged = None
+        if manifest is not None:
+            unchanged = lambda rel_path, stat: manifest.is_unchanged(rel_path, stat.st_size, stat.st_mtime_ns)
 
-        for file_path in repo.rglob("*"):
-            # Skip ignored patterns
-            if any(p in str(file_path) for p in ignore_patterns):
-                continue
+        for file_path, rel_path, stat in self.walker(repo_path, ignore_patterns).walk(skip_sniff=unchanged):
+            job = {"path": str(file_path), "repo_root": repo_path, "track": manifest is not None}
+            if manifest is not None:
+                seen.add(rel_path)
+                if unchanged(rel_path, stat):
+                    yield {"type": "file", "file_path": rel_path, "status": "unchanged"}
+                    continue
+                entry = manifest.get(rel_path)
+                job["known_hash"] = entry["content_hash"] if entry else None
 
-            if not file_path.is_file():
+            jobs.append(job)
+            if len(jobs) < self.FILES_PER_TASK:
                 continue
+            in_flight.add(asyncio.ensure_future(self._parse(jobs)))
+            jobs = []
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    for record in future.result():
+                        yield record
+            else:
+                # Let the rest of the app run between directory entries
+                await asyncio.sleep(0)
 
-            ext = file_path.suffix
-            if ext not in self.settings.SUPPORTED_EXTENSIONS:  # ← Now safe
-                continue
+        if jobs:
+            in_flight.add(asyncio.ensure_future(self._parse(jobs)))
+        for future in asyncio.as_completed(in_flight):
+            for record in await future:
+                yield record
+
+        if manifest is not None:
+            for rel_path in list(manifest.files):
+                if rel_path not in seen:
+                    yield {"type": "file", "file_path": rel_path, "status": "removed"}
+
+    def _parse_job(self, job: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Parse one file (in a pool worker). Tracked files are hashed first:
+        one identical to the manifest's copy yields only an ``unchanged``
+        record, otherwise its chunks are followed by its file record.
+        """
+        file_path = Path(job["path"])
+        try:
+            if not job["track"]:
+                return self._process_file(file_path, job["repo_root"])
 
-            # Process file
-            try:
-                chunks = self._process_file(file_path, repo_path)
-                for chunk in chunks:
-                    yield chunk
-            except Exception as e:
-                yield {
-                    "type": "error",
-                    "file_path": str(file_path),
-                    "error": str(e)
-                }
+            file_record, content = self.read_file(file_path, job["repo_root"], job["known_hash"])
+            if content is None:
+                # Touched but identical: refresh stat info only
+                return [file_record]
+            return self._process_file(file_path, job["repo_root"], content=content) + [file_record]
+        except Exception as e:
+            return [{
+                "type": "error",
+                "file_path": str(file_path),
+                "error": str(e)
+            }]
     
     def _process_file(
         self, 
         file_path: Path,
-        repo_root: str
+        repo_root: str,
+        content: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Parse single file into semantic chunks."""
         
-        content = file_path.read_text(encoding='utf-8', errors='ignore')
+        if content is None:
+            content = file_path.read_text(encoding='utf-8', errors='ignore')
         rel_path = str(file_path.relative_to(repo_root))
         
         # Language-specific parsing
-        if file_path.suffix == '.py':
-            return self._parse_python(content, rel_path)
+        parser = parser_for(file_path.suffix)
+        if parser is not None:
+            return self._parse_tree(content, rel_path, spec_for(file_path.suffix), parser)
         else:
-            # Generic chunking for other languages
+            # Generic chunking for other languages (or a grammar that is not installed)
             return self._generic_chunking(content, rel_path)
     
-    def _parse_python(self, content: str, file_path: str) -> List[Dict[str, Any]]:
-        """AST-based parsing for Python files."""
-        
+    def _parse_tree(self, content: str, file_path: str, spec: LanguageSpec, parser: Parser) -> List[Dict[str, Any]]:
+        """
+        AST-based, hierarchical parsing with the file's tree-sitter grammar
+        (node types per language in ``languages.LANGUAGES``).
+
+        Top-level definitions are chunks, with their decorators and the doc
+        comments right above them, and so are runs of module-level
+        statements (imports, constants, ``if __name__`` blocks). A container
+        (class, impl, trait...) longer than ``CLASS_SPLIT_LINES`` becomes an
+        outline chunk (header, container-level statements, member
+        signatures) plus one chunk per member, embedded with its container
+        and signature; nested containers are split the same way. Children
+        carry ``parent_hash`` / ``parent_name`` of their outline.
+        """
         try:
-            tree = self.parser.parse(bytes(content, "utf8"))
-            root_node = tree.root_node
-            
+            source = bytes(content, "utf8")
+            tree = parser.parse(source)
+            lines = content.split("\n")
+
             chunks = []
-            
-            # Extract top-level constructs
-            for child in root_node.children:
-                if child.type in ('function_definition', 'class_definition'):
-                    chunk_text = content[child.start_byte:child.end_byte]
-                    
-                    # Secondary chunking for very large constructs
-                    if len(chunk_text) > 10000:
-                        sub_chunks = self._generic_chunking(chunk_text, file_path, chunk_size=100)
-                        chunks.extend(sub_chunks)
-                        continue
-
-                    # Get function/class name
-                    name_node = child.child_by_field_name('name')
-                    name = content[name_node.start_byte:name_node.end_byte] if name_node else "unknown"
-                    
-                    # Get docstring if exists
-                    docstring = self._extract_docstring(child, content)
-                    
-                    chunks.append({
-                        "type": "code",
-                        "file_path": file_path,
-                        "content": chunk_text,
-                        "language": "python",
-                        "construct_type": child.type,
-                        "name": name,
-                        "docstring": docstring,
-                        "line_start": child.start_point[0] + 1,
-                        "line_end": child.end_point[0] + 1,
-                        "embedding_text": f"""
-                        File: {file_path}
-                        {child.type.replace('_', ' ').title()}: {name}
-                        Docstring: {docstring}
-                        Code:
-                        {chunk_text}
-                        """.strip(),
-                        "content_hash": hashlib.md5(chunk_text.encode()).hexdigest()
-                    })
-            
+            block = []  # consecutive module-level statements
+
+            def flush():
+                if block:
+                    chunks.extend(self._module_block(block, lines, file_path, spec))
+                    block.clear()
+
+            for child in tree.root_node.named_children:
+                definition = self._definition(child, spec)
+                if definition is None:
+                    if block and child.end_point[0] - block[0].start_point[0] >= self.MODULE_BLOCK_LINES:
+                        flush()
+                    block.append(child)
+                    continue
+                leading = self._leading(block, len(block), child, spec)
+                del block[len(block) - len(leading):]
+                flush()
+                chunks.extend(self._definition_chunks(child, definition, leading, spec, source, lines, file_path))
+            flush()
             return chunks
-            
+
         except Exception as e:
             # Fallback to generic chunking
             return self._generic_chunking(content, file_path)
-    
-    def _extract_docstring(self, node, content: str) -> str:
+
+    @staticmethod
+    def _definition(node, spec: LanguageSpec):
+        """The definition ``node`` is or wraps (decorators, ``export``), else ``None``."""
+        field = spec.wrappers.get(node.type)
+        if field is not None:
+            node = node.child_by_field_name(field)
+            if node is None:
+                return None
+        if node.type in spec.definitions:
+            return node
+        if node.type in spec.declarations:
+            # ``const handler = async (req) => {...}``
+            values = [c.child_by_field_name("value") for c in node.named_children]
+            values = [v for v in values if v is not None]
+            if len(values) == 1 and values[0].type in spec.function_values:
+                return node
+        return None
+
+    def _member(self, node, spec: LanguageSpec):
+        """
+        A definition inside a container that gets its own chunk: one with a
+        body spanning several lines (the rest stay verbatim in the outline).
+        """
+        definition = self._definition(node, spec)
+        if definition is None or definition.child_by_field_name("body") is None:
+            return None
+        return definition if self._last_row(node) > node.start_point[0] else None
+
+    def _leading(self, siblings: List, index: int, node, spec: LanguageSpec) -> List:
+        """The comments / attributes among ``siblings[:index]`` directly above ``node``."""
+        start, row = index, node.start_point[0]
+        while start > 0 and siblings[start - 1].type in spec.leading and self._last_row(siblings[start - 1]) >= row - 1:
+            start -= 1
+            row = siblings[start].start_point[0]
+        return siblings[start:index]
+
+    @staticmethod
+    def _name(definition, source: bytes) -> str:
+        # Declarations (``type_spec``, ``variable_declarator``) name their first child; impls their type
+        for node in [definition] + definition.named_children:
+            for field in ("name", "type"):
+                found = node.child_by_field_name(field)
+                if found is not None:
+                    return source[found.start_byte:found.end_byte].decode("utf8", errors="ignore")
+        return "unknown"
+
+    @staticmethod
+    def _last_row(node) -> int:
+        row, column = node.end_point
+        return row - 1 if column == 0 and row > node.start_point[0] else row
+
+    def _node_lines(self, node, lines: List[str]) -> str:
+        """Full source lines of ``node``, dedented."""
+        return textwrap.dedent("\n".join(lines[node.start_point[0]:self._last_row(node) + 1]))
+
+    def _signature(self, node, definition, lines: List[str]) -> Optional[List[str]]:
+        """
+        Lines of a definition's header, decorators included, up to its body
+        (``None`` if it fits on one line or has no body).
+        """
+        body = definition.child_by_field_name("body")
+        if body is None or node.start_point[0] == self._last_row(node):
+            return None
+        row, column = body.start_point
+        header = lines[node.start_point[0]:row]
+        # ``column`` counts bytes
+        prefix = lines[row].encode("utf8")[:column].decode("utf8", errors="ignore")
+        if prefix.strip():
+            header.append(prefix.rstrip())  # body opens on the header's last line (``{``)
+        return header or None
+
+    def _definition_chunks(
+        self,
+        node,
+        definition,
+        leading: List,
+        spec: LanguageSpec,
+        source: bytes,
+        lines: List[str],
+        file_path: str,
+        parent: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Chunks of one definition; ``node`` includes its decorators, ``leading`` its doc comments."""
+        name = self._name(definition, source)
+        qualified_name = f"{parent['qualified_name']}.{name}" if parent else name
+        if spec.docstrings:
+            docstring = self._extract_docstring(definition, source)
+        else:
+            docstring = "\n".join(self._node_lines(n, lines) for n in leading if "comment" in n.type).strip()
+        start_row = leading[0].start_point[0] if leading else node.start_point[0]
+        last_row = self._last_row(node)
+        text = textwrap.dedent("\n".join(lines[start_row:last_row + 1]))
+        line_start, line_end = start_row + 1, last_row + 1
+        hierarchy = {
+            "name": name,
+            "qualified_name": qualified_name,
+            "parent_hash": parent["content_hash"] if parent else "",
+            "parent_name": parent["qualified_name"] if parent else ""
+        }
+
+        construct_type = spec.definitions.get(definition.type, "function_definition")
+        if parent is not None and construct_type == "function_definition":
+            construct_type = "method"
+
+        if definition.type in spec.containers and (
+            line_end - line_start + 1 > self.CLASS_SPLIT_LINES or len(text) > self.MAX_CONSTRUCT_CHARS
+        ):
+            chunks = self._outline_chunks(
+                definition, start_row, construct_type, docstring, hierarchy, spec, source, lines, file_path
+            )
+            if chunks:
+                return chunks
+
+        # Secondary chunking for very large constructs
+        if len(text) > self.MAX_CONSTRUCT_CHARS:
+            windows = self._generic_chunking(text, file_path, chunk_size=100, first_line=line_start)
+            for window in windows:
+                window.update(hierarchy, language=spec.name)
+            return windows
+
+        context = []
+        if parent is not None:
+            signature = "\n".join(self._signature(node, definition, lines) or [lines[node.start_point[0]]])
+            context = [
+                f"{parent['construct_type'].replace('_definition', '').title()}: {parent['qualified_name']}",
+                f"Signature: {textwrap.dedent(signature).strip()}"
+            ]
+        return [self._chunk(
+            file_path, text, spec.name, construct_type, line_start, line_end,
+            docstring=docstring, context=context, **hierarchy
+        )]
+
+    def _outline_chunks(
+        self,
+        definition,
+        start_row: int,
+        construct_type: str,
+        docstring: str,
+        hierarchy: Dict[str, str],
+        spec: LanguageSpec,
+        source: bytes,
+        lines: List[str],
+        file_path: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Outline chunk of a large container followed by its members' chunks,
+        or nothing if it has no member below its header to split off.
+        """
+        body = definition.child_by_field_name("body")
+        children = body.named_children if body is not None else []
+        if not children or children[0].start_point[0] <= definition.start_point[0]:
+            return []
+        members = {i: self._member(child, spec) for i, child in enumerate(children)}
+        members = {i: member for i, member in members.items() if member is not None}
+        if not members:
+            return []
+        leading = {i: self._leading(children, i, children[i], spec) for i in members}
+        claimed = {node.id for nodes in leading.values() for node in nodes}
+
+        next_row = children[0].start_point[0]
+        outline = lines[start_row:next_row]
+        for i, child in enumerate(children):
+            last_row = self._last_row(child)
+            if child.id in claimed or last_row < next_row:
+                continue  # a member's doc comment, or shares a line already in the outline
+            signature = self._signature(child, members[i], lines) if i in members else None
+            if signature is None:
+                outline.extend(lines[max(child.start_point[0], next_row):last_row + 1])
+            else:
+                signature = signature[max(next_row - child.start_point[0], 0):]
+                signature[-1] += " " + spec.elision
+                outline.extend(signature)
+            next_row = last_row + 1
+        outline.extend(line for line in lines[next_row:self._last_row(definition) + 1] if line.strip())  # closing brace
+
+        outline_chunk = self._chunk(
+            file_path, textwrap.dedent("\n".join(outline)), spec.name, construct_type,
+            start_row + 1, self._last_row(definition) + 1,
+            docstring=docstring, context=["Outline: signatures only, members are separate chunks"],
+            **hierarchy
+        )
+        chunks = [outline_chunk]
+        for i, member in members.items():
+            chunks.extend(self._definition_chunks(
+                children[i], member, leading[i], spec, source, lines, file_path, parent=outline_chunk
+            ))
+        return chunks
+
+    def _module_block(self, nodes: List, lines: List[str], file_path: str, spec: LanguageSpec) -> List[Dict[str, Any]]:
+        """One chunk of consecutive module-level statements."""
+        line_start, line_end = nodes[0].start_point[0] + 1, self._last_row(nodes[-1]) + 1
+        text = "\n".join(lines[line_start - 1:line_end])
+        if len(text) > self.MAX_CONSTRUCT_CHARS:
+            windows = self._generic_chunking(text, file_path, chunk_size=100, first_line=line_start)
+            for window in windows:
+                window["language"] = spec.name
+            return windows
+        return [self._chunk(
+            file_path, text, spec.name, "module_block", line_start, line_end,
+            name="", qualified_name="", parent_hash="", parent_name=""
+        )]
+
+    @staticmethod
+    def _chunk(
+        file_path: str,
+        text: str,
+        language: str,
+        construct_type: str,
+        line_start: int,
+        line_end: int,
+        name: str,
+        qualified_name: str,
+        parent_hash: str,
+        parent_name: str,
+        docstring: str = "",
+        context: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        label = construct_type.replace('_', ' ').title()
+        heading = f"{label}: {qualified_name}" if qualified_name else f"{label} (lines {line_start}-{line_end})"
+        return {
+            "type": "code",
+            "file_path": file_path,
+            "content": text,
+            "language": language,
+            "construct_type": construct_type,
+            "name": name,
+            "qualified_name": qualified_name,
+            "parent_hash": parent_hash,
+            "parent_name": parent_name,
+            "docstring": docstring,
+            "line_start": line_start,
+            "line_end": line_end,
+            "embedding_text": "\n".join(
+                [f"File: {file_path}", heading]
+                + (context or [])
+                + ([f"Docstring: {docstring}"] if docstring else [])
+                + ["Code:", text]
+            ),
+            "content_hash": hashlib.md5(text.encode()).hexdigest()
+        }
+
+    def _extract_docstring(self, node, source: bytes) -> str:
         """Extract docstring from function/class node."""
         # Look for expression_statement containing string
         for child in node.children:
@@ -141,7 +552,7 @@ class CodeIngester:
                     if stmt.type == 'expression_statement':
                         string_node = stmt.children[0] if stmt.children else None
                         if string_node and string_node.type in ('string', 'comment'):
-                            return content[string_node.start_byte:string_node.end_byte]
+                            return source[string_node.start_byte:string_node.end_byte].decode("utf8", errors="ignore")
         return ""
     
     def _generic_chunking(
@@ -149,9 +560,10 @@ class CodeIngester:
         content: str, 
         file_path: str,
         chunk_size: int = 50,
-        overlap: int = 5
+        overlap: int = 5,
+        first_line: int = 1
     ) -> List[Dict[str, Any]]:
-        """Line-based chunking for non-Python files."""
+        """Line-based chunking for non-Python files (and oversized constructs, from ``first_line``)."""
         
         lines = content.split('\n')
         chunks = []
@@ -159,6 +571,8 @@ class CodeIngester:
         for i in range(0, len(lines), chunk_size - overlap):
             chunk_lines = lines[i:i + chunk_size]
             chunk_text = '\n'.join(chunk_lines)
+            line_start = first_line + i
+            line_end = first_line + min(i + chunk_size, len(lines)) - 1
             
             chunks.append({
                 "type": "code",
@@ -166,10 +580,10 @@ class CodeIngester:
                 "content": chunk_text,
                 "language": Path(file_path).suffix[1:],
                 "construct_type": "chunk",
-                "line_start": i + 1,
-                "line_end": min(i + chunk_size, len(lines)),
-                "embedding_text": f"File: {file_path}\nLines {i+1}-{min(i+chunk_size, len(lines))}:\n{chunk_text}",
+                "line_start": line_start,
+                "line_end": line_end,
+                "embedding_text": f"File: {file_path}\nLines {line_start}-{line_end}:\n{chunk_text}",
                 "content_hash": hashlib.md5(chunk_text.encode()).hexdigest()
             })
         
-        return chunks
\ No newline at end of file
+        return chunks
@@ -0,0 +1,188 @@
+# backend/app/services/ingestion/git_source.py
+import hashlib
+import os
+import subprocess
+from typing import Callable, Dict, List, Optional, Tuple
+
+GIT_TIMEOUT = 120.0  # seconds per git command
+PATHS_PER_COMMAND = 500  # pathspecs per ls-tree call
+
+_REGULAR_FILE_MODES = ("100644", "100755")  # skips symlinks (120000) and submodules (160000)
+
+
+def git_blob_id(data: bytes) -> str:
+    """The object id git gives ``data`` as a blob (``git hash-object``)."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class GitError(ValueError):
+    """Not a git repository, unknown revision, or a failed git command."""
+
+
+class GitRepository:
+    """
+    Read-only access to a local repository through the ``git`` CLI.
+    Only local plumbing commands are run (no fetch, no network).
+    ``path`` may be a subdirectory of the work tree (a monorepo package):
+    every listing is limited to it, with paths relative to it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _git(self, *args: str) -> bytes:
+        try:
+            result = subprocess.run(
+                ["git", "-C", self.path, *args],
+                capture_output=True,
+                timeout=GIT_TIMEOUT,
+                env={**os.environ, "GIT_TERMINAL_PROMPT": "0", "GIT_OPTIONAL_LOCKS": "0"}
+            )
+        except FileNotFoundError:
+            raise GitError("git executable not found")
+        except subprocess.TimeoutExpired:
+            raise GitError(f"git {args[0]} timed out after {GIT_TIMEOUT:.0f}s")
+        if result.returncode != 0:
+            raise GitError(f"git {args[0]} failed: {result.stderr.decode(errors='ignore').strip()}")
+        return result.stdout
+
+    @staticmethod
+    def _split(output: bytes) -> List[str]:
+        return [item.decode("utf-8", errors="surrogateescape") for item in output.split(b"\0") if item]
+
+    def resolve(self, revision: str) -> str:
+        """Full commit id of ``revision`` (branch, tag, short sha, ``HEAD~2``...)."""
+        try:
+            return self._git("rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}").decode().strip()
+        except GitError:
+            raise GitError(f"unknown revision {revision!r} in {self.path}")
+
+    def index_blobs(self) -> Dict[str, str]:
+        """Tracked regular files → blob id, as staged in the index (``git ls-files -s``)."""
+        blobs = {}
+        for line in self._split(self._git("ls-files", "-s", "-z")):
+            meta, path = line.split("\t", 1)
+            mode, blob, stage = meta.split(" ")
+            if mode in _REGULAR_FILE_MODES and stage == "0":
+                blobs[path] = blob
+        return blobs
+
+    def worktree_changes(self) -> Tuple[List[str], List[str]]:
+        """
+        ``(modified, deleted)`` paths whose worktree copy differs from the
+        index, untracked (non-ignored) files counting as modified.
+        """
+        modified, deleted = [], []
+        fields = self._split(self._git("diff", "--name-status", "--no-renames", "--relative", "-z"))
+        for status, path in zip(fields[::2], fields[1::2]):
+            (deleted if status == "D" else modified).append(path)
+        modified.extend(self._split(self._git("ls-files", "-o", "--exclude-standard", "-z")))
+        return modified, deleted
+
+    def has_staged_changes(self) -> bool:
+        return bool(self._git("diff", "--cached", "--name-only", "--relative", "-z", "HEAD"))
+
+    def diff(self, from_commit: str, to_commit: str) -> Tuple[List[str], List[str]]:
+        """``(changed, deleted)`` paths between two commits; renames count as delete + add."""
+        changed, deleted = [], []
+        fields = self._split(self._git(
+            "diff", "--name-status", "--no-renames", "--relative", "-z", from_commit, to_commit
+        ))
+        for status, path in zip(fields[::2], fields[1::2]):
+            (deleted if status == "D" else changed).append(path)
+        return changed, deleted
+
+    def tree_blobs(self, commit: str, paths: List[str]) -> Dict[str, Tuple[str, int]]:
+        """``paths`` (regular files in ``commit``) → ``(blob id, size)``."""
+        blobs = {}
+        for i in range(0, len(paths), PATHS_PER_COMMAND):
+            pathspecs = [f":(literal){path}" for path in paths[i:i + PATHS_PER_COMMAND]]
+            for line in self._split(self._git("ls-tree", "-r", "-l", "-z", commit, "--", *pathspecs)):
+                meta, path = line.split("\t", 1)
+                mode, _, blob, size = meta.split()
+                if mode in _REGULAR_FILE_MODES:
+                    blobs[path] = (blob, int(size))
+        return blobs
+
+    def read_blob(self, blob: str) -> bytes:
+        return self._git("cat-file", "blob", blob)
+
+
+class GitChangeSet:
+    """
+    What a git-aware ingestion has to do, computed from git metadata alone
+    (no file is read): files to (re-)chunk with their blob ids, manifest
+    paths to remove, and how many tracked files were skipped as unchanged.
+
+    - ``from_commit`` set: delta between two commits; contents are read
+      from git objects, so ``to_commit`` need not be checked out.
+    - otherwise: the index (``git ls-files -s``) plus worktree changes;
+      clean files whose blob id equals the manifest's content hash are
+      skipped, the rest are read from the worktree.
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        from_commit: Optional[str] = None,
+        to_commit: Optional[str] = None
+    ):
+        self.repo = GitRepository(repo_path)
+        self.from_commit = from_commit
+        self.to_commit = to_commit
+        self.commit: Optional[str] = None  # commit the workspace matches afterwards (None if dirty)
+        self.files: List[Tuple[str, Optional[str]]] = []  # (rel_path, blob id, None when dirty)
+        self.removed: List[str] = []
+        self.unchanged = 0
+
+    @property
+    def from_objects(self) -> bool:
+        """Contents come from git objects rather than the worktree."""
+        return self.from_commit is not None
+
+    def plan(self, manifest_files: Dict[str, Dict], admit: Callable[[str], bool]) -> "GitChangeSet":
+        """Fill in the change set; ``admit(rel_path)`` filters by extension / ignore rules."""
+        if self.from_commit is not None:
+            self._plan_commits(manifest_files, admit)
+        else:
+            self._plan_index(manifest_files, admit)
+        return self
+
+    def _plan_commits(self, manifest_files: Dict[str, Dict], admit: Callable[[str], bool]):
+        from_commit = self.repo.resolve(self.from_commit)
+        self.commit = self.repo.resolve(self.to_commit or "HEAD")
+        changed, deleted = self.repo.diff(from_commit, self.commit)
+        self.removed = [path for path in deleted if path in manifest_files]
+
+        blobs = self.repo.tree_blobs(self.commit, [path for path in changed if admit(path)])
+        for path, (blob, _) in sorted(blobs.items()):
+            entry = manifest_files.get(path)
+            if entry and entry["content_hash"] == blob:
+                self.unchanged += 1
+            else:
+                self.files.append((path, blob))
+
+    def _plan_index(self, manifest_files: Dict[str, Dict], admit: Callable[[str], bool]):
+        head = self.repo.resolve("HEAD")
+        blobs = self.repo.index_blobs()
+        modified, deleted = self.repo.worktree_changes()
+        clean = not (modified or deleted or self.repo.has_staged_changes())
+        self.commit = head if clean else None
+
+        for path in deleted:
+            blobs.pop(path, None)
+        dirty = set(modified)
+        for path in sorted(set(blobs) | dirty):
+            if not admit(path):
+                continue
+            blob = None if path in dirty else blobs[path]
+            entry = manifest_files.get(path)
+            if blob is not None and entry and entry["content_hash"] == blob:
+                self.unchanged += 1
+            else:
+                self.files.append((path, blob))
+
+        listed = {path for path, _ in self.files} | {
+            path for path in manifest_files if path in blobs and path not in dirty
+        }
+        self.removed = [path for path in manifest_files if path not in listed]
@@ -0,0 +1,232 @@
+# backend/app/services/ingestion/jobs.py
+import asyncio
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from app.config import get_settings
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED, INTERRUPTED = (
+    "queued", "running", "completed", "failed", "cancelled", "interrupted"
+)
+FINISHED = (COMPLETED, FAILED, CANCELLED, INTERRUPTED)
+RESUMABLE = (FAILED, CANCELLED, INTERRUPTED)
+
+
+class IngestionJob:
+    """
+    One requested codebase ingestion. ``options`` are what is needed to
+    run it again (git mode, resolved commits), so it can be resumed.
+    """
+
+    def __init__(
+        self,
+        workspace_id: str,
+        repo_path: str,
+        options: Optional[Dict[str, Any]] = None,
+        job_id: Optional[str] = None
+    ):
+        self.id = job_id or uuid.uuid4().hex
+        self.workspace_id = workspace_id
+        self.repo_path = repo_path
+        self.options = options or {}
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.attempts = 0
+        self.error: Optional[str] = None
+        self.summary: Optional[Dict[str, Any]] = None
+        self.progress: Dict[str, Any] = {}
+        self.errors: List[Dict[str, str]] = []
+        self.pipeline = None  # live IngestionPipeline while running
+        self.task: Optional[asyncio.Task] = None
+        self._cancel_status = CANCELLED
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.pipeline is not None:
+            self.progress = self.pipeline.progress()
+            self.errors = list(self.pipeline.errors)
+            self.summary = dict(self.pipeline.summary)
+        return {
+            "job_id": self.id,
+            "workspace_id": self.workspace_id,
+            "repo_path": self.repo_path,
+            "options": self.options,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "attempts": self.attempts,
+            "error": self.error,
+            "progress": self.progress,
+            "summary": self.summary,
+            "errors": self.errors
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IngestionJob":
+        job = cls(data["workspace_id"], data["repo_path"], data.get("options"), job_id=data["job_id"])
+        for key in ("status", "created_at", "started_at", "finished_at", "attempts",
+                    "error", "progress", "summary", "errors"):
+            if key in data:
+                setattr(job, key, data[key])
+        return job
+
+
+class JobManager:
+    """
+    Registry of ingestion jobs: each gets an id, live progress (files and
+    chunks done, throughput, ETA) and can be cancelled or resumed.
+
+    Job records are written to ``directory`` on every state change and at
+    each pipeline checkpoint. The ingestion manifest is checkpointed at the
+    same time, so a resumed job skips the files already stored. Jobs that
+    were running when the process stopped are marked ``interrupted`` on
+    startup and resumed when ``INGEST_RESUME_ON_STARTUP`` is set.
+    """
+
+    def __init__(self, directory: str, runner: Callable[[IngestionJob], Awaitable[Dict[str, Any]]]):
+        self.settings = get_settings()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.runner = runner
+        self.jobs: Dict[str, IngestionJob] = {}
+
+    # ─────────────────────────────────────────────────────────────
+    # PERSISTENCE
+    # ─────────────────────────────────────────────────────────────
+
+    def _path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def persist(self, job: IngestionJob):
+        path = self._path(job.id)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(job.to_dict(), f)
+        os.replace(tmp, path)
+
+    async def checkpoint(self, job: IngestionJob):
+        """Pipeline checkpoint hook: record the job's progress along with the manifest."""
+        self.persist(job)
+
+    def recover(self) -> List[IngestionJob]:
+        """Load job records (lifespan startup); returns the jobs resumed."""
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                with open(path) as f:
+                    job = IngestionJob.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ [Jobs] Unreadable job record {path.name}: {e}")
+                continue
+            if job.status in (QUEUED, RUNNING):
+                job.status = INTERRUPTED
+                self.persist(job)
+            self.jobs[job.id] = job
+
+        resumed = []
+        if self.settings.INGEST_RESUME_ON_STARTUP:
+            for job in sorted(self.jobs.values(), key=lambda j: j.created_at):
+                if job.status == INTERRUPTED:
+                    resumed.append(self.resume(job.id))
+        if resumed:
+            print(f"🔁 [Jobs] Resuming {len(resumed)} interrupted ingestion jobs")
+        return resumed
+
+    def _prune(self):
+        finished = sorted(
+            (job for job in self.jobs.values() if job.status in FINISHED),
+            key=lambda j: j.finished_at or j.created_at
+        )
+        for job in finished[:max(0, len(finished) - self.settings.INGEST_JOB_HISTORY)]:
+            del self.jobs[job.id]
+            self._path(job.id).unlink(missing_ok=True)
+
+    # ─────────────────────────────────────────────────────────────
+    # LIFECYCLE
+    # ─────────────────────────────────────────────────────────────
+
+    def submit(self, workspace_id: str, repo_path: str, options: Optional[Dict[str, Any]] = None) -> IngestionJob:
+        job = IngestionJob(workspace_id, repo_path, options)
+        self.jobs[job.id] = job
+        self._start(job)
+        return job
+
+    def _start(self, job: IngestionJob):
+        job.status = QUEUED
+        job.error = None
+        job.finished_at = None
+        job._cancel_status = CANCELLED
+        self.persist(job)
+        job.task = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: IngestionJob):
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.attempts += 1
+        self.persist(job)
+        try:
+            job.summary = await self.runner(job)
+            job.status = COMPLETED
+        except asyncio.CancelledError:
+            job.status = job._cancel_status
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            print(f"❌ [Jobs] Ingestion {job.id} of {job.workspace_id} failed: {e}")
+        finally:
+            job.to_dict()  # final progress from the pipeline
+            job.pipeline = None
+            job.finished_at = time.time()
+            self.persist(job)
+            self._prune()
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self.jobs.get(job_id)
+
+    def list(self, workspace_id: Optional[str] = None) -> List[IngestionJob]:
+        jobs = [j for j in self.jobs.values() if workspace_id is None or j.workspace_id == workspace_id]
+        return sorted(jobs, key=lambda j: j.created_at, reverse=True)
+
+    async def cancel(self, job_id: str, status: str = CANCELLED) -> IngestionJob:
+        """Stop a running job; what was stored so far stays checkpointed."""
+        job = self.jobs[job_id]
+        if job.task is not None and not job.task.done():
+            job._cancel_status = status
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+        if job.status not in FINISHED:
+            # Cancelled before it started running
+            job.status = status
+            job.finished_at = time.time()
+            self.persist(job)
+        return job
+
+    def resume(self, job_id: str) -> IngestionJob:
+        """Run a failed / cancelled / interrupted job again; files already stored are skipped."""
+        job = self.jobs[job_id]
+        if job.status not in RESUMABLE:
+            raise ValueError(f"Job {job_id} is {job.status}, only {', '.join(RESUMABLE)} jobs can be resumed")
+        self._start(job)
+        return job
+
+    async def shutdown(self):
+        """Interrupt running jobs (lifespan shutdown): they resume on the next startup."""
+        for job in list(self.jobs.values()):
+            await self.cancel(job.id, status=INTERRUPTED)
+
+    async def follow(self, job_id: str, interval: float = 1.0) -> AsyncIterator[Dict[str, Any]]:
+        """Job snapshots every ``interval`` seconds until it finishes (the last one included)."""
+        job = self.jobs[job_id]
+        while True:
+            yield job.to_dict()
+            if job.status in FINISHED:
+                return
+            if job.task is not None:
+                await asyncio.wait({job.task}, timeout=interval)
+            else:
+                await asyncio.sleep(interval)
@@ -0,0 +1,181 @@
+# backend/app/services/ingestion/languages.py
+import importlib
+from typing import Dict, Iterable, Optional
+
+from tree_sitter import Language, Parser
+
+# Value node types that make ``const f = () => ...`` a function definition
+_JS_FUNCTION_VALUES = ("arrow_function", "function_expression", "function", "generator_function")
+
+
+class LanguageSpec:
+    """
+    How ``CodeIngester`` chunks one language's syntax tree.
+
+    - ``definitions``: node type → construct type it is stored as; anything
+      else at the top level is grouped into ``module_block`` chunks.
+    - ``containers``: definitions whose members (definitions in their
+      ``body``) become chunks of their own once the container is large;
+      the container itself becomes an outline of header and signatures.
+    - ``wrappers``: node type → field holding the definition it wraps
+      (``decorated_definition``, ``export_statement``).
+    - ``declarations``: variable declarations that count as a function
+      definition when the declared value is one of ``function_values``.
+    - ``leading``: comments / attributes kept with the definition that
+      follows them directly.
+    - ``docstrings``: the docstring is the body's first string (Python);
+      otherwise the leading comments are.
+    - ``elision``: appended to a member signature in an outline.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        module: str,
+        definitions: Dict[str, str],
+        containers: Iterable[str] = (),
+        wrappers: Optional[Dict[str, str]] = None,
+        declarations: Iterable[str] = (),
+        function_values: Iterable[str] = (),
+        leading: Iterable[str] = ("comment",),
+        docstrings: bool = False,
+        elision: str = "{ ... }",
+        loader: str = "language"
+    ):
+        self.name = name
+        self.module = module
+        self.loader = loader
+        self.definitions = definitions
+        self.containers = set(containers)
+        self.wrappers = wrappers or {}
+        self.declarations = set(declarations)
+        self.function_values = set(function_values)
+        self.leading = set(leading)
+        self.docstrings = docstrings
+        self.elision = elision
+
+
+_JAVASCRIPT_DEFINITIONS = {
+    "function_declaration": "function_definition",
+    "generator_function_declaration": "function_definition",
+    "class_declaration": "class_definition",
+    "method_definition": "method",
+}
+
+
+def _typescript(loader: str) -> LanguageSpec:
+    # One package, two grammars: .ts and .tsx (JSX)
+    return LanguageSpec(
+        "typescript", "tree_sitter_typescript", loader=loader,
+        definitions={
+            **_JAVASCRIPT_DEFINITIONS,
+            "abstract_class_declaration": "class_definition",
+            "interface_declaration": "type_definition",
+            "type_alias_declaration": "type_definition",
+            "enum_declaration": "type_definition",
+        },
+        containers=("class_declaration", "abstract_class_declaration"),
+        wrappers={"export_statement": "declaration"},
+        declarations=("lexical_declaration", "variable_declaration"),
+        function_values=_JS_FUNCTION_VALUES
+    )
+
+
+LANGUAGES: Dict[str, LanguageSpec] = {
+    "python": LanguageSpec(
+        "python", "tree_sitter_python",
+        definitions={"function_definition": "function_definition", "class_definition": "class_definition"},
+        containers=("class_definition",),
+        wrappers={"decorated_definition": "definition"},
+        docstrings=True,
+        elision="..."
+    ),
+    "javascript": LanguageSpec(
+        "javascript", "tree_sitter_javascript",
+        definitions=_JAVASCRIPT_DEFINITIONS,
+        containers=("class_declaration",),
+        wrappers={"export_statement": "declaration"},
+        declarations=("lexical_declaration", "variable_declaration"),
+        function_values=_JS_FUNCTION_VALUES
+    ),
+    "typescript": _typescript("language_typescript"),
+    "tsx": _typescript("language_tsx"),
+    "go": LanguageSpec(
+        "go", "tree_sitter_go",
+        definitions={
+            "function_declaration": "function_definition",
+            "method_declaration": "method",
+            "type_declaration": "type_definition",
+        }
+    ),
+    "rust": LanguageSpec(
+        "rust", "tree_sitter_rust",
+        definitions={
+            "function_item": "function_definition",
+            "struct_item": "type_definition",
+            "enum_item": "type_definition",
+            "union_item": "type_definition",
+            "type_item": "type_definition",
+            "trait_item": "type_definition",
+            "impl_item": "class_definition",
+            "mod_item": "module_definition",
+            "macro_definition": "macro_definition",
+        },
+        containers=("impl_item", "trait_item", "mod_item"),
+        leading=("line_comment", "block_comment", "attribute_item")
+    ),
+    "java": LanguageSpec(
+        "java", "tree_sitter_java",
+        definitions={
+            "class_declaration": "class_definition",
+            "enum_declaration": "class_definition",
+            "record_declaration": "class_definition",
+            "interface_declaration": "type_definition",
+            "annotation_type_declaration": "type_definition",
+            "method_declaration": "method",
+            "constructor_declaration": "method",
+        },
+        containers=("class_declaration", "enum_declaration", "record_declaration", "interface_declaration"),
+        leading=("line_comment", "block_comment")
+    ),
+}
+
+EXTENSIONS = {
+    ".py": "python",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".ts": "typescript",
+    ".tsx": "tsx",
+    ".go": "go",
+    ".rs": "rust",
+    ".java": "java",
+}
+
+# Per process: grammars are imported on first use, so startup (and each
+# parser pool worker) only pays for the languages a repository contains
+_parsers: Dict[str, Optional[Parser]] = {}
+
+
+def spec_for(suffix: str) -> Optional[LanguageSpec]:
+    key = EXTENSIONS.get(suffix)
+    return LANGUAGES[key] if key else None
+
+
+def parser_for(suffix: str) -> Optional[Parser]:
+    """
+    Parser for files with ``suffix``, or ``None`` when no grammar is
+    registered or its package is not installed (line windows are used).
+    """
+    key = EXTENSIONS.get(suffix)
+    if key is None:
+        return None
+    if key not in _parsers:
+        spec = LANGUAGES[key]
+        try:
+            module = importlib.import_module(spec.module)
+            _parsers[key] = Parser(Language(getattr(module, spec.loader)()))
+        except (ImportError, AttributeError, TypeError, ValueError) as e:
+            print(f"⚠️ [Ingester] No {key} grammar ({spec.module}: {e}), chunking {suffix} files by lines")
+            _parsers[key] = None
+    return _parsers[key]
+
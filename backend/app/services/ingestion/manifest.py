@@ -0,0 +1,67 @@
+# backend/app/services/ingestion/manifest.py
+import json
+import os
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+
+class IngestionManifest:
+    """
+    Per-workspace record of what has been ingested:
+    relative file path → size, mtime, content hash (git blob id), chunk ids
+    and their line ranges.
+
+    Lets re-ingestion skip unchanged files without reading them, re-chunk
+    only modified files and delete chunks of changed or removed files.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        # Commit the workspace was last ingested at by a git-aware ingestion
+        # (None after a plain walk, or when the worktree was dirty)
+        self.commit: Optional[str] = None
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.files = data.get("files", {})
+            self.commit = data.get("commit")
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        return self.files.get(file_path)
+
+    def is_unchanged(self, file_path: str, size: int, mtime_ns: int) -> bool:
+        """True when size and mtime match the last ingestion (no read needed)."""
+        entry = self.files.get(file_path)
+        return entry is not None and entry["size"] == size and entry["mtime_ns"] == mtime_ns
+
+    def update(
+        self,
+        file_path: str,
+        size: int,
+        mtime_ns: int,
+        content_hash: str,
+        chunk_ids: Optional[List[str]] = None,
+        chunk_lines: Optional[List[List[int]]] = None
+    ):
+        """``chunk_lines`` holds each chunk's ``[line_start, line_end]``, in ``chunk_ids`` order."""
+        entry = self.files.setdefault(file_path, {"chunk_ids": []})
+        entry.update({"size": size, "mtime_ns": mtime_ns, "content_hash": content_hash})
+        if chunk_ids is not None:
+            entry["chunk_ids"] = chunk_ids
+            entry["chunk_lines"] = chunk_lines or []
+
+    def remove(self, file_path: str) -> List[str]:
+        """Forget a file; returns its chunk ids."""
+        entry = self.files.pop(file_path, None)
+        return entry["chunk_ids"] if entry else []
+
+    def save(self, files: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Write the manifest atomically (``files``: a copy to write from another thread)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Per-thread temp file: a checkpoint may still be writing when the final save starts
+        tmp = self.path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"version": 1, "commit": self.commit, "files": self.files if files is None else files}, f)
+        os.replace(tmp, self.path)
@@ -0,0 +1,470 @@
+# backend/app/services/ingestion/pipeline.py
+import asyncio
+import itertools
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from app.config import get_settings
+from app.services.ingestion.code_ingester import CodeIngester
+from app.services.ingestion.git_source import GitChangeSet
+from app.services.ingestion.manifest import IngestionManifest
+from app.services.ingestion.watcher import PathChangeSet
+from app.services.ingestion.walker import RepositoryWalker
+
+ChangeSet = Union[GitChangeSet, PathChangeSet]
+_DONE = object()  # end-of-stream marker, one per stage worker
+
+# Latest pipeline per workspace, for /metrics
+_pipelines: Dict[str, "IngestionPipeline"] = {}
+
+
+def pipeline_metrics() -> Dict[str, Any]:
+    """Stage metrics of the latest (or running) ingestion of each workspace."""
+    return {workspace_id: pipeline.metrics() for workspace_id, pipeline in _pipelines.items()}
+
+
+class StageMetrics:
+    """
+    Throughput, busy time and input-queue occupancy of one pipeline stage.
+    Time spent waiting for room in the next stage's queue counts as
+    blocked, not busy, so back-pressure does not look like work.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue: Optional[asyncio.Queue]):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._occupancy_sum = 0
+        self._occupancy_samples = 0
+        self.max_queued = 0
+
+    def sample_queue(self):
+        if self.queue is not None:
+            size = self.queue.qsize()
+            self._occupancy_sum += size
+            self._occupancy_samples += 1
+            self.max_queued = max(self.max_queued, size)
+
+    def record(self, seconds: float, items: int = 1):
+        self.busy_seconds += seconds
+        self.items += items
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = ((self.finished or time.perf_counter()) - self.started) if self.started else 0.0
+        return {
+            "concurrency": self.concurrency,
+            "items": self.items,
+            "items_per_second": round(self.items / elapsed, 2) if elapsed > 0 else 0.0,
+            "busy_seconds": round(self.busy_seconds - self.blocked_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            # Share of the stage's worker time spent working: ~1.0 marks the bottleneck
+            "utilization": round(
+                (self.busy_seconds - self.blocked_seconds) / (elapsed * self.concurrency), 3
+            ) if elapsed > 0 else 0.0,
+            "queue": None if self.queue is None else {
+                "size": self.queue.qsize(),
+                "capacity": self.queue.maxsize,
+                "max": self.max_queued,
+                "mean": round(self._occupancy_sum / self._occupancy_samples, 2) if self._occupancy_samples else 0.0
+            },
+            "running": self.started is not None and self.finished is None
+        }
+
+
+class IngestionPipeline:
+    """
+    Repository ingestion as concurrent stages joined by bounded queues:
+
+        discover → read → parse → embed → store
+
+    - discover: walks the tree in a thread (``RepositoryWalker``), skipping
+      files whose size / mtime match the manifest; or, for a git-aware
+      ingestion, lists the files whose blob ids changed (``GitChangeSet``)
+    - read: reads and hashes files in threads; touched-but-identical
+      files stop here
+    - parse: chunks files in the ``CodeIngester`` process pool, then does
+      the manifest bookkeeping and groups new chunks into embed batches
+    - embed: embeds batches (``CodebaseVectorStore.embed_code_chunks``)
+    - store: upserts batches and deletes stale chunks, in queue order
+
+    A full queue blocks the stage feeding it, so a slow stage throttles
+    everything upstream instead of buffering the repository in memory.
+    Per-stage metrics show which stage is the bottleneck.
+    """
+
+    DISCOVERY_BATCH = 256  # paths listed per thread hop
+    ERROR_SAMPLES = 100  # failed files kept with their error
+
+    def __init__(
+        self,
+        vector_store,
+        ingester: CodeIngester,
+        workspace_id: str,
+        manifest: IngestionManifest,
+        background: bool = False
+    ):
+        self.settings = get_settings()
+        self.vector_store = vector_store
+        self.ingester = ingester
+        self.workspace_id = workspace_id
+        self.manifest = manifest
+        self.summary = {"files_scanned": 0, "files_skipped": 0,
+                        "added": 0, "changed": 0, "removed": 0, "skipped": 0, "errors": 0, "chunks_ingested": 0, "chunks_embedded": 0, "chunks_deleted": 0}
+
+        size = self.settings.INGEST_QUEUE_SIZE
+        self.queues = {name: asyncio.Queue(maxsize=size) for name in ("read", "parse", "embed", "store")}
+        self.concurrency = {
+            "discover": 1,
+            "read": self.settings.INGEST_READ_CONCURRENCY,
+            "parse": self.ingester.workers * 2,  # keep every parser process busy
+            "embed": self.settings.INGEST_EMBED_CONCURRENCY,
+            "store": self.settings.INGEST_STORE_CONCURRENCY
+        }
+        if background:
+            # Background priority (watcher reindexes): one item per stage at a time,
+            # leaving the parser pool, embedding API and store executor to foreground work
+            self.concurrency = {name: 1 for name in self.concurrency}
+        self.stages = {
+            name: StageMetrics(name, concurrency, self.queues.get(name))
+            for name, concurrency in self.concurrency.items()
+        }
+        self._pending_chunks: List[Dict[str, Any]] = []
+        self.walker: Optional[RepositoryWalker] = None
+        self.changes: Optional[ChangeSet] = None
+        # Manifest entries of parsed files wait here until their deletes and
+        # chunk batches are stored, so a checkpoint never lists unstored chunks
+        self._staged: Dict[str, tuple] = {}
+        self._outstanding: Dict[str, int] = {}
+        self.on_checkpoint: Optional[Callable[[], Awaitable[None]]] = None
+        self._last_checkpoint = time.monotonic()
+        self.errors: List[Dict[str, str]] = []  # first ERROR_SAMPLES failures
+        self.files_total = 0  # files queued for reading or removal so far
+        self.files_done = 0
+        self.discovery_complete = False
+        self.started: Optional[float] = None
+
+    def metrics(self) -> Dict[str, Any]:
+        stages = {name: stage.snapshot() for name, stage in self.stages.items()}
+        active = {name: s for name, s in stages.items() if s["items"]}
+        return {
+            "stages": stages,
+            "bottleneck": max(active, key=lambda name: active[name]["utilization"]) if active else None,
+            "walk": dict(self.walker.stats) if self.walker else None,
+            "summary": dict(self.summary)
+        }
+
+    def progress(self) -> Dict[str, Any]:
+        """Files / chunks done, throughput and (once discovery is complete) ETA."""
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        files_per_second = self.files_done / elapsed if elapsed > 0 else 0.0
+        remaining = self.files_total - self.files_done
+        return {
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "files_skipped_unchanged": self.summary["skipped"],
+            "chunks_done": self.summary["chunks_ingested"],
+            "discovery_complete": self.discovery_complete,
+            "elapsed_seconds": round(elapsed, 3),
+            "files_per_second": round(files_per_second, 2),
+            "chunks_per_second": round(self.summary["chunks_ingested"] / elapsed, 2) if elapsed > 0 else 0.0,
+            "eta_seconds": round(remaining / files_per_second, 1)
+            if self.discovery_complete and files_per_second > 0 else None
+        }
+
+    def _error(self, rel_path: str, error: str):
+        self.summary["errors"] += 1
+        if len(self.errors) < self.ERROR_SAMPLES:
+            self.errors.append({"file_path": rel_path, "error": error})
+        print(f"⚠️ [Ingestion] {rel_path}: {error}")
+
+    # ─────────────────────────────────────────────────────────────
+    # CHECKPOINTS
+    # ─────────────────────────────────────────────────────────────
+
+    def _remove_after_delete(self, rel_path: str):
+        """Store item deleting a removed file's chunks; the manifest forgets it once they are gone."""
+        entry = self.manifest.get(rel_path)
+        self.files_total += 1
+
+        def removed():
+            self.manifest.remove(rel_path)
+            self.files_done += 1
+        return ("delete", entry["chunk_ids"] if entry else [], removed)
+
+    def _stage_entry(self, rel_path: str, entry: tuple, pending_writes: int):
+        self._staged[rel_path] = entry
+        self._outstanding[rel_path] = pending_writes
+        if pending_writes == 0:
+            self._settle(rel_path, 0)
+
+    def _settle(self, rel_path: str, writes: int = 1):
+        """``writes`` store operations of a staged file are done; commit it when none is left."""
+        self._outstanding[rel_path] -= writes
+        if self._outstanding[rel_path] <= 0:
+            del self._outstanding[rel_path]
+            self.manifest.update(*self._staged.pop(rel_path))
+            self.files_done += 1
+
+    async def _maybe_checkpoint(self):
+        """Save the manifest every ``INGEST_CHECKPOINT_INTERVAL`` seconds (it only lists stored chunks)."""
+        interval = self.settings.INGEST_CHECKPOINT_INTERVAL
+        if interval <= 0 or time.monotonic() - self._last_checkpoint < interval:
+            return
+        self._last_checkpoint = time.monotonic()
+        files = {rel_path: dict(entry) for rel_path, entry in self.manifest.files.items()}
+        await asyncio.to_thread(self.manifest.save, files)
+        if self.on_checkpoint is not None:
+            await self.on_checkpoint()
+
+    # ─────────────────────────────────────────────────────────────
+    # ORCHESTRATION
+    # ─────────────────────────────────────────────────────────────
+
+    async def run(self, repo_path: str, changes: Optional[ChangeSet] = None) -> Dict[str, Any]:
+        """
+        Ingest ``repo_path``; returns the summary (the manifest is updated,
+        not saved). With a change set (``GitChangeSet`` from git metadata,
+        ``PathChangeSet`` from a watcher) the discover stage lists its files
+        instead of walking the tree.
+        """
+        _pipelines[self.workspace_id] = self
+        self.changes = changes
+        self.started = time.monotonic()
+        workers = {
+            "read": self._stage("read", lambda item: self._read(repo_path, item)),
+            "parse": self._stage("parse", lambda item: self._parse(repo_path, item)),
+            "embed": self._stage("embed", self._embed),
+            "store": self._stage("store", self._store)
+        }
+
+        async def drive():
+            await self._discover(repo_path)
+            for name in ("read", "parse", "embed", "store"):
+                for _ in range(self.concurrency[name]):
+                    await self.queues[name].put(_DONE)
+                await workers[name]
+                if name == "parse" and self._pending_chunks:
+                    await self.queues["embed"].put(self._pending_chunks)
+                    self._pending_chunks = []
+
+        tasks = [asyncio.ensure_future(drive()), *workers.values()]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()  # re-raise a failed stage
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        self.manifest.commit = changes.commit if changes is not None else None
+        return self.summary
+
+    async def _emit(self, stage: str, queue: str, item):
+        """Hand ``item`` to the next stage, timing the wait as ``stage`` being blocked."""
+        started = time.perf_counter()
+        await self.queues[queue].put(item)
+        self.stages[stage].blocked_seconds += time.perf_counter() - started
+
+    def _stage(self, name: str, handler: Callable[[Any], Awaitable[int]]) -> asyncio.Future:
+        """Start ``concurrency`` workers feeding ``handler`` from the stage's queue."""
+        queue, metrics = self.queues[name], self.stages[name]
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    return
+                metrics.started = metrics.started or time.perf_counter()
+                metrics.sample_queue()
+                started = time.perf_counter()
+                items = await handler(item)
+                metrics.record(time.perf_counter() - started, items)
+
+        async def stage():
+            await asyncio.gather(*[worker() for _ in range(self.concurrency[name])])
+            self.stages[name].finished = time.perf_counter()
+
+        return asyncio.ensure_future(stage())
+
+    # ─────────────────────────────────────────────────────────────
+    # STAGES
+    # ─────────────────────────────────────────────────────────────
+
+    async def _discover(self, repo_path: str):
+        metrics = self.stages["discover"]
+        metrics.started = time.perf_counter()
+        self.walker = self.ingester.walker(repo_path)
+        if self.changes is not None:
+            return await self._discover_listed(repo_path)
+        paths = self.walker.walk(skip_sniff=self._unchanged)
+        seen = set()
+        while True:
+            started = time.perf_counter()
+            batch = await asyncio.to_thread(list, itertools.islice(paths, self.DISCOVERY_BATCH))
+            for file_path, rel_path, stat in batch:
+                seen.add(rel_path)
+                if self._unchanged(rel_path, stat):
+                    self.summary["skipped"] += 1
+                else:
+                    self.files_total += 1
+                    await self._emit("discover", "read", (file_path, rel_path, None))
+            metrics.record(time.perf_counter() - started, len(batch))
+            self.summary["files_scanned"] = self.walker.stats["files_scanned"]
+            self.summary["files_skipped"] = self.walker.skipped()
+            if not batch:
+                break
+
+        started = time.perf_counter()
+        for rel_path in list(self.manifest.files):
+            if rel_path not in seen:
+                self.summary["removed"] += 1
+                await self._emit("discover", "store", self._remove_after_delete(rel_path))
+        metrics.record(time.perf_counter() - started, 0)
+        metrics.finished = time.perf_counter()
+        self.discovery_complete = True
+
+    async def _discover_listed(self, repo_path: str):
+        metrics = self.stages["discover"]
+        changes = self.changes
+        started = time.perf_counter()
+        await asyncio.to_thread(changes.plan, self.manifest.files, self.walker.admit)
+        previous = self.manifest.commit
+        if changes.from_commit is not None and previous and not previous.startswith(changes.from_commit):
+            print(f"⚠️ [Ingestion] {self.workspace_id} was ingested at {previous[:12]}, "
+                  f"not {changes.from_commit}: files changed in between are missed")
+        self.summary["skipped"] += changes.unchanged
+        self.summary["files_scanned"] = self.walker.stats["files_scanned"]
+        self.summary["files_skipped"] = self.walker.skipped()
+        metrics.record(time.perf_counter() - started, 0)
+
+        self.files_total += len(changes.files)
+        for rel_path, blob in changes.files:
+            await self._emit("discover", "read", (Path(repo_path) / rel_path, rel_path, blob))
+        for rel_path in changes.removed:
+            self.summary["removed"] += 1
+            await self._emit("discover", "store", self._remove_after_delete(rel_path))
+        metrics.items += len(changes.files)
+        metrics.finished = time.perf_counter()
+        self.discovery_complete = True
+
+    def _read_listed(self, file_path: Path, rel_path: str, blob: Optional[str], known_hash: Optional[str]):
+        """Read a file of the change set: from the git object store, or from the worktree."""
+        if self.changes.from_objects:
+            raw = self.changes.repo.read_blob(blob)
+            size, mtime_ns = len(raw), 0  # no worktree stat: a later walk re-hashes once
+        else:
+            stat = file_path.stat()
+            raw = file_path.read_bytes()
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        if not self.walker.admit_content(raw):
+            return None, None
+        return self.ingester.file_record(rel_path, raw, size, mtime_ns, known_hash)
+
+    def _unchanged(self, rel_path: str, stat) -> bool:
+        return self.manifest.is_unchanged(rel_path, stat.st_size, stat.st_mtime_ns)
+
+    async def _read(self, repo_path: str, item) -> int:
+        file_path, rel_path, blob = item
+        entry = self.manifest.get(rel_path)
+        known_hash = entry["content_hash"] if entry else None
+        try:
+            if self.changes is not None:
+                file_record, content = await asyncio.to_thread(self._read_listed, file_path, rel_path, blob, known_hash)
+            else:
+                file_record, content = await asyncio.to_thread(self.ingester.read_file, file_path, repo_path, known_hash)
+        except Exception as e:
+            self._error(rel_path, str(e))
+            self.files_done += 1
+            return 1
+        if file_record is None:
+            # Binary or too large (only known once read)
+            self.summary["files_skipped"] = self.walker.skipped()
+            self.files_done += 1
+            if entry:
+                self.summary["removed"] += 1
+                await self._emit("read", "store", self._remove_after_delete(rel_path))
+        elif content is None:
+            # Touched but identical: refresh stat info only
+            self.summary["skipped"] += 1
+            self.files_done += 1
+            self.manifest.update(rel_path, file_record["size"], file_record["mtime_ns"], file_record["content_hash"])
+        else:
+            await self._emit("read", "parse", (file_path, file_record, content))
+        return 1
+
+    async def _parse(self, repo_path: str, item) -> int:
+        file_path, file_record, content = item
+        records = await self.ingester.parse_source(file_path, repo_path, content)
+        chunks = [r for r in records if r.get("type") != "error"]
+        if len(chunks) < len(records):
+            # The manifest keeps the file's previous entry, so the next ingestion retries it
+            self._error(file_record["file_path"], next(r["error"] for r in records if r.get("type") == "error"))
+            self.files_done += 1
+            return 1
+
+        rel_path = file_record["file_path"]
+        old_entry = self.manifest.get(rel_path)
+        old_ids = set(old_entry["chunk_ids"]) if old_entry else set()
+        old_lines = dict(zip(old_entry["chunk_ids"], old_entry.get("chunk_lines", []))) if old_entry else {}
+        new_ids = []
+        new_lines = []
+        new_chunks = []
+        for chunk in chunks:
+            chunk_id = self.vector_store.chunk_id(chunk)
+            lines = [chunk.get("line_start"), chunk.get("line_end")]
+            new_ids.append(chunk_id)
+            new_lines.append(lines)
+            if chunk_id not in old_ids:
+                new_chunks.append(chunk)
+            elif old_lines.get(chunk_id) != lines:
+                # Same definition moved within the file: its content is stored,
+                # but the occurrence must be recorded again at its new lines
+                new_chunks.append(chunk)
+            elif chunk.get("parent_hash") and self.vector_store.parent_id(chunk) not in old_ids:
+                # Unchanged member of a changed outline: its content is stored, but
+                # the occurrence must be recorded again to name the new parent
+                new_chunks.append(chunk)
+
+        stale = old_ids - set(new_ids)
+        self._stage_entry(
+            rel_path,
+            (rel_path, file_record["size"], file_record["mtime_ns"], file_record["content_hash"], new_ids, new_lines),
+            len(new_chunks) + (1 if stale else 0)
+        )
+        if stale:
+            await self._emit("parse", "store", ("delete", sorted(stale), lambda: self._settle(rel_path)))
+        self._pending_chunks.extend(new_chunks)
+        self.summary[file_record["status"]] += 1
+
+        while len(self._pending_chunks) >= self.settings.INGEST_EMBED_BATCH:
+            batch = self._pending_chunks[:self.settings.INGEST_EMBED_BATCH]
+            self._pending_chunks = self._pending_chunks[self.settings.INGEST_EMBED_BATCH:]
+            await self._emit("parse", "embed", batch)
+        return 1
+
+    async def _embed(self, chunks: List[Dict[str, Any]]) -> int:
+        batch = await self.vector_store.embed_code_chunks(self.workspace_id, chunks)
+        await self._emit("embed", "store", ("store", batch))
+        return len(chunks)
+
+    async def _store(self, item) -> int:
+        if item[0] == "delete":
+            _, ids, on_done = item
+            self.summary["chunks_deleted"] += await self.vector_store.delete_chunks(self.workspace_id, ids)
+            on_done()
+            await self._maybe_checkpoint()
+            return 0
+        _, batch = item
+        result = await self.vector_store.store_code_chunks(self.workspace_id, batch)
+        self.summary["chunks_ingested"] += result["ingested_count"]
+        self.summary["chunks_embedded"] += result["embedded_count"]
+        for chunk in batch["chunks"]:
+            self._settle(chunk["file_path"])
+        await self._maybe_checkpoint()
+        return result["ingested_count"]
@@ -0,0 +1,302 @@
+# backend/app/services/ingestion/walker.py
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+GITIGNORE = ".gitignore"
+BINARY_SNIFF_BYTES = 8000  # same window git uses to tell text from binary
+
+
+def looks_binary(head: bytes) -> bool:
+    return b"\0" in head
+
+
+def _glob_to_regex(glob: str) -> str:
+    """Regex body for one gitignore glob (``**``, ``*``, ``?``, ``[...]``, ``\\x``)."""
+    out, i, n = [], 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if c == "*":
+            if glob.startswith("**", i):
+                i += 2
+                if i < n and glob[i] == "/":
+                    out.append("(?:.*/)?")  # "**/": zero or more directories
+                    i += 1
+                else:
+                    out.append(".*")
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            start = i + 1
+            if start < n and glob[start] in "!^":
+                start += 1
+            if start < n and glob[start] == "]":
+                start += 1  # a leading "]" is part of the set
+            end = glob.find("]", start)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreMatcher:
+    """
+    Gitignore-style patterns compiled once into regexes over ``/``-separated
+    paths relative to the directory the patterns belong to.
+
+    Supports comments, ``!`` negation (the last matching pattern wins),
+    trailing ``/`` (directories only), anchoring (a ``/`` anywhere but at the
+    end) and ``**``. Without negations every pattern is folded into one
+    alternation, so a path costs one regex search per kind (file / dir).
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        # (regex, negated, dir_only) in file order
+        self.rules: List[Tuple[str, bool, bool]] = []
+        for line in patterns:
+            rule = self._compile_line(line)
+            if rule is not None:
+                self.rules.append(rule)
+
+        self._negations = any(negated for _, negated, _ in self.rules)
+        if self._negations:
+            self._ordered = [(re.compile(regex), negated, dir_only) for regex, negated, dir_only in self.rules]
+        else:
+            self._any = self._union(regex for regex, _, dir_only in self.rules if not dir_only)
+            self._dirs = self._union(regex for regex, _, _ in self.rules)
+
+    @classmethod
+    def from_file(cls, path: str) -> "IgnoreMatcher":
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            return cls(f.read().splitlines())
+
+    @staticmethod
+    def _union(regexes: Iterable[str]) -> Optional["re.Pattern"]:
+        regexes = list(regexes)
+        return re.compile("|".join(f"(?:{r})" for r in regexes)) if regexes else None
+
+    @staticmethod
+    def _compile_line(line: str) -> Optional[Tuple[str, bool, bool]]:
+        line = line.rstrip("\n\r")
+        # Trailing spaces are dropped unless escaped
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+        if not line or line.startswith("#"):
+            return None
+
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+
+        if "/" in line:
+            # Anchored to the .gitignore's directory
+            body = _glob_to_regex(line.lstrip("/"))
+            regex = f"^{body}$"
+        else:
+            regex = f"^(?:.*/)?{_glob_to_regex(line)}$"
+        return regex, negated, dir_only
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """``True`` if ignored, ``False`` if re-included by ``!``, ``None`` if no pattern matches."""
+        if not self._negations:
+            pattern = self._dirs if is_dir else self._any
+            return True if pattern is not None and pattern.search(rel_path) else None
+        for regex, negated, dir_only in reversed(self._ordered):
+            if dir_only and not is_dir:
+                continue
+            if regex.search(rel_path):
+                return not negated
+        return None
+
+
+class RepositoryWalker:
+    """
+    ``os.scandir`` walk of a repository that prunes ignored directories
+    before descending into them.
+
+    Ignore rules are the ``patterns`` given (relative to the root) plus
+    every ``.gitignore`` found on the way, each scoped to its directory
+    with the deepest one taking precedence. Files are then filtered by
+    extension and ``max_file_size`` and sniffed for binary content (a NUL
+    byte in the first ``BINARY_SNIFF_BYTES``). ``stats`` counts what was
+    scanned and why files were skipped.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        patterns: Optional[List[str]] = None,
+        extensions: Optional[Iterable[str]] = None,
+        max_file_size: int = 0,
+        read_gitignore: bool = True
+    ):
+        self.root = str(root)
+        self.matcher = IgnoreMatcher(patterns or [])
+        self.extensions = set(extensions) if extensions is not None else None
+        self.max_file_size = max_file_size
+        self.read_gitignore = read_gitignore
+        self.stats: Dict[str, int] = {
+            "dirs_scanned": 0,
+            "dirs_pruned": 0,
+            "files_scanned": 0,
+            "files_yielded": 0,
+            "skipped_ignored": 0,
+            "skipped_extension": 0,
+            "skipped_too_large": 0,
+            "skipped_binary": 0,
+            "skipped_unreadable": 0
+        }
+        self._dir_verdicts: Dict[str, bool] = {}
+
+    @staticmethod
+    def _ignored(matchers: Tuple[Tuple[str, IgnoreMatcher], ...], rel_path: str, is_dir: bool) -> bool:
+        for base, matcher in matchers:  # deepest first
+            if base and not rel_path.startswith(base):
+                continue
+            verdict = matcher.match(rel_path[len(base):], is_dir)
+            if verdict is not None:
+                return verdict
+        return False
+
+    @staticmethod
+    def is_binary(path: str) -> bool:
+        with open(path, "rb") as f:
+            return looks_binary(f.read(BINARY_SNIFF_BYTES))
+
+    def excluded(self, rel_path: str) -> Optional[str]:
+        """
+        Why a path listed by another source (e.g. ``git ls-files``) would
+        be skipped (``"skipped_extension"`` / ``"skipped_ignored"``), or
+        ``None``. Its directories are checked too. Only the walker's own
+        patterns apply: git does not ignore tracked files.
+        """
+        if self.extensions is not None and os.path.splitext(rel_path)[1] not in self.extensions:
+            return "skipped_extension"
+        matchers = (("", self.matcher),)
+        parts = rel_path.split("/")
+        for depth in range(1, len(parts)):
+            directory = "/".join(parts[:depth])
+            if directory not in self._dir_verdicts:
+                self._dir_verdicts[directory] = self._ignored(matchers, directory, True)
+            if self._dir_verdicts[directory]:
+                return "skipped_ignored"
+        if self._ignored(matchers, rel_path, False):
+            return "skipped_ignored"
+        return None
+
+    def admit(self, rel_path: str) -> bool:
+        """``excluded`` with the outcome counted in ``stats``."""
+        self.stats["files_scanned"] += 1
+        reason = self.excluded(rel_path)
+        self.stats[reason or "files_yielded"] += 1
+        return reason is None
+
+    def admit_content(self, data: bytes) -> bool:
+        """Size and binary checks for content read from another source."""
+        if self.max_file_size and len(data) > self.max_file_size:
+            reason = "skipped_too_large"
+        elif looks_binary(data[:BINARY_SNIFF_BYTES]):
+            reason = "skipped_binary"
+        else:
+            return True
+        self.stats[reason] += 1
+        self.stats["files_yielded"] -= 1
+        return False
+
+    def walk(
+        self,
+        skip_sniff: Optional[Callable[[str, os.stat_result], bool]] = None
+    ) -> Iterator[Tuple[Path, str, os.stat_result]]:
+        """
+        Yield ``(path, rel_path, stat)`` of every file kept, in directory
+        order. ``skip_sniff(rel_path, stat)`` returning true spares the
+        binary sniff (e.g. the manifest already knows the file unchanged).
+        """
+        stats = self.stats
+        stack: List[Tuple[str, str, Tuple[Tuple[str, IgnoreMatcher], ...]]] = [
+            (self.root, "", (("", self.matcher),))
+        ]
+        while stack:
+            dir_path, rel_dir, matchers = stack.pop()
+            try:
+                with os.scandir(dir_path) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                stats["skipped_unreadable"] += 1
+                continue
+            stats["dirs_scanned"] += 1
+
+            if self.read_gitignore and any(e.name == GITIGNORE for e in entries):
+                try:
+                    local = IgnoreMatcher.from_file(os.path.join(dir_path, GITIGNORE))
+                    if local.rules:
+                        matchers = ((rel_dir, local),) + matchers
+                except OSError:
+                    pass
+
+            subdirs = []
+            for entry in entries:
+                rel_path = rel_dir + entry.name
+                try:
+                    # Symlinked directories are not followed (no cycles, no escaping the repo)
+                    if entry.is_dir(follow_symlinks=False):
+                        if self._ignored(matchers, rel_path, True):
+                            stats["dirs_pruned"] += 1
+                        else:
+                            subdirs.append((entry.path, rel_path + "/", matchers))
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    stats["skipped_unreadable"] += 1
+                    continue
+
+                stats["files_scanned"] += 1
+                if self.extensions is not None and os.path.splitext(entry.name)[1] not in self.extensions:
+                    stats["skipped_extension"] += 1
+                    continue
+                if self._ignored(matchers, rel_path, False):
+                    stats["skipped_ignored"] += 1
+                    continue
+                try:
+                    stat = entry.stat()
+                    if self.max_file_size and stat.st_size > self.max_file_size:
+                        stats["skipped_too_large"] += 1
+                        continue
+                    if not (skip_sniff and skip_sniff(rel_path, stat)) and self.is_binary(entry.path):
+                        stats["skipped_binary"] += 1
+                        continue
+                except OSError:
+                    stats["skipped_unreadable"] += 1
+                    continue
+
+                stats["files_yielded"] += 1
+                yield Path(entry.path), rel_path, stat
+
+            # Reversed so the stack pops subdirectories in name order
+            stack.extend(reversed(subdirs))
+
+    def skipped(self) -> int:
+        return sum(count for key, count in self.stats.items() if key.startswith("skipped_"))
@@ -0,0 +1,251 @@
+# backend/app/services/ingestion/watcher.py
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import get_settings
+from app.services.ingestion.walker import RepositoryWalker
+
+try:
+    import watchfiles  # inotify / FSEvents / ReadDirectoryChangesW, installed with uvicorn[standard]
+except ImportError:
+    watchfiles = None
+
+# (workspace_id, repo_path, changed relative paths) → ingestion summary
+Reindexer = Callable[[str, str, Set[str]], Awaitable[Dict[str, Any]]]
+
+
+class PathChangeSet:
+    """
+    Change set of an explicit list of paths (as reported by a watcher),
+    with the interface the ingestion pipeline expects of ``GitChangeSet``:
+    existing admitted files are re-read from the worktree, vanished ones
+    (or everything under a vanished directory) are removed.
+    """
+
+    from_commit = None
+    from_objects = False
+
+    def __init__(self, repo_path: str, paths: Iterable[str]):
+        self.repo_path = repo_path
+        self.paths = set(paths)
+        self.commit: Optional[str] = None  # the worktree no longer matches a commit
+        self.files: List[Tuple[str, Optional[str]]] = []
+        self.removed: List[str] = []
+        self.unchanged = 0
+
+    def plan(self, manifest_files: Dict[str, Dict], admit: Callable[[str], bool]) -> "PathChangeSet":
+        removed = set()
+        for rel_path in sorted(self.paths):
+            if os.path.isfile(os.path.join(self.repo_path, rel_path)):
+                if admit(rel_path):
+                    self.files.append((rel_path, None))
+                elif rel_path in manifest_files:
+                    removed.add(rel_path)  # now ignored
+            else:
+                prefix = rel_path.rstrip("/") + "/"
+                removed.update(p for p in manifest_files if p == rel_path or p.startswith(prefix))
+        self.removed = sorted(removed)
+        return self
+
+
+class WorkspaceWatcher:
+    """
+    Watches one workspace's repository and reindexes the files that change.
+
+    Change events come from ``watchfiles`` (inotify on Linux), or from
+    polling the tree every ``WATCH_POLL_INTERVAL`` when it is unavailable,
+    fails, or ``WATCH_FORCE_POLLING`` is set. Events are filtered by the
+    walker's ignore / extension rules and coalesced: a batch is reindexed
+    after ``WATCH_DEBOUNCE`` quiet seconds, or ``WATCH_MAX_DELAY`` after its
+    first change. Changes made during a reindex join the next batch.
+
+    Freshness lag is the time from a batch's first change to its reindex
+    finishing; ``staleness_seconds`` is the age of the oldest unindexed change.
+    """
+
+    LAG_SAMPLES = 100
+
+    def __init__(
+        self,
+        workspace_id: str,
+        repo_path: str,
+        walker_factory: Callable[[str], RepositoryWalker],
+        reindex: Reindexer
+    ):
+        self.settings = get_settings()
+        self.workspace_id = workspace_id
+        self.repo_path = str(Path(repo_path).resolve())
+        self.walker_factory = walker_factory
+        self.walker = walker_factory(self.repo_path)  # event filter
+        self.reindex = reindex
+        self.backend = "polling" if watchfiles is None or self.settings.WATCH_FORCE_POLLING else "inotify"
+        self._pending: Set[str] = set()
+        self._first_change: Optional[float] = None
+        self._last_change = 0.0
+        self._wake = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._lags: List[float] = []
+        self.batches = 0
+        self.files_reindexed = 0
+        self.errors = 0
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._watch()), asyncio.create_task(self._drain())]
+
+    async def stop(self):
+        self._stop.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _record(self, rel_paths: Set[str]):
+        if not rel_paths:
+            return
+        now = time.monotonic()
+        self._pending |= rel_paths
+        self._first_change = self._first_change or now
+        self._last_change = now
+        self._wake.set()
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.repo_path).replace(os.sep, "/")
+
+    def _wanted(self, _change, path: str) -> bool:
+        rel_path = self._relative(path)
+        if rel_path.startswith(".."):
+            return False
+        reason = self.walker.excluded(rel_path)
+        # Extension-less paths may be deleted directories
+        return reason is None or (reason == "skipped_extension" and not os.path.splitext(rel_path)[1])
+
+    # ─────────────────────────────────────────────────────────────
+    # EVENT SOURCES
+    # ─────────────────────────────────────────────────────────────
+
+    async def _watch(self):
+        if self.backend == "inotify":
+            try:
+                async for changes in watchfiles.awatch(
+                    self.repo_path,
+                    watch_filter=self._wanted,
+                    stop_event=self._stop,
+                    debounce=int(self.settings.WATCH_DEBOUNCE * 1000),
+                    step=50
+                ):
+                    self._record({self._relative(path) for _, path in changes})
+                return
+            except Exception as e:
+                print(f"⚠️ [Watcher] {self.workspace_id}: native watching failed ({e}), polling instead")
+                self.backend = "polling"
+        await self._poll()
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        walker = self.walker_factory(self.repo_path)
+        return {
+            rel_path: (stat.st_size, stat.st_mtime_ns)
+            for _, rel_path, stat in walker.walk(skip_sniff=lambda *_: True)
+        }
+
+    async def _poll(self):
+        snapshot = await asyncio.to_thread(self._snapshot)
+        while not self._stop.is_set():
+            await asyncio.sleep(self.settings.WATCH_POLL_INTERVAL)
+            current = await asyncio.to_thread(self._snapshot)
+            self._record({
+                rel_path for rel_path in snapshot.keys() | current.keys()
+                if snapshot.get(rel_path) != current.get(rel_path)
+            })
+            snapshot = current
+
+    # ─────────────────────────────────────────────────────────────
+    # DEBOUNCE + REINDEX
+    # ─────────────────────────────────────────────────────────────
+
+    async def _drain(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            if not self._pending:
+                continue
+            while True:
+                # Wait for a quiet period, but not past the batch's deadline
+                deadline = min(
+                    self._last_change + self.settings.WATCH_DEBOUNCE,
+                    self._first_change + self.settings.WATCH_MAX_DELAY
+                )
+                wait = deadline - time.monotonic()
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+
+            paths, first_change = self._pending, self._first_change
+            self._pending, self._first_change = set(), None
+            self._wake.clear()
+            try:
+                await self.reindex(self.workspace_id, self.repo_path, paths)
+            except Exception as e:
+                # Re-queue and retry after a back-off (e.g. the embedding API is down)
+                self.errors += 1
+                print(f"⚠️ [Watcher] {self.workspace_id}: reindex of {len(paths)} files failed, retrying: {e}")
+                self._pending |= paths
+                self._first_change = min(first_change, self._first_change or first_change)
+                self._last_change = time.monotonic()
+                self._wake.set()
+                await asyncio.sleep(self.settings.WATCH_MAX_DELAY)
+                continue
+            self.batches += 1
+            self.files_reindexed += len(paths)
+            self._lags = (self._lags + [time.monotonic() - first_change])[-self.LAG_SAMPLES:]
+
+    def metrics(self) -> Dict[str, Any]:
+        lags = sorted(self._lags)
+        return {
+            "repo_path": self.repo_path,
+            "backend": self.backend,
+            "pending_files": len(self._pending),
+            "staleness_seconds": round(time.monotonic() - self._first_change, 3) if self._first_change else 0.0,
+            "batches": self.batches,
+            "files_reindexed": self.files_reindexed,
+            "errors": self.errors,
+            "freshness_lag_seconds": {
+                "last": round(self._lags[-1], 3) if lags else None,
+                "p50": round(lags[len(lags) // 2], 3) if lags else None,
+                "max": round(lags[-1], 3) if lags else None
+            }
+        }
+
+
+class WatchManager:
+    """Per-workspace watchers (at most one each), started and stopped through the API."""
+
+    def __init__(self, reindex: Reindexer, walker_factory: Callable[[str], RepositoryWalker]):
+        self.reindex = reindex
+        self.walker_factory = walker_factory
+        self.watchers: Dict[str, WorkspaceWatcher] = {}
+
+    async def start(self, workspace_id: str, repo_path: str) -> Dict[str, Any]:
+        if not os.path.isdir(repo_path):
+            raise ValueError(f"Not a directory: {repo_path}")
+        await self.stop(workspace_id)
+        watcher = WorkspaceWatcher(workspace_id, repo_path, self.walker_factory, self.reindex)
+        watcher.start()
+        self.watchers[workspace_id] = watcher
+        print(f"👀 [Watcher] Watching {watcher.repo_path} for workspace {workspace_id} ({watcher.backend})")
+        return watcher.metrics()
+
+    async def stop(self, workspace_id: str) -> bool:
+        watcher = self.watchers.pop(workspace_id, None)
+        if watcher is not None:
+            await watcher.stop()
+        return watcher is not None
+
+    async def stop_all(self):
+        for workspace_id in list(self.watchers):
+            await self.stop(workspace_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {workspace_id: watcher.metrics() for workspace_id, watcher in self.watchers.items()}
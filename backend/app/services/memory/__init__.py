@@ -1,3 +1,4 @@
 # backend/app/services/memory/__init__.py
 from .vector_store import CodebaseVectorStore
-from .conversation_store import ConversationStore
\ No newline at end of file
+from .conversation_store import ConversationStore
+from .embedding_store import MmapEmbeddingStore
\ No newline at end of file
@@ -0,0 +1,40 @@
+# backend/app/services/memory/_locking.py
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single writer only
+    fcntl = None
+
+
+def synchronized(method):
+    """Serialise calls on one instance (its ``_thread_lock``) across the store executor's threads."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._thread_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def lock_file(path):
+    """Exclusive advisory lock on ``path`` serialising writers across processes; pass the result to ``unlock_file``."""
+    fh = open(path, "a+")
+    if fcntl is not None:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+    return fh
+
+
+def unlock_file(fh):
+    if fcntl is not None:
+        fcntl.flock(fh, fcntl.LOCK_UN)
+    fh.close()
+
+
+@contextmanager
+def file_lock(path):
+    fh = lock_file(path)
+    try:
+        yield
+    finally:
+        unlock_file(fh)
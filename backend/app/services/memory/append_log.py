@@ -0,0 +1,171 @@
+# backend/app/services/memory/append_log.py
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from app.services.memory._locking import file_lock, synchronized
+
+
+class AppendLog:
+    """
+    Base of the per-workspace indexes persisted as an append-only JSONL log
+    of records (``LexicalIndex``, ``MetadataIndex``, ``ChunkReferences``),
+    replayed lazily into memory and compacted when mostly superseded.
+
+    Several handles may share one log (other processes, or a handle opened
+    again after ``HandleCache`` evicted the previous one):
+
+    - the first line names the log's generation; compaction (or recreating
+      the file) starts a new one, so a handle that sees another generation
+      replays from scratch instead of seeking into the middle of a record;
+    - writers hold an exclusive ``flock`` on ``<log>.lock`` and replay the
+      log tail first, so appends of several handles never interleave.
+
+    Subclasses keep their in-memory state in ``_reset_state``, apply one
+    record in ``_apply`` and list the live records in ``_live_records``.
+    """
+
+    COMPACT_MIN_RECORDS = 1000  # log records kept before compaction is considered
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+        self._thread_lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._reset_state()
+        self._generation = None
+        self._log_records = 0
+        self._read_bytes = 0
+
+    def _reset_state(self):
+        raise NotImplementedError
+
+    def _apply(self, record: Dict[str, Any]):
+        raise NotImplementedError
+
+    def _live_records(self) -> Iterable[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def _live_count(self) -> int:
+        raise NotImplementedError
+
+    # ─────────────────────────────────────────────────────────────
+    # READING
+    # ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> bytes:
+        return json.dumps(record).encode("utf-8") + b"\n"
+
+    @staticmethod
+    def _generation_of(first_line: bytes):
+        """Generation named by a log's first line (``None`` for logs written before generations)."""
+        if not first_line.endswith(b"\n"):
+            return None
+        record = json.loads(first_line)
+        return record["generation"] if record["op"] == "log" else None
+
+    def _refresh(self):
+        """Replay log records written since the last read (possibly by another handle)."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            if self._read_bytes:
+                self._reset()  # log removed elsewhere
+            return
+        with f:
+            generation = self._generation_of(f.readline())
+            size = os.fstat(f.fileno()).st_size
+            if generation != self._generation or size < self._read_bytes:
+                # Compacted or recreated elsewhere: replay from scratch
+                self._reset()
+                self._generation = generation
+            if size == self._read_bytes:
+                return
+            f.seek(self._read_bytes)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partially written record
+                record = json.loads(line)
+                if record["op"] != "log":
+                    self._apply(record)
+                    self._log_records += 1
+                self._read_bytes += len(line)
+
+    # ─────────────────────────────────────────────────────────────
+    # WRITING
+    # ─────────────────────────────────────────────────────────────
+
+    @contextmanager
+    def _writing(self):
+        """Exclusive writer section; records other handles appended are replayed first."""
+        with file_lock(self._lock_path):
+            self._refresh()
+            if self._generation is None and self._read_bytes:
+                self._compact_locked()  # log from before generations: give it one
+            yield
+
+    def _append(self, records: List[Dict[str, Any]]):
+        """Append records (inside ``_writing``); compacts once the log is mostly superseded."""
+        if not records:
+            return
+        with open(self.path, "ab") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size > self._read_bytes:
+                # Left by a writer that died mid-record
+                f.truncate(self._read_bytes)
+                f.seek(self._read_bytes)
+            if self._read_bytes == 0:
+                self._generation = uuid.uuid4().hex
+                header = self._encode({"op": "log", "generation": self._generation})
+                f.write(header)
+                self._read_bytes += len(header)
+            data = b"".join(self._encode(record) for record in records)
+            f.write(data)
+            self._read_bytes += len(data)
+        self._log_records += len(records)
+        if self._log_records > 2 * max(self._live_count(), self.COMPACT_MIN_RECORDS):
+            self._compact_locked()
+
+    def _write_log(self, lines: Iterable[bytes]) -> int:
+        """Atomically replace the log with encoded ``lines`` under a new generation; returns their count."""
+        generation = uuid.uuid4().hex
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        count = 0
+        with open(tmp, "wb") as f:
+            f.write(self._encode({"op": "log", "generation": generation}))
+            for line in lines:
+                f.write(line)
+                count += 1
+        os.replace(tmp, self.path)
+        self._generation = generation
+        self._read_bytes = os.path.getsize(self.path)
+        return count
+
+    def _compact_locked(self):
+        # The in-memory state already matches the rewritten log
+        self._log_records = self._write_log(self._encode(record) for record in self._live_records())
+
+    @synchronized
+    def compact(self):
+        """Rewrite the log with one ``add`` record per live entry."""
+        with self._writing():
+            self._compact_locked()
+
+    @synchronized
+    def replace_log(self, data: bytes):
+        """Replace the whole log with another one's content (a snapshot import)."""
+        with self._writing():
+            self._write_log(
+                line for line in data.splitlines(keepends=True)
+                if line.endswith(b"\n") and json.loads(line)["op"] != "log"
+            )
+            self._reset()
+            self._refresh()
@@ -0,0 +1,131 @@
+# backend/app/services/memory/chunk_refs.py
+from typing import Any, Dict, List, Set, Tuple
+
+from app.services.memory._locking import synchronized
+from app.services.memory.append_log import AppendLog
+
+
+class ChunkReferences(AppendLog):
+    """
+    Per-workspace content-addressed chunk layer: each distinct chunk content
+    is embedded and stored once (under its content key), and every place it
+    occurs (``chunk_id`` occurrence id plus location metadata)
+    is a lightweight reference to it.
+
+    Persisted as an ``AppendLog`` of ``add`` / ``delete`` records.
+    """
+
+    def _reset_state(self):
+        self._content_of: Dict[str, str] = {}
+        self._occurrences: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    # ─────────────────────────────────────────────────────────────
+    # PERSISTENCE
+    # ─────────────────────────────────────────────────────────────
+
+    def _apply(self, record: Dict[str, Any]):
+        if record["op"] == "add":
+            self._add_ref(record["id"], record["content"], record["meta"])
+        else:
+            self._remove_ref(record["id"])
+
+    def _live_records(self):
+        for content, occurrences in self._occurrences.items():
+            for occurrence_id, meta in occurrences.items():
+                yield {"op": "add", "id": occurrence_id, "content": content, "meta": meta}
+
+    def _live_count(self) -> int:
+        return len(self._content_of)
+
+    # ─────────────────────────────────────────────────────────────
+    # UPDATES
+    # ─────────────────────────────────────────────────────────────
+
+    def _add_ref(self, occurrence_id: str, content: str, meta: Dict[str, Any]):
+        self._remove_ref(occurrence_id)
+        self._content_of[occurrence_id] = content
+        self._occurrences.setdefault(content, {})[occurrence_id] = meta
+
+    def _remove_ref(self, occurrence_id: str) -> str:
+        """Drop one occurrence; returns its content key if that was the last reference."""
+        content = self._content_of.pop(occurrence_id, None)
+        if content is None:
+            return ""
+        occurrences = self._occurrences[content]
+        occurrences.pop(occurrence_id, None)
+        if occurrences:
+            return ""
+        del self._occurrences[content]
+        return content
+
+    @synchronized
+    def missing(self, contents: List[str]) -> Set[str]:
+        """Content keys that no occurrence references yet (not stored)."""
+        self._refresh()
+        return {content for content in contents if content not in self._occurrences}
+
+    @synchronized
+    def add(self, occurrence_ids: List[str], contents: List[str], metadatas: List[Dict[str, Any]]):
+        """Record (or move) occurrences of stored contents."""
+        records = [
+            {"op": "add", "id": occurrence_id, "content": content, "meta": meta}
+            for occurrence_id, content, meta in zip(occurrence_ids, contents, metadatas)
+        ]
+        with self._writing():
+            for record in records:
+                self._apply(record)
+            self._append(records)
+
+    @synchronized
+    def delete(self, occurrence_ids: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Drop occurrences. Returns the content keys left without references
+        (their stored rows can go) and the ids this layer never knew (rows
+        written before it existed, stored under the occurrence id itself).
+        """
+        with self._writing():
+            known = [i for i in occurrence_ids if i in self._content_of]
+            unknown = [i for i in occurrence_ids if i not in self._content_of]
+            orphaned = [content for content in map(self._remove_ref, known) if content]
+            self._append([{"op": "delete", "id": occurrence_id} for occurrence_id in known])
+        return orphaned, unknown
+
+    # ─────────────────────────────────────────────────────────────
+    # QUERIES
+    # ─────────────────────────────────────────────────────────────
+
+    @synchronized
+    def contents_of(self, occurrence_ids: List[str]) -> List[str]:
+        """Stored row ids for occurrence ids (unknown ids map to themselves)."""
+        self._refresh()
+        return list(dict.fromkeys(self._content_of.get(i, i) for i in occurrence_ids))
+
+    @synchronized
+    def occurrences(self, content: str) -> List[Dict[str, Any]]:
+        """Every place a content key occurs, as ``{"id": occurrence_id, **metadata}``."""
+        self._refresh()
+        return [
+            {"id": occurrence_id, **meta}
+            for occurrence_id, meta in self._occurrences.get(content, {}).items()
+        ]
+
+    @synchronized
+    def all_occurrences(self) -> Tuple[List[str], List[Dict[str, Any]]]:
+        self._refresh()
+        ids, metadatas = [], []
+        for occurrences in self._occurrences.values():
+            for occurrence_id, meta in occurrences.items():
+                ids.append(occurrence_id)
+                metadatas.append(meta)
+        return ids, metadatas
+
+    @synchronized
+    def stats(self) -> Dict[str, Any]:
+        self._refresh()
+        contents = len(self._occurrences)
+        occurrences = len(self._content_of)
+        return {
+            "contents": contents,
+            "occurrences": occurrences,
+            "dedupe_ratio": 1 - contents / occurrences if occurrences else 0.0
+        }
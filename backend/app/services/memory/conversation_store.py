@@ -1,32 +1,84 @@
 # backend/app/services/memory/conversation_store.py
+import asyncio
 import chromadb
-import hashlib
+import threading
+import time
+import uuid
 from typing import List, Dict, Any, Optional
 from app.config import get_settings
 from app.services.sambanova_client import SambaNovaOrchestrator
+from app.services.memory.store_executor import get_store_executor
 
 class ConversationStore:
     """
     Stores and retrieves conversation history using ChromaDB.
     Supports semantic search over past interactions.
+    Chroma calls run on the shared store executor, off the event loop.
+
+    All sessions share one collection, partitioned by ``session_id``
+    metadata; sessions idle for longer than ``CONVERSATION_TTL`` expire.
+
+    Writes are write-behind: ``store_message`` queues the message per
+    session and returns its id at once. Queued messages are embedded in
+    one request and upserted in bulk when ``CONVERSATION_BATCH_SIZE``
+    are pending or ``CONVERSATION_FLUSH_INTERVAL`` after the first one,
+    before a search of their session, and on ``close``.
     """
 
+    COLLECTION = "conversations"
+    LEGACY_PREFIX = "conv_"  # per-session collections of older versions
+    EXPIRY_SWEEP_INTERVAL = 3600.0  # seconds between expiry sweeps
+
     def __init__(self):
         self.settings = get_settings()
         self.sambanova = SambaNovaOrchestrator()
+        self.executor = get_store_executor()
         self.client = chromadb.PersistentClient(
             path=self.settings.CHROMA_PERSIST_DIR + "/conversations"
         )
-        self.collections = {}
-
-    def get_collection(self, session_id: str):
-        """Get or create conversation collection for a session."""
-        if session_id not in self.collections:
-            self.collections[session_id] = self.client.get_or_create_collection(
-                name=f"conv_{session_id}",
-                metadata={"hnsw:space": "cosine"}
-            )
-        return self.collections[session_id]
+        self._collection = None
+        self._open_lock = threading.Lock()
+        self._last_expiry_sweep = 0.0
+        # session_id → queued (id, content, metadata)
+        self._pending: Dict[str, List[tuple]] = {}
+        self._pending_count = 0
+        self._flush_lock = asyncio.Lock()
+        # Sessions being deleted: a failed flush does not re-queue their messages
+        self._deleting: set = set()
+        self._flush_timer: Optional[asyncio.Task] = None
+        self._background: set = set()
+
+    def get_collection(self):
+        """Get or create the shared conversation collection."""
+        with self._open_lock:
+            if self._collection is None:
+                self._collection = self.client.get_or_create_collection(
+                    name=self.COLLECTION,
+                    metadata={"hnsw:space": "cosine"}
+                )
+                self._migrate_legacy_collections()
+            return self._collection
+
+    def _migrate_legacy_collections(self):
+        """Move messages of per-session ``conv_{session_id}`` collections into the shared one."""
+        now = time.time()
+        for legacy in self.client.list_collections():
+            if not legacy.name.startswith(self.LEGACY_PREFIX):
+                continue
+            session_id = legacy.name[len(self.LEGACY_PREFIX):]
+            found = legacy.get(include=["documents", "embeddings", "metadatas"])
+            if found["ids"]:
+                self._collection.upsert(
+                    ids=[uuid.uuid4().hex for _ in found["ids"]],
+                    documents=found["documents"],
+                    embeddings=found["embeddings"],
+                    metadatas=[
+                        {**(meta or {}), "session_id": session_id, "timestamp": now}
+                        for meta in found["metadatas"]
+                    ]
+                )
+            self.client.delete_collection(legacy.name)
+            print(f"📦 [ConversationStore] Migrated {len(found['ids'])} messages of session {session_id}")
 
     async def store_message(
         self,
@@ -35,21 +87,88 @@ class ConversationStore:
         content: str,
         metadata: Optional[Dict[str, Any]] = None
     ) -> str:
-        """Store a message with embedding."""
-        collection = self.get_collection(session_id)
+        """Queue a message for storage; returns its (unique) id immediately."""
+        msg_id = uuid.uuid4().hex
+        self._pending.setdefault(session_id, []).append((msg_id, content, {
+            "role": role,
+            **(metadata or {}),
+            "session_id": session_id,
+            "timestamp": time.time()
+        }))
+        self._pending_count += 1
 
-        embedding = await self.sambanova.create_embedding(content)
+        if self._pending_count >= self.settings.CONVERSATION_BATCH_SIZE:
+            self._spawn(self._background_flush())
+        elif self._flush_timer is None:
+            self._flush_timer = self._spawn(self._flush_later())
+        return msg_id
 
-        msg_id = str(hashlib.md5(content.encode()).hexdigest())
+    def _spawn(self, coro) -> asyncio.Task:
+        # Keep a reference so background flushes are not garbage-collected mid-way
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
 
-        collection.add(
-            ids=[msg_id],
-            documents=[content],
-            embeddings=[embedding],
-            metadatas=[{"role": role, **(metadata or {})}]
-        )
+    async def _flush_later(self):
+        await asyncio.sleep(self.settings.CONVERSATION_FLUSH_INTERVAL)
+        self._flush_timer = None
+        await self._background_flush()
 
-        return msg_id
+    async def _background_flush(self):
+        try:
+            await self.flush()
+        except Exception:
+            # Already logged and re-queued: try again after the flush interval
+            if self._flush_timer is None:
+                self._flush_timer = self._spawn(self._flush_later())
+
+    async def flush(self, session_id: Optional[str] = None) -> int:
+        """
+        Embed and upsert queued messages (of one session, or all) in one
+        batch. On failure the messages are re-queued. Returns the number written.
+        """
+        async with self._flush_lock:
+            if session_id is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {session_id: self._pending.pop(session_id, [])}
+            messages = [message for queued in batch.values() for message in queued]
+            self._pending_count -= len(messages)
+            if not messages:
+                return 0
+
+            try:
+                collection = await self.executor.run("conv_open", self.get_collection)
+                embeddings = await self.sambanova.create_embeddings([content for _, content, _ in messages])
+                await self.executor.run(
+                    "conv_add",
+                    collection.upsert,
+                    ids=[msg_id for msg_id, _, _ in messages],
+                    documents=[content for _, content, _ in messages],
+                    embeddings=embeddings,
+                    metadatas=[meta for _, _, meta in messages]
+                )
+            except (Exception, asyncio.CancelledError) as e:
+                print(f"⚠️ [ConversationStore] Flush of {len(messages)} messages failed, re-queued: {e}")
+                for queued_session, queued in batch.items():
+                    if queued_session in self._deleting:
+                        continue
+                    self._pending[queued_session] = queued + self._pending.get(queued_session, [])
+                    self._pending_count += len(queued)
+                raise
+
+        if time.time() - self._last_expiry_sweep > self.EXPIRY_SWEEP_INTERVAL:
+            await self.executor.run("conv_expire", self.expire_sessions)
+        return len(messages)
+
+    async def close(self):
+        """Flush every queued message (lifespan shutdown)."""
+        await asyncio.gather(*self._background, return_exceptions=True)
+        try:
+            await self.flush()
+        except Exception:
+            print(f"❌ [ConversationStore] {self._pending_count} queued messages could not be stored")
 
     async def search_conversation(
         self,
@@ -57,14 +176,18 @@ class ConversationStore:
         query: str,
         top_k: int = 5
     ) -> List[Dict[str, Any]]:
-        """Search within a conversation session."""
-        collection = self.get_collection(session_id)
+        """Search within a conversation session (including its queued messages)."""
+        await self.flush(session_id)
+        collection = await self.executor.run("conv_open", self.get_collection)
 
         query_embedding = await self.sambanova.create_embedding(query)
 
-        results = collection.query(
+        results = await self.executor.run(
+            "conv_query",
+            collection.query,
             query_embeddings=[query_embedding],
             n_results=top_k,
+            where={"session_id": session_id},
             include=["documents", "metadatas", "distances"]
         )
 
@@ -78,7 +201,41 @@ class ConversationStore:
             for i in range(len(results["ids"][0]))
         ]
 
-    def delete_session(self, session_id: str):
-        """Delete entire conversation session."""
-        self.client.delete_collection(f"conv_{session_id}")
-        self.collections.pop(session_id, None)
\ No newline at end of file
+    async def delete_session(self, session_id: str):
+        """Delete entire conversation session (after a flush in progress, including its queued messages)."""
+        self._deleting.add(session_id)
+        try:
+            async with self._flush_lock:
+                self._pending_count -= len(self._pending.pop(session_id, []))
+                collection = await self.executor.run("conv_open", self.get_collection)
+                await self.executor.run("conv_delete", collection.delete, where={"session_id": session_id})
+        finally:
+            self._deleting.discard(session_id)
+
+    def expire_sessions(self, now: Optional[float] = None) -> int:
+        """
+        Delete sessions whose last message is older than ``CONVERSATION_TTL``.
+        Returns the number of sessions removed.
+        """
+        self._last_expiry_sweep = time.time()
+        ttl = self.settings.CONVERSATION_TTL
+        if ttl <= 0:
+            return 0
+        cutoff = (now or time.time()) - ttl
+        collection = self.get_collection()
+
+        stale = collection.get(where={"timestamp": {"$lt": cutoff}}, include=["metadatas"])
+        expired = 0
+        for session_id in {meta["session_id"] for meta in stale["metadatas"]}:
+            recent = collection.get(
+                where={"$and": [{"session_id": session_id}, {"timestamp": {"$gte": cutoff}}]},
+                limit=1,
+                include=[]
+            )
+            if recent["ids"]:
+                continue
+            collection.delete(where={"session_id": session_id})
+            expired += 1
+        if expired:
+            print(f"🧹 [ConversationStore] Expired {expired} idle sessions")
+        return expired
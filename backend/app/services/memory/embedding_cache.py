@@ -0,0 +1,128 @@
+# backend/app/services/memory/embedding_cache.py
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+
+
+class EmbeddingCache:
+    """
+    In-memory LRU + TTL cache of query embeddings keyed by
+    ``(model, prefixed query text)``. Shared by all workspaces, since a
+    query embeds the same way whatever collection it is run against.
+
+    Optionally persisted to an ``.npz`` file so hot queries survive restarts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_seconds: float = 3600.0,
+        persist_path: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if self.persist_path is not None and self.persist_path.exists():
+            self.load()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = (model, text)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, embedding = entry
+        if time.time() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return embedding
+
+    def put(self, model: str, text: str, embedding: List[float]):
+        key = (model, text)
+        self._entries[key] = (time.time(), embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    # ─────────────────────────────────────────────────────────────
+    # PERSISTENCE
+    # ─────────────────────────────────────────────────────────────
+
+    def save(self):
+        """Write unexpired entries (oldest first, so LRU order survives)."""
+        if self.persist_path is None:
+            return
+        now = time.time()
+        live = [(k, v) for k, v in self._entries.items() if now - v[0] <= self.ttl_seconds]
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.persist_path.with_name(self.persist_path.stem + ".tmp.npz")
+        dims = {len(v[1]) for _, v in live}
+        if len(dims) > 1:
+            # Mixed models with different dims: keep the most recent dim only
+            keep_dim = len(live[-1][1][1])
+            live = [(k, v) for k, v in live if len(v[1]) == keep_dim]
+        np.savez(
+            tmp,
+            models=np.array([k[0] for k, _ in live], dtype=object),
+            texts=np.array([k[1] for k, _ in live], dtype=object),
+            stored_at=np.array([v[0] for _, v in live], dtype=np.float64),
+            embeddings=np.array([v[1] for _, v in live], dtype=np.float32)
+        )
+        tmp.replace(self.persist_path)
+
+    def load(self):
+        try:
+            data = np.load(self.persist_path, allow_pickle=True)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ [EmbeddingCache] Ignoring unreadable cache file {self.persist_path}: {e}")
+            return
+        now = time.time()
+        for model, text, stored_at, embedding in zip(
+            data["models"], data["texts"], data["stored_at"], data["embeddings"]
+        ):
+            if now - stored_at <= self.ttl_seconds:
+                self._entries[(str(model), str(text))] = (float(stored_at), embedding.tolist())
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+@lru_cache()
+def get_query_embedding_cache() -> EmbeddingCache:
+    """Process-wide query embedding cache."""
+    settings = get_settings()
+    persist_path = None
+    if settings.QUERY_CACHE_PERSIST:
+        persist_path = f"{settings.CHROMA_PERSIST_DIR}/query_embedding_cache.npz"
+    return EmbeddingCache(
+        max_entries=settings.QUERY_CACHE_SIZE,
+        ttl_seconds=settings.QUERY_CACHE_TTL,
+        persist_path=persist_path
+    )
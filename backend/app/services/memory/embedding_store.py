@@ -0,0 +1,696 @@
+# backend/app/services/memory/embedding_store.py
+import json
+import os
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.memory._locking import lock_file, synchronized, unlock_file
+from app.services.memory.quantization import QuantizedCodes, QUANTIZATION_MODES
+from app.services.memory.projection import fit_projection
+
+
+class MmapEmbeddingStore:
+    """
+    Per-workspace on-disk embedding store backed by ``numpy.memmap``.
+
+    Layout of a workspace directory (``{gen}`` is the compaction generation):
+        header.json            dim, generation, base row count, projection version
+        projection.v{n}.npy    versioned (dim, input_dim) projection matrices
+        vectors.{gen}.f16      compacted float16 matrix, mapped read-only
+        append.{gen}.f16       append log of rows written since compaction
+        rows.{gen}.jsonl       id / document / metadata, one line per row
+        rows.{gen}.idx         uint64 byte offsets into rows.jsonl (commit point)
+        tombstones.{gen}.i64   rows superseded by an upsert or deleted
+        workspace.json         per-workspace options (e.g. quantization)
+
+    Opening a store only reads the header, so process startup does not
+    depend on workspace size. Vectors are L2-normalised before being stored,
+    so a dot product is the cosine similarity. Read-only mappings let
+    several worker processes share the OS page cache.
+    """
+
+    BLOCK_ROWS = 16384          # rows scored per block when scanning the matrix
+    COMPACT_MIN_ROWS = 4096     # append log size that may trigger compaction
+    COMPACT_RATIO = 0.25        # ... once it exceeds this fraction of the base
+
+    def __init__(
+        self,
+        path: str,
+        dim: Optional[int] = None,
+        defaults: Optional[Dict[str, Any]] = None
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.defaults = defaults or {}
+        self._thread_lock = threading.RLock()
+        self._quantizers: Dict[str, QuantizedCodes] = {}
+        self._header: Dict[str, Any] = {}
+        self._generation = None
+        self._projection: Optional[np.ndarray] = None
+        self._base = None
+        self._append = None
+        self._offsets = None
+        self._rows_fh = None
+        self._dead = np.zeros(0, dtype=bool)
+        self._tombstone_bytes = 0
+        self._id_rows: Optional[Dict[str, int]] = None
+        self._id_rows_scanned = 0
+
+    # ─────────────────────────────────────────────────────────────
+    # FILES
+    # ─────────────────────────────────────────────────────────────
+
+    def _file(self, name: str, generation: Optional[int] = None) -> Path:
+        gen = self._generation if generation is None else generation
+        stem, ext = name.split(".")
+        return self.path / f"{stem}.{gen}.{ext}"
+
+    def _read_header(self) -> Dict[str, Any]:
+        header_path = self.path / "header.json"
+        if not header_path.exists():
+            return {"version": 1, "dim": self.dim, "generation": 0, "base_rows": 0, "projection": None}
+        with open(header_path, "r") as f:
+            return json.loads(f.read())
+
+    def _write_header(self, header: Dict[str, Any]):
+        tmp = self.path / "header.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump(header, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path / "header.json")
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Per-workspace options (``workspace.json``) over the given defaults."""
+        config_path = self.path / "workspace.json"
+        overrides = {}
+        if config_path.exists():
+            with open(config_path, "r") as f:
+                overrides = json.load(f)
+        return {**self.defaults, **overrides}
+
+    @synchronized
+    def update_config(self, **options) -> Dict[str, Any]:
+        """Persist per-workspace options; returns the effective config."""
+        if "quantization" in options and options["quantization"] not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {options['quantization']}")
+        config_path = self.path / "workspace.json"
+        current = {}
+        if config_path.exists():
+            with open(config_path, "r") as f:
+                current = json.load(f)
+        current.update(options)
+        tmp = self.path / "workspace.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump(current, f, indent=2)
+        os.replace(tmp, config_path)
+        return self.config
+
+    def _lock(self):
+        """Exclusive advisory lock serialising writers across processes."""
+        return lock_file(self.path / "lock")
+
+    @staticmethod
+    def _unlock(fh):
+        unlock_file(fh)
+
+    # ─────────────────────────────────────────────────────────────
+    # MAPPING
+    # ─────────────────────────────────────────────────────────────
+
+    def _refresh(self):
+        """
+        Bring the mapped views up to date with the files on disk.
+        Cheap when nothing changed: a header read and a few ``stat`` calls.
+        """
+        header = self._read_header()
+        if header["generation"] != self._generation or (self.dim is None and header.get("dim")):
+            self._open_generation(header)
+
+        if self.dim is None:
+            return
+        if self._base is None:
+            self._base = self._map(self._file("vectors.f16"), np.float16, (self._base_rows, self.dim))
+
+        total = os.path.getsize(self._file("rows.idx")) // 8 if self._file("rows.idx").exists() else 0
+        if self._offsets is None or len(self._offsets) != total:
+            self._offsets = self._map(self._file("rows.idx"), np.uint64, (total,))
+            appended = total - self._base_rows
+            self._append = self._map(self._file("append.f16"), np.float16, (appended, self.dim))
+
+        if len(self._dead) < total:
+            self._dead = np.concatenate([self._dead, np.zeros(total - len(self._dead), dtype=bool)])
+
+        tomb_path = self._file("tombstones.i64")
+        tomb_size = os.path.getsize(tomb_path) if tomb_path.exists() else 0
+        if tomb_size > self._tombstone_bytes:
+            with open(tomb_path, "rb") as f:
+                f.seek(self._tombstone_bytes)
+                rows = np.frombuffer(f.read(tomb_size - self._tombstone_bytes), dtype=np.int64)
+            rows = rows[rows < total]
+            self._dead[rows] = True
+            self._tombstone_bytes = tomb_size
+            if self._id_rows and len(rows):
+                # Deleted by another handle (our own tombstones are applied as written)
+                stale = set(rows.tolist())
+                self._id_rows = {id_: row for id_, row in self._id_rows.items() if row not in stale}
+
+    def _open_generation(self, header: Dict[str, Any]):
+        self._header = header
+        self._generation = header["generation"]
+        self._base_rows = header["base_rows"]
+        if header.get("dim"):
+            self.dim = header["dim"]
+        self._offsets = None
+        self._dead = np.zeros(0, dtype=bool)
+        self._tombstone_bytes = 0
+        self._id_rows = None
+        self._id_rows_scanned = 0
+        self._base = None
+        self._projection = None
+        if header.get("projection") is not None:
+            self._projection = np.load(self.path / f"projection.v{header['projection']}.npy")
+        if self._rows_fh is not None:
+            self._rows_fh.close()
+            self._rows_fh = None
+
+    @staticmethod
+    def _map(path: Path, dtype, shape: Tuple[int, ...]) -> np.ndarray:
+        """Map ``shape`` leading elements of ``path`` read-only (zero-copy)."""
+        if shape[0] == 0 or not path.exists():
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+    @synchronized
+    def close(self):
+        """Release the rows file handle and the memory maps; the next call maps the files again."""
+        if self._rows_fh is not None:
+            self._rows_fh.close()
+            self._rows_fh = None
+        self._generation = None
+        self._base = self._append = self._offsets = None
+        self._dead = np.zeros(0, dtype=bool)
+        self._tombstone_bytes = 0
+        self._id_rows = None
+        self._id_rows_scanned = 0
+
+    def _rows_handle(self):
+        if self._rows_fh is None:
+            self._rows_fh = open(self._file("rows.jsonl"), "rb")
+        return self._rows_fh
+
+    @property
+    def total_rows(self) -> int:
+        return 0 if self._offsets is None else len(self._offsets)
+
+    def _vector_block(self, start: int, end: int) -> np.ndarray:
+        """Rows ``[start, end)`` across the base matrix and the append log."""
+        if end <= self._base_rows:
+            return self._base[start:end]
+        if start >= self._base_rows:
+            return self._append[start - self._base_rows:end - self._base_rows]
+        return np.concatenate([
+            self._base[start:],
+            self._append[:end - self._base_rows]
+        ])
+
+    # ─────────────────────────────────────────────────────────────
+    # ROWS
+    # ─────────────────────────────────────────────────────────────
+
+    def _ensure_id_rows(self) -> Dict[str, int]:
+        """Lazily build the id → row map; only writes and gets need it."""
+        if self._id_rows is None:
+            self._id_rows = {}
+            self._id_rows_scanned = 0
+        total = self.total_rows
+        if self._id_rows_scanned < total:
+            fh = self._rows_handle()
+            fh.seek(int(self._offsets[self._id_rows_scanned]))
+            for row in range(self._id_rows_scanned, total):
+                record = json.loads(fh.readline())
+                if not self._dead[row]:
+                    self._id_rows[record["id"]] = row
+            self._id_rows_scanned = total
+        return self._id_rows
+
+    @synchronized
+    def read_rows(self, rows: Sequence[int]) -> List[Dict[str, Any]]:
+        """Fetch id / document / metadata records for the given row numbers."""
+        fh = self._rows_handle()
+        records = []
+        for row in rows:
+            fh.seek(int(self._offsets[row]))
+            records.append(json.loads(fh.readline()))
+        return records
+
+    @synchronized
+    def live_rows(self) -> np.ndarray:
+        """Row numbers that are neither deleted nor superseded."""
+        self._refresh()
+        return np.flatnonzero(~self._dead[:self.total_rows])
+
+    @synchronized
+    def vectors(self, rows: Sequence[int]) -> np.ndarray:
+        """Float32 copies of the stored (normalised) vectors for ``rows``."""
+        self._refresh()
+        rows = np.asarray(rows, dtype=np.int64)
+        out = np.empty((len(rows), self.dim or 0), dtype=np.float32)
+        in_base = rows < self._base_rows
+        out[in_base] = self._base[rows[in_base]]
+        out[~in_base] = self._append[rows[~in_base] - self._base_rows]
+        return out
+
+    @synchronized
+    def count(self) -> int:
+        self._refresh()
+        return int(self.total_rows - self._dead[:self.total_rows].sum())
+
+    # ─────────────────────────────────────────────────────────────
+    # WRITES
+    # ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _normalise(embeddings) -> np.ndarray:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _prepare(self, embeddings) -> np.ndarray:
+        """
+        Map raw embeddings into the store's space: apply the active
+        projection (if the input still has the original dimension), then
+        L2-normalise. Vectors already in store space pass through.
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        if self._projection is not None and matrix.shape[1] == self._projection.shape[1]:
+            matrix = matrix @ self._projection.T
+        return self._normalise(matrix)
+
+    @synchronized
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ):
+        """Append rows; earlier rows with the same id are tombstoned."""
+        if not ids:
+            return
+
+        # Last occurrence wins within a single batch
+        last = {id_: i for i, id_ in enumerate(ids)}
+        keep = sorted(last.values())
+
+        lock = self._lock()
+        try:
+            self._refresh()
+            matrix = self._prepare(embeddings)
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+                self._write_header({
+                    "version": 1, "dim": self.dim, "generation": 0, "base_rows": 0, "projection": None
+                })
+                self._refresh()
+            if matrix.shape[1] != self.dim:
+                raise ValueError(f"Embedding dim {matrix.shape[1]} does not match store dim {self.dim}")
+
+            id_rows = self._ensure_id_rows()
+            superseded = [id_rows[ids[i]] for i in keep if ids[i] in id_rows]
+            lines = [
+                json.dumps({"id": ids[i], "document": documents[i], "metadata": metadatas[i]}).encode() + b"\n"
+                for i in keep
+            ]
+
+            first_row = self.total_rows
+            self._truncate_uncommitted()
+            with open(self._file("append.f16"), "ab") as f:
+                f.write(matrix[keep].astype(np.float16).tobytes())
+
+            offsets = []
+            with open(self._file("rows.jsonl"), "ab") as f:
+                position = f.tell()
+                for line in lines:
+                    offsets.append(position)
+                    f.write(line)
+                    position += len(line)
+
+            # Offsets are written last: a row exists once its offset does
+            with open(self._file("rows.idx"), "ab") as f:
+                f.write(np.asarray(offsets, dtype=np.uint64).tobytes())
+            self._append_tombstones(superseded)
+
+            self._refresh()
+            for n, i in enumerate(keep):
+                id_rows[ids[i]] = first_row + n
+            self._id_rows_scanned = self.total_rows
+
+            if self._should_compact():
+                self._compact_locked()
+        finally:
+            self._unlock(lock)
+
+    @synchronized
+    def delete(self, ids: List[str]) -> int:
+        """Tombstone rows by id. Returns the number of rows removed."""
+        lock = self._lock()
+        try:
+            self._refresh()
+            if self.dim is None:
+                return 0
+            id_rows = self._ensure_id_rows()
+            rows = [id_rows.pop(id_) for id_ in ids if id_ in id_rows]
+            self._append_tombstones(rows)
+            self._refresh()
+            return len(rows)
+        finally:
+            self._unlock(lock)
+
+    def _truncate_uncommitted(self):
+        """
+        Cut the append log and ``rows.jsonl`` back to the committed rows, so
+        bytes left by an upsert that failed before its commit point cannot
+        shift the rows appended next. Called with the writer lock held.
+        """
+        appended = self.total_rows - self._base_rows
+        rows_end = 0
+        if self.total_rows:
+            fh = self._rows_handle()
+            fh.seek(int(self._offsets[-1]))
+            rows_end = fh.tell() + len(fh.readline())
+        for name, committed in (("append.f16", appended * self.dim * 2), ("rows.jsonl", rows_end)):
+            path = self._file(name)
+            if path.exists() and os.path.getsize(path) > committed:
+                os.truncate(path, committed)
+
+    def _append_tombstones(self, rows: List[int]):
+        """Tombstone rows; the caller holds the writer lock and has just refreshed."""
+        if rows:
+            with open(self._file("tombstones.i64"), "ab") as f:
+                f.write(np.asarray(rows, dtype=np.int64).tobytes())
+            self._dead[rows] = True
+            self._tombstone_bytes += len(rows) * 8
+
+    def _should_compact(self) -> bool:
+        appended = self.total_rows - self._base_rows
+        return appended >= max(self.COMPACT_MIN_ROWS, self._base_rows * self.COMPACT_RATIO)
+
+    @synchronized
+    def compact(self):
+        """Fold the append log and tombstones into a new base matrix."""
+        lock = self._lock()
+        try:
+            self._refresh()
+            if self.dim is not None:
+                self._compact_locked()
+        finally:
+            self._unlock(lock)
+
+    def _compact_locked(
+        self,
+        transform: Optional[np.ndarray] = None,
+        header_updates: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Write live rows into a new generation. ``transform`` optionally
+        re-projects every vector with a (new_dim, dim) matrix on the way.
+        """
+        live = np.flatnonzero(~self._dead[:self.total_rows])
+        new_gen = self._generation + 1
+        new_dim = self.dim if transform is None else transform.shape[0]
+
+        vectors_path = self._file("vectors.f16", new_gen)
+        if len(live):
+            out = np.memmap(vectors_path, dtype=np.float16, mode="w+", shape=(len(live), new_dim))
+            for start in range(0, len(live), self.BLOCK_ROWS):
+                block_rows = live[start:start + self.BLOCK_ROWS]
+                block = self.vectors(block_rows)
+                if transform is not None:
+                    block = self._normalise(block @ transform.T)
+                out[start:start + len(block_rows)] = block
+            out.flush()
+            del out
+
+        offsets = []
+        with open(self._file("rows.jsonl", new_gen), "wb") as f:
+            src = self._rows_handle()
+            for row in live:
+                src.seek(int(self._offsets[row]))
+                offsets.append(f.tell())
+                f.write(src.readline())
+        with open(self._file("rows.idx", new_gen), "wb") as f:
+            f.write(np.asarray(offsets, dtype=np.uint64).tobytes())
+
+        old_gen = self._generation
+        # The header swap is the commit point of a compaction
+        self._write_header({
+            **self._header,
+            **(header_updates or {}),
+            "dim": new_dim,
+            "generation": new_gen,
+            "base_rows": len(live)
+        })
+        # Includes derived files such as quantized codes of the old generation
+        for stale in self.path.glob(f"*.{old_gen}.*"):
+            stale.unlink(missing_ok=True)
+        self._refresh()
+
+    @synchronized
+    def reproject(
+        self,
+        dim: int,
+        method: str = "pca",
+        sample_size: int = 5000,
+        seed: Optional[int] = 0
+    ) -> Dict[str, Any]:
+        """
+        Fit a projection to ``dim`` on a sample of the stored vectors and
+        re-project every row into a new generation, without re-embedding.
+
+        The fitted matrix is composed with the active projection, so raw
+        embeddings keep mapping straight into the new space. The result is
+        saved as the next ``projection.v{n}.npy``; older versions are kept.
+        """
+        lock = self._lock()
+        try:
+            self._refresh()
+            if self.dim is None:
+                raise ValueError("Cannot fit a projection on an empty store")
+            live = np.flatnonzero(~self._dead[:self.total_rows])
+            rng = np.random.default_rng(seed)
+            sample_rows = np.sort(rng.choice(live, size=min(sample_size, len(live)), replace=False))
+            step = fit_projection(self.vectors(sample_rows), dim, method, seed)
+
+            composed = step if self._projection is None else step @ self._projection
+            version = len(list(self.path.glob("projection.v*.npy"))) + 1
+            np.save(self.path / f"projection.v{version}.npy", composed)
+
+            self._compact_locked(transform=step, header_updates={"projection": version})
+            return self.projection_info()
+        finally:
+            self._unlock(lock)
+
+    @synchronized
+    def bulk_load(
+        self,
+        batches: Iterable[Tuple[List[str], np.ndarray, List[str], List[Dict[str, Any]]]],
+        dim: int,
+        projection: Optional[np.ndarray] = None
+    ) -> int:
+        """
+        Fill an empty store with ``(ids, vectors, documents, metadatas)``
+        batches of already normalised store-space vectors (e.g. a snapshot),
+        written straight into a base generation instead of the append log.
+        ``projection`` installs the matrix that maps raw embeddings into
+        that space. Returns the number of rows loaded.
+        """
+        lock = self._lock()
+        try:
+            self._refresh()
+            if self.count():
+                raise ValueError("bulk_load needs an empty store")
+            new_gen = (self._generation or 0) + 1
+            version = None
+            if projection is not None:
+                version = len(list(self.path.glob("projection.v*.npy"))) + 1
+                np.save(self.path / f"projection.v{version}.npy", projection.astype(np.float32))
+
+            rows = 0
+            offsets = []
+            with open(self._file("vectors.f16", new_gen), "wb") as vf, \
+                    open(self._file("rows.jsonl", new_gen), "wb") as rf:
+                for ids, vectors, documents, metadatas in batches:
+                    vf.write(np.ascontiguousarray(vectors, dtype=np.float16).tobytes())
+                    for id_, document, metadata in zip(ids, documents, metadatas):
+                        offsets.append(rf.tell())
+                        rf.write(json.dumps({
+                            "id": id_, "document": document, "metadata": metadata
+                        }).encode() + b"\n")
+                    rows += len(ids)
+            with open(self._file("rows.idx", new_gen), "wb") as f:
+                f.write(np.asarray(offsets, dtype=np.uint64).tobytes())
+
+            old_gen = self._generation
+            self._write_header({
+                "version": 1,
+                "dim": dim,
+                "generation": new_gen,
+                "base_rows": rows,
+                "projection": version
+            })
+            if old_gen is not None:
+                for stale in self.path.glob(f"*.{old_gen}.*"):
+                    stale.unlink(missing_ok=True)
+            self.dim = dim
+            self._refresh()
+            return rows
+        finally:
+            self._unlock(lock)
+
+    @synchronized
+    def projection_matrix(self) -> Optional[np.ndarray]:
+        """Active (dim, input_dim) projection, or ``None`` if vectors are unprojected."""
+        self._refresh()
+        return self._projection
+
+    @synchronized
+    def projection_info(self) -> Dict[str, Any]:
+        self._refresh()
+        return {
+            "version": self._header.get("projection"),
+            "dim": self.dim,
+            "input_dim": None if self._projection is None else self._projection.shape[1]
+        }
+
+    # ─────────────────────────────────────────────────────────────
+    # QUERIES
+    # ─────────────────────────────────────────────────────────────
+
+    @synchronized
+    def score(self, query_embeddings, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Cosine scores of every live row (or of ``rows``) against each query.
+        Returns an array of shape (n_queries, n_rows); dead rows score -inf.
+        The matrix is scanned block by block straight from the mapped pages.
+        """
+        self._refresh()
+        queries = self._prepare(query_embeddings)
+        total = self.total_rows
+
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+            scores = self.vectors(rows) @ queries.T
+            scores[self._dead[rows]] = -np.inf
+            return scores.T
+
+        scores = np.empty((total, len(queries)), dtype=np.float32)
+        for start in range(0, total, self.BLOCK_ROWS):
+            end = min(start + self.BLOCK_ROWS, total)
+            scores[start:end] = self._vector_block(start, end).astype(np.float32) @ queries.T
+        scores[self._dead[:total]] = -np.inf
+        return scores.T
+
+    @staticmethod
+    def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the ``k`` best finite scores, best first."""
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+    @synchronized
+    def query(
+        self,
+        query_embeddings,
+        top_k: int = 5,
+        rows: Optional[np.ndarray] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Nearest-neighbour search. Returns one result list per query, each
+        entry shaped like ``CodebaseVectorStore.search`` results.
+        """
+        if self.count() == 0:
+            return [[] for _ in range(len(np.atleast_2d(query_embeddings)))]
+
+        mode = self.config.get("quantization", "none")
+        if mode != "none":
+            return self._query_quantized(query_embeddings, top_k, rows, mode)
+
+        all_scores = self.score(query_embeddings, rows)
+        results = []
+        for scores in all_scores:
+            best = self.top_k(scores, top_k)
+            hit_rows = best if rows is None else np.asarray(rows)[best]
+            results.append(self._format_hits(hit_rows, scores[best]))
+        return results
+
+    def _query_quantized(
+        self,
+        query_embeddings,
+        top_k: int,
+        rows: Optional[np.ndarray],
+        mode: str
+    ) -> List[List[Dict[str, Any]]]:
+        """First pass over quantized codes, exact float rescoring of the candidates."""
+        quantizer = self.quantizer(mode)
+        n_candidates = top_k * int(self.config.get("rescore_factor", 10))
+        queries = self._prepare(query_embeddings)
+        results = []
+        for query, candidates in zip(queries, quantizer.candidates(queries, n_candidates, rows)):
+            scores = self.score(query, candidates)[0]
+            best = self.top_k(scores, top_k)
+            results.append(self._format_hits(candidates[best], scores[best]))
+        return results
+
+    def quantizer(self, mode: str) -> QuantizedCodes:
+        if mode not in self._quantizers:
+            self._quantizers[mode] = QuantizedCodes(self, mode)
+        return self._quantizers[mode]
+
+    def _format_hits(self, hit_rows: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+        records = self.read_rows(hit_rows)
+        return [
+            {
+                "id": rec["id"],
+                "content": rec["document"],
+                "metadata": rec["metadata"],
+                "distance": float(1 - score),
+                "score": float(score),
+                "row": int(row)
+            }
+            for row, score, rec in zip(hit_rows, scores, records)
+        ]
+
+    @synchronized
+    def rows_for(self, ids: List[str]) -> np.ndarray:
+        """Live row numbers of ``ids`` (missing ids are skipped), e.g. to restrict ``query``."""
+        self._refresh()
+        if self.dim is None:
+            return np.zeros(0, dtype=np.int64)
+        id_rows = self._ensure_id_rows()
+        return np.array(sorted(id_rows[id_] for id_ in ids if id_ in id_rows), dtype=np.int64)
+
+    @synchronized
+    def get(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch stored records by id (missing ids are skipped)."""
+        self._refresh()
+        if self.dim is None:
+            return []
+        id_rows = self._ensure_id_rows()
+        rows = [id_rows[id_] for id_ in ids if id_ in id_rows]
+        return [
+            {"id": rec["id"], "content": rec["document"], "metadata": rec["metadata"], "row": row}
+            for row, rec in zip(rows, self.read_rows(rows))
+        ]
@@ -0,0 +1,118 @@
+# backend/app/services/memory/handle_cache.py
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class HandleCache(Generic[T]):
+    """
+    Bounded LRU of open per-workspace handles (collections, stores, indexes).
+
+    Handles are opened lazily by ``opener`` on first ``get`` and dropped
+    when the cache is over ``max_handles`` (least recently used first) or
+    when unused for ``idle_seconds``. Dropping only forgets the handle (its
+    ``close()`` is called if it has one); everything it wrote is already on
+    disk, so the next ``get`` simply reopens it. Idle handles are swept on
+    access, oldest first, so the sweep stops at the first recent one.
+
+    Keys held through ``lease`` are in use and never dropped; the cache
+    may run over ``max_handles`` meanwhile and shrinks back once the last
+    lease is released.
+    """
+
+    def __init__(
+        self,
+        opener: Callable[[str], T],
+        max_handles: int = 64,
+        idle_seconds: float = 0.0
+    ):
+        self.opener = opener
+        self.max_handles = max_handles
+        self.idle_seconds = idle_seconds
+        self._handles: "OrderedDict[str, Tuple[T, float]]" = OrderedDict()
+        self._in_use: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self.opens = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> T:
+        with self._lock:
+            now = time.monotonic()
+            if key in self._handles:
+                handle = self._handles.pop(key)[0]
+            else:
+                handle = self.opener(key)
+                self.opens += 1
+            self._handles[key] = (handle, now)
+            self._sweep(now, keep=key)
+            return handle
+
+    @contextmanager
+    def lease(self, key: str):
+        """Keep ``key``'s handle (opened or not yet) from being dropped until the block exits."""
+        with self._lock:
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_use[key] -= 1
+                if not self._in_use[key]:
+                    del self._in_use[key]
+                    self._sweep(time.monotonic())
+
+    def _sweep(self, now: float, keep: Optional[str] = None):
+        excess = len(self._handles) - max(self.max_handles, 1)
+        for key, (_, last_used) in list(self._handles.items()):
+            idle = self.idle_seconds > 0 and now - last_used >= self.idle_seconds
+            if excess <= 0 and not idle:
+                break  # least recently used first: the rest are more recent
+            if key not in self._in_use and key != keep:
+                self._evict(key)
+                excess -= 1
+
+    def _evict(self, key: str):
+        handle, _ = self._handles.pop(key)
+        self.evictions += 1
+        close = getattr(handle, "close", None)
+        if callable(close):
+            close()
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Forget a handle without closing it (e.g. its files are being deleted)."""
+        with self._lock:
+            entry = self._handles.pop(key, None)
+            return default if entry is None else entry[0]
+
+    def discard(self, key: str):
+        """Drop and close a handle, if open (e.g. its files are about to be rewritten)."""
+        with self._lock:
+            if key in self._handles:
+                self._evict(key)
+
+    def evict_idle(self):
+        with self._lock:
+            self._sweep(time.monotonic())
+
+    def items(self) -> List[Tuple[str, T]]:
+        with self._lock:
+            return [(key, handle) for key, (handle, _) in self._handles.items()]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._handles
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open": len(self._handles),
+            "max_handles": self.max_handles,
+            "in_use": len(self._in_use),
+            "opens": self.opens,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,159 @@
+# backend/app/services/memory/lexical_index.py
+import math
+import re
+from collections import Counter
+from typing import List, Dict, Tuple
+
+from app.services.memory._locking import synchronized
+from app.services.memory.append_log import AppendLog
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_CAMEL_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_EXACT_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+def tokenize_code(text: str) -> List[str]:
+    """
+    Code-aware tokenizer: every identifier is emitted whole (lower-cased)
+    plus its snake_case / camelCase parts, so ``getSettings`` matches
+    ``get``, ``settings`` and ``getsettings``.
+    """
+    tokens = []
+    for identifier in _IDENTIFIER.findall(text):
+        whole = identifier.lower()
+        tokens.append(whole)
+        parts = [p.lower() for chunk in identifier.split("_") for p in _CAMEL_PART.findall(chunk)]
+        if len(parts) > 1 or (parts and parts[0] != whole):
+            tokens.extend(parts)
+    return tokens
+
+
+def exact_identifier(query: str) -> str:
+    """The identifier a query consists of (e.g. ``get_settings``), or ``""``."""
+    query = query.strip().strip("`'\"()")
+    if not _EXACT_IDENTIFIER.match(query):
+        return ""
+    return query.split(".")[-1].lower()
+
+
+class LexicalIndex(AppendLog):
+    """
+    Per-workspace BM25 inverted index over chunk text.
+
+    Persisted as an append-only JSONL log of ``add`` / ``delete`` records
+    (term frequencies per chunk id) that is replayed lazily on first use
+    and compacted when it holds mostly superseded records (see
+    ``AppendLog``). Lookups never leave the process, so lexical queries
+    need no embedding call.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def _reset_state(self):
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_len = 0
+
+    # ─────────────────────────────────────────────────────────────
+    # PERSISTENCE
+    # ─────────────────────────────────────────────────────────────
+
+    def _apply(self, record: Dict):
+        if record["op"] == "add":
+            self._add_doc(record["id"], record["terms"])
+        else:
+            self._remove_doc(record["id"])
+
+    def _live_records(self):
+        for doc_id, terms in self._doc_terms.items():
+            yield {"op": "add", "id": doc_id, "terms": terms}
+
+    def _live_count(self) -> int:
+        return len(self._doc_terms)
+
+    # ─────────────────────────────────────────────────────────────
+    # UPDATES
+    # ─────────────────────────────────────────────────────────────
+
+    def _add_doc(self, doc_id: str, terms: Dict[str, int]):
+        self._remove_doc(doc_id)
+        self._doc_terms[doc_id] = terms
+        length = sum(terms.values())
+        self._doc_len[doc_id] = length
+        self._total_len += length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+    def _remove_doc(self, doc_id: str):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_len -= self._doc_len.pop(doc_id)
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[term]
+
+    @synchronized
+    def add(self, ids: List[str], texts: List[str]):
+        """Index (or re-index) chunks by id."""
+        records = [
+            {"op": "add", "id": doc_id, "terms": dict(Counter(tokenize_code(text)))}
+            for doc_id, text in zip(ids, texts)
+        ]
+        with self._writing():
+            for record in records:
+                self._apply(record)
+            self._append(records)
+
+    @synchronized
+    def delete(self, ids: List[str]):
+        with self._writing():
+            records = [{"op": "delete", "id": doc_id} for doc_id in ids if doc_id in self._doc_terms]
+            for record in records:
+                self._apply(record)
+            self._append(records)
+
+    # ─────────────────────────────────────────────────────────────
+    # QUERIES
+    # ─────────────────────────────────────────────────────────────
+
+    @synchronized
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._doc_terms)
+
+    @synchronized
+    def contains_term(self, term: str) -> bool:
+        self._refresh()
+        return term in self._postings
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """BM25-ranked ``(chunk_id, score)`` pairs for the query."""
+        return self.search_terms(set(tokenize_code(query)), top_k)
+
+    @synchronized
+    def search_terms(self, terms, top_k: int = 10) -> List[Tuple[str, float]]:
+        """BM25-ranked ``(chunk_id, score)`` pairs for already tokenized terms."""
+        self._refresh()
+        n_docs = len(self._doc_terms)
+        if n_docs == 0:
+            return []
+        avg_len = self._total_len / n_docs
+
+        scores: Dict[str, float] = {}
+        for term in terms:
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in posting.items():
+                norm = self.K1 * (1 - self.B + self.B * self._doc_len[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_k]
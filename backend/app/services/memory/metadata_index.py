@@ -0,0 +1,208 @@
+# backend/app/services/memory/metadata_index.py
+import bisect
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from app.services.memory._locking import synchronized
+from app.services.memory.append_log import AppendLog
+
+# Metadata fields kept as one boolean bitmap per distinct value
+BITMAP_FIELDS = ("language", "construct_type")
+
+
+def _as_list(value) -> List[str]:
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+class MetadataIndex(AppendLog):
+    """
+    Per-workspace secondary index over chunk metadata, maintained at ingest:
+
+    - ``file_path``: sorted path list, so a path prefix resolves by bisection
+    - ``language`` / ``construct_type``: one bitmap over chunk slots per value
+    - ``symbol``: chunk name → chunk slots
+
+    ``resolve(filters)`` turns search filters into the candidate chunk ids,
+    so the vector search only scores those instead of filtering row by row.
+    Persisted as an ``AppendLog`` of ``add`` / ``delete`` records.
+    """
+
+    def _reset_state(self):
+        self._slots: Dict[str, int] = {}
+        self._slot_ids: List[Optional[str]] = []
+        self._slot_meta: List[Optional[Dict[str, str]]] = []
+        self._free_slots: List[int] = []
+        self._capacity = 0
+        self._bitmaps: Dict[str, Dict[str, np.ndarray]] = {field: {} for field in BITMAP_FIELDS}
+        self._file_slots: Dict[str, Set[int]] = {}
+        self._symbol_slots: Dict[str, Set[int]] = {}
+        self._sorted_paths: Optional[List[str]] = None
+
+    # ─────────────────────────────────────────────────────────────
+    # PERSISTENCE
+    # ─────────────────────────────────────────────────────────────
+
+    def _apply(self, record: Dict[str, Any]):
+        if record["op"] == "add":
+            self._add_chunk(record["id"], record["meta"])
+        else:
+            self._remove_chunk(record["id"])
+
+    def _live_records(self):
+        for chunk_id, slot in self._slots.items():
+            yield {"op": "add", "id": chunk_id, "meta": self._slot_meta[slot]}
+
+    def _live_count(self) -> int:
+        return len(self._slots)
+
+    # ─────────────────────────────────────────────────────────────
+    # UPDATES
+    # ─────────────────────────────────────────────────────────────
+
+    def _grow(self):
+        """Double the slot capacity of every bitmap."""
+        capacity = max(1024, self._capacity * 2)
+        for bitmaps in self._bitmaps.values():
+            for value, bitmap in bitmaps.items():
+                grown = np.zeros(capacity, dtype=bool)
+                grown[:self._capacity] = bitmap
+                bitmaps[value] = grown
+        self._capacity = capacity
+
+    def _add_chunk(self, chunk_id: str, meta: Dict[str, str]):
+        self._remove_chunk(chunk_id)
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slot_ids[slot] = chunk_id
+            self._slot_meta[slot] = meta
+        else:
+            slot = len(self._slot_ids)
+            if slot >= self._capacity:
+                self._grow()
+            self._slot_ids.append(chunk_id)
+            self._slot_meta.append(meta)
+        self._slots[chunk_id] = slot
+
+        for field in BITMAP_FIELDS:
+            bitmaps = self._bitmaps[field]
+            value = meta.get(field, "")
+            if value not in bitmaps:
+                bitmaps[value] = np.zeros(self._capacity, dtype=bool)
+            bitmaps[value][slot] = True
+        file_path = meta.get("file_path", "")
+        if file_path not in self._file_slots:
+            self._file_slots[file_path] = set()
+            self._sorted_paths = None
+        self._file_slots[file_path].add(slot)
+        if meta.get("name"):
+            self._symbol_slots.setdefault(meta["name"], set()).add(slot)
+
+    def _remove_chunk(self, chunk_id: str):
+        slot = self._slots.pop(chunk_id, None)
+        if slot is None:
+            return
+        meta = self._slot_meta[slot]
+        for field in BITMAP_FIELDS:
+            self._bitmaps[field][meta.get(field, "")][slot] = False
+        file_path = meta.get("file_path", "")
+        slots = self._file_slots[file_path]
+        slots.discard(slot)
+        if not slots:
+            del self._file_slots[file_path]
+            self._sorted_paths = None
+        if meta.get("name"):
+            slots = self._symbol_slots[meta["name"]]
+            slots.discard(slot)
+            if not slots:
+                del self._symbol_slots[meta["name"]]
+        self._slot_ids[slot] = None
+        self._slot_meta[slot] = None
+        self._free_slots.append(slot)
+
+    @synchronized
+    def add(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        """Index (or re-index) chunks by id."""
+        records = [
+            {"op": "add", "id": chunk_id, "meta": {
+                "file_path": metadata.get("file_path", ""),
+                "language": metadata.get("language", ""),
+                "construct_type": metadata.get("construct_type", ""),
+                "name": metadata.get("name", "")
+            }}
+            for chunk_id, metadata in zip(ids, metadatas)
+        ]
+        with self._writing():
+            for record in records:
+                self._apply(record)
+            self._append(records)
+
+    @synchronized
+    def delete(self, ids: List[str]):
+        with self._writing():
+            records = [{"op": "delete", "id": chunk_id} for chunk_id in ids if chunk_id in self._slots]
+            for record in records:
+                self._apply(record)
+            self._append(records)
+
+    # ─────────────────────────────────────────────────────────────
+    # QUERIES
+    # ─────────────────────────────────────────────────────────────
+
+    @synchronized
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._slots)
+
+    def _paths_with_prefix(self, prefix: str) -> List[str]:
+        if self._sorted_paths is None:
+            self._sorted_paths = sorted(self._file_slots)
+        start = bisect.bisect_left(self._sorted_paths, prefix)
+        end = bisect.bisect_left(self._sorted_paths, prefix + "\U0010ffff", lo=start)
+        return self._sorted_paths[start:end]
+
+    def _slot_mask(self, slot_sets) -> np.ndarray:
+        mask = np.zeros(self._capacity, dtype=bool)
+        for slots in slot_sets:
+            mask[list(slots)] = True
+        return mask
+
+    @synchronized
+    def resolve(self, filters: Dict[str, Any]) -> Optional[List[str]]:
+        """
+        Chunk ids matching every filter, or ``None`` when no filter is indexed.
+
+        Supported filters (a value may also be a list, matched as OR):
+        ``language``, ``construct_type``, ``file_path`` (path prefix) and
+        ``symbol`` (exact chunk name).
+        """
+        self._refresh()
+        masks = []
+        for field in BITMAP_FIELDS:
+            if field in filters:
+                mask = np.zeros(self._capacity, dtype=bool)
+                for value in _as_list(filters[field]):
+                    bitmap = self._bitmaps[field].get(value)
+                    if bitmap is not None:
+                        mask |= bitmap
+                masks.append(mask)
+        if "file_path" in filters:
+            paths = [
+                path
+                for prefix in _as_list(filters["file_path"])
+                for path in self._paths_with_prefix(prefix[2:] if prefix.startswith("./") else prefix)
+            ]
+            masks.append(self._slot_mask(self._file_slots[path] for path in paths))
+        if "symbol" in filters:
+            masks.append(self._slot_mask(
+                self._symbol_slots[name]
+                for name in _as_list(filters["symbol"])
+                if name in self._symbol_slots
+            ))
+        if not masks:
+            return None
+
+        mask = masks[0]
+        for other in masks[1:]:
+            mask &= other
+        return [self._slot_ids[slot] for slot in np.flatnonzero(mask)]
@@ -0,0 +1,48 @@
+# backend/app/services/memory/projection.py
+from typing import Optional
+
+import numpy as np
+
+PROJECTION_METHODS = ("pca", "random")
+
+
+def fit_pca(sample: np.ndarray, dim: int) -> np.ndarray:
+    """
+    Principal axes of ``sample`` as a (dim, input_dim) matrix.
+
+    Components are fitted on centred data but applied without subtracting
+    the mean, so the projection stays linear: projections compose, and
+    rescaling an input does not change its cosine neighbours.
+    """
+    if dim > min(sample.shape):
+        raise ValueError(f"PCA to {dim} dims needs at least {dim} sample rows")
+    centred = sample - sample.mean(axis=0, keepdims=True)
+    # Right singular vectors of the centred sample are the principal axes
+    _, _, vt = np.linalg.svd(centred, full_matrices=False)
+    return vt[:dim].astype(np.float32)
+
+
+def fit_random_orthogonal(input_dim: int, dim: int, seed: Optional[int] = 0) -> np.ndarray:
+    """Random orthonormal (dim, input_dim) projection (Johnson-Lindenstrauss style)."""
+    rng = np.random.default_rng(seed)
+    q, _ = np.linalg.qr(rng.normal(size=(input_dim, dim)))
+    return q.T.astype(np.float32)
+
+
+def fit_projection(
+    sample: np.ndarray,
+    dim: int,
+    method: str = "pca",
+    seed: Optional[int] = 0
+) -> np.ndarray:
+    """Fit a ``method`` projection from the sample's dimension down to ``dim``."""
+    if method not in PROJECTION_METHODS:
+        raise ValueError(f"Unknown projection method: {method}")
+    if dim >= sample.shape[1]:
+        raise ValueError(
+            f"Cannot project {sample.shape[1]}-dim vectors to {dim} dims; "
+            "growing the dimension requires re-embedding"
+        )
+    if method == "pca":
+        return fit_pca(sample.astype(np.float32), dim)
+    return fit_random_orthogonal(sample.shape[1], dim, seed)
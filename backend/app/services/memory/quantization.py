@@ -0,0 +1,153 @@
+# backend/app/services/memory/quantization.py
+import os
+from typing import List, Optional
+
+import numpy as np
+
+# Set bits per byte value, used for Hamming distance on packed sign bits
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+
+
+class QuantizedCodes:
+    """
+    Compact first-pass index over the vectors of an ``MmapEmbeddingStore``.
+
+    - ``int8``: symmetric scalar quantization with one float32 scale per row
+      (4x smaller than float32, scored with a dequantized dot product).
+    - ``binary``: sign bits packed 8 per byte (32x smaller), scored by
+      Hamming distance using a popcount lookup table.
+
+    Codes are appended next to the store files for the current generation
+    and kept in sync incrementally; a compaction simply starts a new file.
+    Candidates from the first pass are meant to be rescored exactly.
+    """
+
+    def __init__(self, store, mode: str):
+        if mode not in ("int8", "binary"):
+            raise ValueError(f"Unsupported quantization mode: {mode}")
+        self.store = store
+        self.mode = mode
+
+    # ─────────────────────────────────────────────────────────────
+    # ENCODING
+    # ─────────────────────────────────────────────────────────────
+
+    @property
+    def _codes_name(self) -> str:
+        return "qint8.i8" if self.mode == "int8" else "qbinary.u8"
+
+    @property
+    def code_bytes(self) -> int:
+        dim = self.store.dim
+        return dim if self.mode == "int8" else (dim + 7) // 8
+
+    @staticmethod
+    def encode_int8(vectors: np.ndarray):
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.round(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    @staticmethod
+    def encode_binary(vectors: np.ndarray) -> np.ndarray:
+        return np.packbits(vectors > 0, axis=1)
+
+    def _rows_in(self, name: str, row_bytes: int) -> int:
+        path = self.store._file(name)
+        return os.path.getsize(path) // row_bytes if path.exists() else 0
+
+    def _encoded_rows(self) -> int:
+        """Rows with complete codes (and, for ``int8``, a scale)."""
+        rows = self._rows_in(self._codes_name, self.code_bytes)
+        if self.mode == "int8":
+            rows = min(rows, self._rows_in("qscale.f32", 4))
+        return rows
+
+    def _truncate(self, rows: int):
+        """Cut the code files back to ``rows`` complete rows (a sync that died midway left more)."""
+        files = [(self._codes_name, self.code_bytes)] + ([("qscale.f32", 4)] if self.mode == "int8" else [])
+        for name, row_bytes in files:
+            path = self.store._file(name)
+            if path.exists() and os.path.getsize(path) > rows * row_bytes:
+                os.truncate(path, rows * row_bytes)
+
+    def sync(self):
+        """Encode rows appended to the store since the last sync."""
+        self.store._refresh()
+        if self.store.dim is None or self._encoded_rows() >= self.store.total_rows:
+            return
+        lock = self.store._lock()
+        try:
+            self.store._refresh()
+            start = self._encoded_rows()
+            total = self.store.total_rows
+            self._truncate(start)
+            for block_start in range(start, total, self.store.BLOCK_ROWS):
+                block_end = min(block_start + self.store.BLOCK_ROWS, total)
+                vectors = self.store._vector_block(block_start, block_end).astype(np.float32)
+                if self.mode == "int8":
+                    codes, scales = self.encode_int8(vectors)
+                    with open(self.store._file("qscale.f32"), "ab") as f:
+                        f.write(scales.tobytes())
+                else:
+                    codes = self.encode_binary(vectors)
+                with open(self.store._file(self._codes_name), "ab") as f:
+                    f.write(codes.tobytes())
+        finally:
+            self.store._unlock(lock)
+
+    def memory_bytes(self) -> int:
+        """Bytes of codes a full first-pass scan touches."""
+        rows = self._encoded_rows()
+        return rows * (self.code_bytes + (4 if self.mode == "int8" else 0))
+
+    # ─────────────────────────────────────────────────────────────
+    # FIRST PASS
+    # ─────────────────────────────────────────────────────────────
+
+    def candidates(
+        self,
+        queries: np.ndarray,
+        k: int,
+        rows: Optional[np.ndarray] = None
+    ) -> List[np.ndarray]:
+        """
+        Row numbers of the ``k`` best approximate matches for each normalised
+        query, optionally restricted to ``rows``. Every block of codes is
+        read once and scored against all queries.
+        """
+        self.sync()
+        total = self.store.total_rows
+        if total == 0:
+            return [np.zeros(0, dtype=np.int64) for _ in queries]
+
+        codes = self.store._map(
+            self.store._file(self._codes_name),
+            np.int8 if self.mode == "int8" else np.uint8,
+            (total, self.code_bytes)
+        )
+        if self.mode == "int8":
+            scales = self.store._map(self.store._file("qscale.f32"), np.float32, (total,))
+        else:
+            query_bits = self.encode_binary(queries)
+
+        candidate_rows = np.arange(total) if rows is None else np.asarray(rows, dtype=np.int64)
+        scores = np.empty((len(candidate_rows), len(queries)), dtype=np.float32)
+        block = self.store.BLOCK_ROWS
+
+        for start in range(0, len(candidate_rows), block):
+            end = start + block
+            sub = codes[candidate_rows[start:end]] if rows is not None else codes[start:end]
+            if self.mode == "int8":
+                sub_scales = scales[candidate_rows[start:end]] if rows is not None else scales[start:end]
+                scores[start:end] = (sub.astype(np.float32) @ queries.T) * sub_scales[:, None]
+            else:
+                for j, bits in enumerate(query_bits):
+                    # Negated Hamming distance, so that higher is better
+                    hamming = _POPCOUNT[np.bitwise_xor(sub, bits)].sum(axis=1, dtype=np.int32)
+                    scores[start:end, j] = -hamming
+
+        scores[self.store._dead[candidate_rows]] = -np.inf
+        return [candidate_rows[self.store.top_k(column, k)] for column in scores.T]
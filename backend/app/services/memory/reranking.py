@@ -0,0 +1,127 @@
+# backend/app/services/memory/reranking.py
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Header written by CodeIngester._generic_chunking in front of each window
+_LINES_HEADER = re.compile(r"^File: [^\n]*\nLines \d+-\d+:\n")
+
+
+def mmr_select(
+    embeddings: np.ndarray,
+    relevance: np.ndarray,
+    k: int,
+    lambda_: float = 0.7
+) -> List[int]:
+    """
+    Maximal marginal relevance: greedily pick ``k`` indices maximising
+    ``lambda_ * relevance - (1 - lambda_) * max similarity to the picks so far``.
+
+    ``relevance`` is min-max scaled to [0, 1] so it is comparable with cosine
+    similarity; the pairwise similarity matrix is computed once and the
+    running max-similarity vector is updated in place per pick.
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    if lambda_ >= 1.0 or n == 1:
+        return [int(i) for i in np.argsort(-relevance, kind="stable")[:k]]
+
+    spread = relevance.max() - relevance.min()
+    scaled = (relevance - relevance.min()) / spread if spread > 0 else np.ones(n, dtype=np.float32)
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    similarity = matrix @ matrix.T
+
+    first = int(np.argmax(scaled))
+    selected = [first]
+    max_similarity = similarity[first].copy()
+    available = np.ones(n, dtype=bool)
+    available[first] = False
+    while len(selected) < k:
+        mmr = lambda_ * scaled - (1 - lambda_) * max_similarity
+        mmr[~available] = -np.inf
+        pick = int(np.argmax(mmr))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(max_similarity, similarity[pick], out=max_similarity)
+    return selected
+
+
+def _stitch(first: Dict[str, Any], second: Dict[str, Any]) -> str:
+    """Content of two overlapping windows of one file (``first`` starts earlier)."""
+    meta_a, meta_b = first["metadata"], second["metadata"]
+    if meta_b["line_end"] <= meta_a["line_end"]:
+        return first["content"]  # contained
+    header_a = _LINES_HEADER.match(first["content"])
+    header_b = _LINES_HEADER.match(second["content"])
+    if not (header_a and header_b):
+        return first["content"] + "\n" + second["content"]
+    body_a = first["content"][header_a.end():]
+    tail = second["content"][header_b.end():].split("\n")[meta_a["line_end"] - meta_b["line_start"] + 1:]
+    body = "\n".join([body_a] + tail) if tail else body_a
+    return (
+        f"File: {meta_a['file_path']}\n"
+        f"Lines {meta_a['line_start']}-{meta_b['line_end']}:\n{body}"
+    )
+
+
+def _merge_pair(kept: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """``kept`` extended by the overlapping ``other``; ``kept`` keeps its id and scores."""
+    first, second = sorted([kept, other], key=lambda r: r["metadata"]["line_start"])
+    return {
+        **kept,
+        "content": _stitch(first, second),
+        "metadata": {
+            **kept["metadata"],
+            "line_start": first["metadata"]["line_start"],
+            "line_end": max(first["metadata"]["line_end"], second["metadata"]["line_end"])
+        },
+        "merged_ids": kept.get("merged_ids", [kept["id"]]) + other.get("merged_ids", [other["id"]])
+    }
+
+
+def merge_overlapping(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Collapse results whose line ranges overlap within the same file into a
+    single span, kept at the rank of its best-ranked member. Merged entries
+    list their source chunk ids under ``merged_ids``. Results without line
+    metadata (e.g. conversation snippets) pass through unchanged.
+
+    Only siblings (same ``parent_id``) are merged: a class outline and its
+    members' chunks nest rather than overlap, and stay separate.
+    """
+    merged: List[Optional[Dict[str, Any]]] = []
+    # (file path, parent id) → indices of its (disjoint) spans in ``merged``
+    spans: Dict[Tuple[str, str], List[int]] = {}
+    for result in results:
+        metadata = result.get("metadata") or {}
+        file_path = metadata.get("file_path")
+        if not file_path or "line_start" not in metadata or "line_end" not in metadata:
+            merged.append(result)
+            continue
+
+        file_spans = spans.setdefault((file_path, metadata.get("parent_id") or ""), [])
+        overlapping = [
+            i for i in file_spans
+            if metadata["line_start"] <= merged[i]["metadata"]["line_end"]
+            and metadata["line_end"] >= merged[i]["metadata"]["line_start"]
+        ]
+        if not overlapping:
+            file_spans.append(len(merged))
+            merged.append(result)
+            continue
+
+        # The result may bridge several spans: fold them all into the best-ranked one
+        target, rest = overlapping[0], overlapping[1:]
+        span = _merge_pair(merged[target], result)
+        for i in rest:
+            span = _merge_pair(span, merged[i])
+            merged[i] = None
+            file_spans.remove(i)
+        merged[target] = span
+    return [r for r in merged if r is not None]
@@ -0,0 +1,238 @@
+# backend/app/services/memory/snapshot.py
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"CVSNAP01"
+_ALIGN = 64
+
+
+class SnapshotWriter:
+    """
+    Streams a workspace into a single archive file:
+
+        MAGIC
+        embeddings     float16 (count, dim), row-major
+        ids            utf-8 blob + uint64 offsets (count + 1)
+        documents      utf-8 blob + uint64 offsets (count + 1)
+        metadata       JSON object of columns (field → list of values)
+        manifest       ingestion manifest JSON
+        <log name>     append-only index logs, e.g. lexical / references (optional)
+        projection     float32 (dim, input_dim) (optional)
+        footer         JSON table of contents
+        footer length  uint64
+        MAGIC
+
+    Embeddings go straight into the archive as batches arrive; ids and
+    documents are spooled to temporary files and appended at the end, so
+    memory use is bounded by one batch plus the metadata columns.
+    """
+
+    def __init__(self, path: str, workspace_id: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.workspace_id = workspace_id
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._out: BinaryIO = open(self.tmp_path, "wb")
+        self._out.write(MAGIC)
+        self._pad()
+        self._sections: Dict[str, Dict[str, Any]] = {}
+        self._embeddings_offset = self._out.tell()
+        self._ids = tempfile.TemporaryFile()
+        self._documents = tempfile.TemporaryFile()
+        self._id_offsets: List[int] = [0]
+        self._doc_offsets: List[int] = [0]
+        self._columns: Dict[str, List[Any]] = {}
+        self.count = 0
+        self.dim: Optional[int] = None
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._ids.close()
+        self._documents.close()
+        if not self._out.closed:
+            self._out.close()
+        if exc_type is not None:
+            self.tmp_path.unlink(missing_ok=True)
+
+    def _pad(self):
+        self._out.write(b"\0" * (-self._out.tell() % _ALIGN))
+
+    def write_rows(
+        self,
+        ids: List[str],
+        embeddings,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ):
+        if not len(ids):
+            return
+        matrix = np.asarray(embeddings, dtype=np.float16)
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"Embedding dim {matrix.shape[1]} does not match snapshot dim {self.dim}")
+        self._out.write(np.ascontiguousarray(matrix).tobytes())
+
+        for blob, offsets, values in (
+            (self._ids, self._id_offsets, ids),
+            (self._documents, self._doc_offsets, documents)
+        ):
+            for value in values:
+                data = (value or "").encode("utf-8")
+                blob.write(data)
+                offsets.append(offsets[-1] + len(data))
+
+        for metadata in metadatas:
+            for field in metadata.keys() - self._columns.keys():
+                self._columns[field] = [None] * self.count
+            for field, column in self._columns.items():
+                column.append(metadata.get(field))
+            self.count += 1
+
+    def _section(self, name: str, write) -> None:
+        self._pad()
+        start = self._out.tell()
+        write(self._out)
+        self._sections[name] = {"offset": start, "length": self._out.tell() - start}
+
+    def _blob_section(self, name: str, blob: BinaryIO, offsets: List[int]):
+        blob.seek(0)
+        self._section(name, lambda out: shutil.copyfileobj(blob, out, 1 << 20))
+        self._section(f"{name}_offsets", lambda out: out.write(np.asarray(offsets, dtype=np.uint64).tobytes()))
+
+    def finish(
+        self,
+        manifest: Optional[Dict[str, Any]] = None,
+        logs: Optional[Dict[str, str]] = None,
+        projection: Optional[np.ndarray] = None,
+        backend: str = ""
+    ) -> Dict[str, Any]:
+        """Write the remaining sections and the footer, then move the archive into place."""
+        self._sections["embeddings"] = {
+            "offset": self._embeddings_offset,
+            "length": self._out.tell() - self._embeddings_offset
+        }
+        self._blob_section("ids", self._ids, self._id_offsets)
+        self._blob_section("documents", self._documents, self._doc_offsets)
+        self._section("metadata", lambda out: out.write(json.dumps(self._columns).encode("utf-8")))
+        self._section("manifest", lambda out: out.write(json.dumps(manifest or {}).encode("utf-8")))
+        for name, log_path in (logs or {}).items():
+            if Path(log_path).exists():
+                with open(log_path, "rb") as src:
+                    self._section(name, lambda out: shutil.copyfileobj(src, out, 1 << 20))
+        if projection is not None:
+            self._section("projection", lambda out: out.write(
+                np.ascontiguousarray(projection, dtype=np.float32).tobytes()
+            ))
+
+        footer = {
+            "version": 1,
+            "workspace_id": self.workspace_id,
+            "backend": backend,
+            "count": self.count,
+            "dim": self.dim or 0,
+            "projection_shape": None if projection is None else list(projection.shape),
+            "created_at": time.time(),
+            "sections": self._sections
+        }
+        data = json.dumps(footer).encode("utf-8")
+        self._out.write(data)
+        self._out.write(np.uint64(len(data)).tobytes())
+        self._out.write(MAGIC)
+        self._out.flush()
+        os.fsync(self._out.fileno())
+        self._out.close()
+        os.replace(self.tmp_path, self.path)
+        return {**footer, "path": str(self.path), "bytes": self.path.stat().st_size}
+
+
+class SnapshotReader:
+    """Memory-mapped view of an archive written by ``SnapshotWriter``."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._data = np.memmap(self.path, dtype=np.uint8, mode="r")
+        if len(self._data) < 2 * len(MAGIC) + 8 or \
+                self._data[:len(MAGIC)].tobytes() != MAGIC or self._data[-len(MAGIC):].tobytes() != MAGIC:
+            raise ValueError(f"{path} is not a workspace snapshot")
+        end = len(self._data) - len(MAGIC)
+        footer_len = int(self._data[end - 8:end].view(np.uint64)[0])
+        self.footer = json.loads(self._data[end - 8 - footer_len:end - 8].tobytes())
+        self.count = self.footer["count"]
+        self.dim = self.footer["dim"]
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # The mapping is released once the last view of it is dropped
+        self._data = None
+
+    def _section(self, name: str) -> Optional[np.ndarray]:
+        """Raw uint8 view of a section, or ``None`` if the archive lacks it."""
+        section = self.footer["sections"].get(name)
+        if section is None:
+            return None
+        return self._data[section["offset"]:section["offset"] + section["length"]]
+
+    def _array(self, name: str, dtype) -> np.ndarray:
+        return self._section(name).view(dtype)
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """(count, dim) float16 matrix, zero-copy."""
+        return self._array("embeddings", np.float16).reshape(self.count, self.dim)
+
+    @property
+    def projection(self) -> Optional[np.ndarray]:
+        if self.footer.get("projection_shape") is None:
+            return None
+        return self._array("projection", np.float32).reshape(self.footer["projection_shape"]).copy()
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        return json.loads(self._section("manifest").tobytes())
+
+    def log(self, name: str) -> Optional[bytes]:
+        """Contents of an index log section (e.g. ``lexical``), if archived."""
+        section = self._section(name)
+        return None if section is None else section.tobytes()
+
+    def _strings(self, name: str, start: int, end: int) -> List[str]:
+        blob = self._section(name)
+        offsets = self._array(f"{name}_offsets", np.uint64)[start:end + 1].astype(np.int64)
+        data = blob[offsets[0]:offsets[-1]].tobytes()
+        relative = offsets - offsets[0]
+        return [
+            data[relative[i]:relative[i + 1]].decode("utf-8")
+            for i in range(end - start)
+        ]
+
+    def batches(
+        self,
+        batch_size: int = 16384
+    ) -> Iterator[Tuple[List[str], np.ndarray, List[str], List[Dict[str, Any]]]]:
+        """Yield ``(ids, float16 embeddings, documents, metadatas)`` batches."""
+        columns = json.loads(self._section("metadata").tobytes())
+        embeddings = self.embeddings
+        for start in range(0, self.count, batch_size):
+            end = min(start + batch_size, self.count)
+            metadatas = [
+                {field: values[i] for field, values in columns.items() if values[i] is not None}
+                for i in range(start, end)
+            ]
+            yield (
+                self._strings("ids", start, end),
+                embeddings[start:end],
+                self._strings("documents", start, end),
+                metadatas
+            )
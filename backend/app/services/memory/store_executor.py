@@ -0,0 +1,142 @@
+# backend/app/services/memory/store_executor.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from app.config import get_settings
+
+
+class StoreExecutor:
+    """
+    Bounded thread pool that every blocking vector-store call goes through,
+    so Chroma / memmap I/O never runs on the event loop thread.
+
+    Tracks queue depth (submitted but not yet started), in-flight calls and
+    per-operation latency, errors and timeouts. A timeout abandons the wait,
+    not the call: the worker thread finishes the operation in the background.
+    A call cancelled while still queued never runs.
+    """
+
+    def __init__(self, max_workers: int = 4, default_timeout: Optional[float] = 30.0):
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vector-store")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._max_queued = 0
+        self._ops: Dict[str, Dict[str, float]] = {}
+
+    def _op_stats(self, op: str) -> Dict[str, float]:
+        return self._ops.setdefault(op, {
+            "calls": 0, "errors": 0, "timeouts": 0,
+            "total_ms": 0.0, "max_ms": 0.0, "total_wait_ms": 0.0
+        })
+
+    async def run(
+        self,
+        op: str,
+        fn: Callable[..., Any],
+        *args,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` on the pool and await its result. The
+        timeout covers the call itself, not the time queued behind others.
+        """
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        started = loop.create_future()
+        dequeued = False
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+
+        def dequeue():
+            # Once per call: when it starts, or when it is cancelled before starting
+            nonlocal dequeued
+            if not dequeued:
+                dequeued = True
+                self._queued -= 1
+
+        def mark_started():
+            if not started.done():
+                started.set_result(None)
+
+        def call():
+            begun = time.perf_counter()
+            with self._lock:
+                dequeue()
+                self._running += 1
+                self._op_stats(op)["total_wait_ms"] += (begun - submitted) * 1000
+            try:
+                loop.call_soon_threadsafe(mark_started)
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = (time.perf_counter() - begun) * 1000
+                with self._lock:
+                    self._running -= 1
+                    stats = self._op_stats(op)
+                    stats["calls"] += 1
+                    stats["total_ms"] += elapsed
+                    stats["max_ms"] = max(stats["max_ms"], elapsed)
+
+        def on_done(_):
+            with self._lock:
+                dequeue()
+
+        try:
+            work = self._pool.submit(call)
+        except RuntimeError:
+            on_done(None)  # pool shut down
+            raise
+        work.add_done_callback(on_done)
+        future = asyncio.wrap_future(work, loop=loop)
+        try:
+            await asyncio.wait({started, future}, return_when=asyncio.FIRST_COMPLETED)
+            return await asyncio.wait_for(future, timeout or self.default_timeout)
+        except asyncio.CancelledError:
+            # Caller went away: drop the call if it has not started yet
+            future.cancel()
+            raise
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._op_stats(op)["timeouts"] += 1
+            raise
+        except Exception:
+            with self._lock:
+                self._op_stats(op)["errors"] += 1
+            raise
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "max_queue_depth": self._max_queued,
+                "in_flight": self._running,
+                "operations": {
+                    op: {
+                        **stats,
+                        "avg_ms": stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0
+                    }
+                    for op, stats in self._ops.items()
+                }
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+
+@lru_cache()
+def get_store_executor() -> StoreExecutor:
+    """Process-wide executor shared by all vector and conversation stores."""
+    settings = get_settings()
+    return StoreExecutor(
+        max_workers=settings.VECTOR_STORE_WORKERS,
+        default_timeout=settings.VECTOR_STORE_TIMEOUT
+    )
@@ -1,47 +1,695 @@
 # backend/app/services/memory/vector_store.py
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 import numpy as np
 from app.config import get_settings
+from app.models.schemas import WORKSPACE_ID_PATTERN
 from app.services.sambanova_client import SambaNovaOrchestrator
+from app.services.memory.embedding_store import MmapEmbeddingStore
+from app.services.memory.lexical_index import LexicalIndex, exact_identifier
+from app.services.memory.metadata_index import MetadataIndex, BITMAP_FIELDS
+from app.services.memory.chunk_refs import ChunkReferences
+from app.services.memory.reranking import mmr_select, merge_overlapping
+from app.services.memory.store_executor import get_store_executor
+from app.services.memory.handle_cache import HandleCache
+from app.services.memory.embedding_cache import get_query_embedding_cache
+from app.services.memory.snapshot import SnapshotReader, SnapshotWriter
 from pathlib import Path
 import asyncio
+import heapq
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+import json
+import re
+import shutil
+import time
+
+
+def leases_workspace(method):
+    """Keep the workspace's open handles from being evicted while ``method`` runs."""
+    @wraps(method)
+    async def wrapper(self, workspace_id, *args, **kwargs):
+        if not isinstance(workspace_id, str):
+            return await method(self, workspace_id, *args, **kwargs)
+        with self.workspace_in_use(workspace_id):
+            return await method(self, workspace_id, *args, **kwargs)
+    return wrapper
 
 
 class CodebaseVectorStore:
     """
     ChromaDB wrapper optimized for code retrieval.
     Supports multi-tenant isolation per workspace/project.
+
+    With ``VECTOR_BACKEND="mmap"`` vectors live in a per-workspace
+    float16 memmap store instead of Chroma (see ``MmapEmbeddingStore``).
+
+    Every blocking backend call runs on the shared store executor, never
+    on the event loop thread.
     """
     
     def __init__(self):
         self.settings = get_settings()
         self.sambanova = SambaNovaOrchestrator()
+        self.backend = self.settings.VECTOR_BACKEND
+        self.executor = get_store_executor()
+        self.query_cache = get_query_embedding_cache()
 
-        
-        
-        self.client = chromadb.PersistentClient(
-            path=self.settings.CHROMA_PERSIST_DIR,
-            settings=ChromaSettings(
-                anonymized_telemetry=False,
-                allow_reset=True
+        self.client = None
+        if self.backend == "chroma":
+            self.client = chromadb.PersistentClient(
+                path=self.settings.CHROMA_PERSIST_DIR,
+                settings=ChromaSettings(
+                    anonymized_telemetry=False,
+                    allow_reset=True
+                )
             )
-        )
         
-        # Collection per project/workspace
-        self._collections = {}
+        # Collection per project/workspace; open handles are bounded LRUs
+        def handles(opener):
+            return HandleCache(
+                opener,
+                max_handles=self.settings.OPEN_HANDLES_MAX,
+                idle_seconds=self.settings.OPEN_HANDLES_IDLE_SECONDS
+            )
+
+        self._collections = handles(self._open_collection)
+        self._embedding_stores = handles(self._open_embedding_store)
+        self._lexical_indexes = handles(self._open_lexical_index)
+        self._metadata_indexes = handles(self._open_metadata_index)
+        self._chunk_refs = handles(self._open_chunk_refs)
+        # Process-wide ingestion counters for the content-addressed chunk layer
+        self.dedupe_counters = {"chunks_ingested": 0, "embeddings_created": 0}
     
     def get_collection(self, workspace_id: str):
         """Get or create collection for workspace."""
-        if workspace_id not in self._collections:
-            self._collections[workspace_id] = self.client.get_or_create_collection(
-                name=f"codebase_{workspace_id}",
-                metadata={"hnsw:space": "cosine"},
-                embedding_function=None  # We provide embeddings manually
+        return self._collections.get(workspace_id)
+
+    def _open_collection(self, workspace_id: str):
+        return self.client.get_or_create_collection(
+            name=f"codebase_{workspace_id}",
+            metadata={"hnsw:space": "cosine"},
+            embedding_function=None  # We provide embeddings manually
+        )
+
+    def get_embedding_store(self, workspace_id: str) -> MmapEmbeddingStore:
+        """Open (lazily) the memmap store for a workspace."""
+        return self._embedding_stores.get(workspace_id)
+
+    def _open_embedding_store(self, workspace_id: str) -> MmapEmbeddingStore:
+        return MmapEmbeddingStore(
+            self._workspace_path("mmap", workspace_id),
+            dim=None,
+            defaults={
+                "quantization": self.settings.VECTOR_QUANTIZATION,
+                "rescore_factor": self.settings.QUANTIZATION_RESCORE_FACTOR,
+                "projection_dim": self.settings.PROJECTION_DIM,
+                "projection_method": self.settings.PROJECTION_METHOD
+            }
+        )
+
+    def get_lexical_index(self, workspace_id: str) -> LexicalIndex:
+        """Open (lazily) the BM25 index for a workspace."""
+        return self._lexical_indexes.get(workspace_id)
+
+    def _open_lexical_index(self, workspace_id: str) -> LexicalIndex:
+        return LexicalIndex(self._workspace_path("lexical", workspace_id, ".jsonl"))
+
+    def get_chunk_refs(self, workspace_id: str) -> ChunkReferences:
+        """Open (lazily) the content → occurrences table for a workspace."""
+        return self._chunk_refs.get(workspace_id)
+
+    def _open_chunk_refs(self, workspace_id: str) -> ChunkReferences:
+        return ChunkReferences(self._workspace_path("refs", workspace_id, ".jsonl"))
+
+    def get_metadata_index(self, workspace_id: str) -> MetadataIndex:
+        """
+        Open (lazily) the metadata filter index for a workspace, backfilling
+        it from the backend for workspaces ingested before it existed.
+        """
+        return self._metadata_indexes.get(workspace_id)
+
+    def _open_metadata_index(self, workspace_id: str) -> MetadataIndex:
+        index = MetadataIndex(self._workspace_path("metadata", workspace_id, ".jsonl"))
+        if len(index) == 0:
+            ids, metadatas = self._all_metadata(workspace_id)
+            if ids:
+                index.add(ids, metadatas)
+        return index
+
+    @contextmanager
+    def workspace_in_use(self, workspace_id: str):
+        """Lease every handle kind of a workspace (see ``HandleCache.lease``)."""
+        with ExitStack() as stack:
+            for handles in self._handle_caches():
+                stack.enter_context(handles.lease(workspace_id))
+            yield
+
+    def _handle_caches(self) -> List[HandleCache]:
+        return [
+            self._collections, self._embedding_stores, self._lexical_indexes,
+            self._metadata_indexes, self._chunk_refs
+        ]
+
+    def handle_stats(self) -> Dict[str, Any]:
+        """Open-handle LRU counters per handle kind."""
+        return {
+            "collections": self._collections.stats(),
+            "embedding_stores": self._embedding_stores.stats(),
+            "lexical_indexes": self._lexical_indexes.stats(),
+            "metadata_indexes": self._metadata_indexes.stats(),
+            "chunk_refs": self._chunk_refs.stats()
+        }
+
+    def _all_metadata(self, workspace_id: str):
+        """Ids and metadata of every stored chunk occurrence."""
+        if self.backend == "mmap":
+            store = self.get_embedding_store(workspace_id)
+            if store.count() == 0:
+                return [], []
+            records = store.read_rows(store.live_rows())
+            row_ids, row_metadatas = [r["id"] for r in records], [r["metadata"] for r in records]
+        else:
+            results = self.get_collection(workspace_id).get(include=["metadatas"])
+            row_ids, row_metadatas = results["ids"], results["metadatas"]
+        return self._occurrence_metadata(workspace_id, row_ids, row_metadatas)
+
+    def _occurrence_metadata(self, workspace_id: str, row_ids: List[str], row_metadatas: List[Dict]):
+        """Expand stored rows into their occurrences (rows without references stand for themselves)."""
+        refs = self.get_chunk_refs(workspace_id)
+        ids, metadatas = [], []
+        for row_id, metadata in zip(row_ids, row_metadatas):
+            occurrences = refs.occurrences(row_id)
+            if not occurrences:
+                ids.append(row_id)
+                metadatas.append(metadata)
+            for occurrence in occurrences:
+                ids.append(occurrence["id"])
+                metadatas.append({k: v for k, v in occurrence.items() if k != "id"})
+        return ids, metadatas
+
+    def _workspace_path(self, kind: str, workspace_id: str, suffix: str = "") -> Path:
+        """
+        ``CHROMA_PERSIST_DIR/{kind}/{workspace_id}{suffix}``. Ids that could
+        name another path (``..``, separators) are refused.
+        """
+        if not re.match(WORKSPACE_ID_PATTERN, workspace_id):
+            raise ValueError(f"Invalid workspace id {workspace_id!r}: use letters, digits, '_' and '-'")
+        return Path(self.settings.CHROMA_PERSIST_DIR) / kind / f"{workspace_id}{suffix}"
+
+    def manifest_path(self, workspace_id: str) -> Path:
+        """Location of the workspace's ingestion manifest."""
+        return self._workspace_path("manifests", workspace_id, ".json")
+
+    @leases_workspace
+    async def configure_workspace(self, workspace_id: str, **options) -> Dict[str, Any]:
+        """Update per-workspace index options (mmap backend only)."""
+        if self.backend != "mmap":
+            raise ValueError("Per-workspace index options require VECTOR_BACKEND=mmap")
+        store = self.get_embedding_store(workspace_id)
+        return await self.executor.run("configure", store.update_config, **options)
+
+    def _upsert(
+        self,
+        workspace_id: str,
+        ids: List[str],
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]]
+    ):
+        """Write vectors to the configured backend."""
+        if self.backend == "mmap":
+            store = self.get_embedding_store(workspace_id)
+            store.upsert(ids, embeddings, documents, metadatas)
+            self._maybe_fit_projection(store)
+        else:
+            self.get_collection(workspace_id).upsert(
+                ids=ids,
+                documents=documents,
+                embeddings=embeddings,
+                metadatas=metadatas
+            )
+
+    def _get(self, workspace_id: str, ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch stored chunks by id from the configured backend."""
+        if not ids:
+            return []
+        if self.backend == "mmap":
+            return self.get_embedding_store(workspace_id).get(ids)
+
+        results = self.get_collection(workspace_id).get(
+            ids=ids,
+            include=["documents", "metadatas"]
+        )
+        return [
+            {"id": id_, "content": doc, "metadata": meta}
+            for id_, doc, meta in zip(results["ids"], results["documents"], results["metadatas"])
+        ]
+
+    def _maybe_fit_projection(self, store: MmapEmbeddingStore):
+        """Fit the configured projection once enough vectors were ingested."""
+        config = store.config
+        target = config.get("projection_dim") or 0
+        if target and store.dim > target and store.count() >= self.settings.PROJECTION_SAMPLE_SIZE:
+            store.reproject(
+                target,
+                config.get("projection_method", "pca"),
+                self.settings.PROJECTION_SAMPLE_SIZE
+            )
+
+    @leases_workspace
+    async def rebuild_projection(
+        self,
+        workspace_id: str,
+        dim: Optional[int] = None,
+        method: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-project a workspace's stored vectors to ``dim`` (default: the
+        configured ``projection_dim``). Uses stored vectors only - no
+        embedding API calls.
+        """
+        if self.backend != "mmap":
+            raise ValueError("Projections require VECTOR_BACKEND=mmap")
+        store = self.get_embedding_store(workspace_id)
+        config = store.config
+        dim = dim or config.get("projection_dim")
+        if not dim:
+            raise ValueError("No projection dimension given or configured")
+        return await self.executor.run(
+            "reproject",
+            store.reproject,
+            dim,
+            method or config.get("projection_method", "pca"),
+            self.settings.PROJECTION_SAMPLE_SIZE,
+            timeout=self.settings.VECTOR_STORE_WRITE_TIMEOUT
+        )
+
+    def _query_many(
+        self,
+        workspace_id: str,
+        query_embeddings: List[List[float]],
+        filters: Optional[Dict[str, Any]],
+        top_k: int
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Batched nearest-neighbour query; one result list per embedding.
+
+        Filters are resolved through the metadata index to candidate ids
+        first, so only those chunks are scored. Hits are expanded to every
+        occurrence of their content.
+        """
+        if not filters:
+            return self._expand(workspace_id, self._query_rows(workspace_id, query_embeddings, None, top_k))
+        occurrence_ids = self.get_metadata_index(workspace_id).resolve(filters)
+        if occurrence_ids is None:
+            return self._expand(workspace_id, self._query_rows(workspace_id, query_embeddings, None, top_k))
+        candidate_ids = self.get_chunk_refs(workspace_id).contents_of(occurrence_ids)
+        return self._expand(
+            workspace_id,
+            self._query_rows(workspace_id, query_embeddings, filters, top_k, candidate_ids),
+            prefer=set(occurrence_ids)
+        )
+
+    def _filtered_rows(self, workspace_id: str, filters: Dict[str, Any]) -> Optional[set]:
+        """Stored row ids with an occurrence matching ``filters`` (``None``: no restriction)."""
+        occurrence_ids = self.get_metadata_index(workspace_id).resolve(filters)
+        if occurrence_ids is None:
+            return None
+        return set(self.get_chunk_refs(workspace_id).contents_of(occurrence_ids))
+
+    def _query_rows(
+        self,
+        workspace_id: str,
+        query_embeddings: List[List[float]],
+        filters: Optional[Dict[str, Any]],
+        top_k: int,
+        candidate_ids: Optional[List[str]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Nearest stored rows, optionally restricted to ``candidate_ids``."""
+        if candidate_ids is not None and not candidate_ids:
+            return [[] for _ in query_embeddings]
+
+        if self.backend == "mmap":
+            store = self.get_embedding_store(workspace_id)
+            rows = None if candidate_ids is None else store.rows_for(candidate_ids)
+            if rows is not None and not len(rows):
+                return [[] for _ in query_embeddings]
+            return store.query(query_embeddings, top_k=top_k, rows=rows)
+
+        if candidate_ids is not None and len(candidate_ids) <= self.settings.FILTER_LOCAL_SCORING_LIMIT:
+            return self._score_candidates(workspace_id, query_embeddings, candidate_ids, top_k)
+
+        # Large candidate sets: let Chroma pre-filter on the fields it can
+        # match exactly, over-fetch and keep only the resolved candidates;
+        # queries left with fewer than top_k fetch again with twice as many
+        collection = self.get_collection(workspace_id)
+        where = self._where_clause(filters) if filters else None
+        candidates = None if candidate_ids is None else set(candidate_ids)
+        fetch_k = top_k if candidates is None else top_k * 4
+        batches: List[List[Dict[str, Any]]] = [[] for _ in query_embeddings]
+        pending = list(range(len(query_embeddings)))
+        while pending:
+            results = collection.query(
+                query_embeddings=[query_embeddings[q] for q in pending],
+                n_results=fetch_k,
+                where=where,
+                include=["documents", "metadatas", "distances"]
             )
-        return self._collections[workspace_id]
+            short = []
+            for n, q in enumerate(pending):
+                hits = [
+                    {
+                        "id": results["ids"][n][i],
+                        "content": results["documents"][n][i],
+                        "metadata": results["metadatas"][n][i],
+                        "distance": results["distances"][n][i],
+                        "score": 1 - results["distances"][n][i]  # Convert to similarity
+                    }
+                    for i in range(len(results["ids"][n]))
+                ]
+                batches[q] = hits if candidates is None else [r for r in hits if r["id"] in candidates]
+                if len(batches[q]) < top_k and len(hits) == fetch_k:
+                    short.append(q)  # more rows to look through
+            pending = short
+            if pending:
+                count = collection.count()
+                if fetch_k >= count:
+                    break
+                fetch_k = min(fetch_k * 2, count)
+        return [results[:top_k] for results in batches]
+
+    def _expand(
+        self,
+        workspace_id: str,
+        batches: List[List[Dict[str, Any]]],
+        prefer: Optional[set] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Attach ``occurrences`` (every path a hit's content appears at) to each
+        hit. Its metadata follows the first occurrence, or the first one in
+        ``prefer`` (e.g. the occurrences matching the search filters).
+        """
+        refs = self.get_chunk_refs(workspace_id)
+        for results in batches:
+            for result in results:
+                occurrences = refs.occurrences(result["id"])
+                if not occurrences:
+                    continue
+                primary = next((o for o in occurrences if prefer and o["id"] in prefer), occurrences[0])
+                result["metadata"] = {
+                    **result["metadata"],
+                    **{k: v for k, v in primary.items() if k != "id"}
+                }
+                result["occurrences"] = occurrences
+        return batches
+
+    def _score_candidates(
+        self,
+        workspace_id: str,
+        query_embeddings: List[List[float]],
+        candidate_ids: List[str],
+        top_k: int
+    ) -> List[List[Dict[str, Any]]]:
+        """Exact cosine scoring of a small candidate set fetched from Chroma."""
+        found = self.get_collection(workspace_id).get(
+            ids=candidate_ids,
+            include=["embeddings", "documents", "metadatas"]
+        )
+        if not found["ids"]:
+            return [[] for _ in query_embeddings]
+        matrix = np.asarray(found["embeddings"], dtype=np.float32)
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        all_scores = queries @ matrix.T
+        batches = []
+        for scores in all_scores:
+            best = MmapEmbeddingStore.top_k(scores, top_k)
+            batches.append([
+                {
+                    "id": found["ids"][i],
+                    "content": found["documents"][i],
+                    "metadata": found["metadatas"][i],
+                    "distance": float(1 - scores[i]),
+                    "score": float(scores[i])
+                }
+                for i in best
+            ])
+        return batches
+
+    @staticmethod
+    def _where_clause(filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Chroma ``where`` for the filters Chroma can evaluate (exact fields only)."""
+        clauses = []
+        for field in BITMAP_FIELDS:
+            if field in filters:
+                value = filters[field]
+                if isinstance(value, (list, tuple, set)):
+                    clauses.append({field: {"$in": list(value)}})
+                else:
+                    clauses.append({field: value})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
     
+    # ─────────────────────────────────────────────────────────────
+    # SNAPSHOTS
+    # ─────────────────────────────────────────────────────────────
+
+    SNAPSHOT_BATCH = 16384
+
+    @leases_workspace
+    async def export_workspace(self, workspace_id: str, path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Write the workspace (vectors, documents, metadata, ingestion manifest
+        and BM25 index) to a single archive; see ``SnapshotWriter``.
+        """
+        path = str(self.snapshot_path(path or f"{workspace_id}.cvsnap"))
+        return await self.executor.run(
+            "export", self._export_workspace, workspace_id, path,
+            timeout=self.settings.VECTOR_STORE_WRITE_TIMEOUT
+        )
+
+    def snapshot_path(self, path: str) -> Path:
+        """
+        Resolve an archive path within ``SNAPSHOT_DIR`` (relative paths are
+        taken from there); paths leading outside it are refused.
+        """
+        root = Path(self.settings.SNAPSHOT_DIR or Path(self.settings.CHROMA_PERSIST_DIR) / "snapshots").resolve()
+        resolved = (root / path).resolve()
+        if root not in resolved.parents:
+            raise ValueError(f"Snapshot path {path!r} is outside the snapshot directory")
+        return resolved
+
+    def _export_workspace(self, workspace_id: str, path: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        logs = {}
+        if self.settings.LEXICAL_INDEX:
+            index = self.get_lexical_index(workspace_id)
+            if len(index):
+                index.compact()
+                logs["lexical"] = str(index.path)
+        refs = self.get_chunk_refs(workspace_id)
+        if refs.stats()["occurrences"]:
+            refs.compact()
+            logs["references"] = str(refs.path)
+        manifest_path = self.manifest_path(workspace_id)
+        manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+        projection = None
+        with SnapshotWriter(path, workspace_id) as writer:
+            if self.backend == "mmap":
+                store = self.get_embedding_store(workspace_id)
+                projection = store.projection_matrix()
+                live = store.live_rows() if store.count() else []
+                for start in range(0, len(live), self.SNAPSHOT_BATCH):
+                    rows = live[start:start + self.SNAPSHOT_BATCH]
+                    records = store.read_rows(rows)
+                    writer.write_rows(
+                        [r["id"] for r in records],
+                        store.vectors(rows),
+                        [r["document"] for r in records],
+                        [r["metadata"] for r in records]
+                    )
+            else:
+                collection = self.get_collection(workspace_id)
+                for offset in range(0, collection.count(), self.SNAPSHOT_BATCH):
+                    batch = collection.get(
+                        include=["embeddings", "documents", "metadatas"],
+                        limit=self.SNAPSHOT_BATCH,
+                        offset=offset
+                    )
+                    writer.write_rows(batch["ids"], batch["embeddings"], batch["documents"], batch["metadatas"])
+            summary = writer.finish(
+                manifest=manifest, logs=logs, projection=projection, backend=self.backend
+            )
+
+        summary.pop("sections")
+        summary["seconds"] = round(time.perf_counter() - started, 3)
+        return summary
+
+    async def import_workspace(
+        self,
+        path: str,
+        workspace_id: Optional[str] = None,
+        overwrite: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Load an archive written by ``export_workspace`` into ``workspace_id``
+        (default: the workspace it was exported from). No embedding calls.
+        """
+        path = str(self.snapshot_path(path))
+        return await self.executor.run(
+            "import", self._import_workspace, path, workspace_id, overwrite,
+            timeout=self.settings.VECTOR_STORE_WRITE_TIMEOUT
+        )
+
+    def _import_workspace(self, path: str, workspace_id: Optional[str], overwrite: bool) -> Dict[str, Any]:
+        started = time.perf_counter()
+        with SnapshotReader(path) as reader, ExitStack() as stack:
+            workspace_id = workspace_id or reader.footer["workspace_id"]
+            projection = reader.projection
+            if projection is not None and self.backend != "mmap":
+                raise ValueError("Snapshot holds projected vectors; import it with VECTOR_BACKEND=mmap")
+
+            # Handles opened before the import may hold offsets into files replaced below
+            for handles in self._handle_caches():
+                handles.discard(workspace_id)
+            stack.enter_context(self.workspace_in_use(workspace_id))
+
+            if self._workspace_count(workspace_id):
+                if not overwrite:
+                    raise ValueError(f"Workspace {workspace_id} is not empty; pass overwrite to replace it")
+                self._drop_workspace(workspace_id)
+
+            references_log = reader.log("references")
+            if references_log is not None:
+                self.get_chunk_refs(workspace_id).replace_log(references_log)
+            metadata_index = self.get_metadata_index(workspace_id)
+            lexical = self.get_lexical_index(workspace_id) if self.settings.LEXICAL_INDEX else None
+            lexical_log = reader.log("lexical")
+            if lexical is not None and lexical_log is not None:
+                lexical.replace_log(lexical_log)
+            # Chroma keeps embeddings as given; the mmap store expects unit vectors
+            normalise = self.backend == "mmap" and reader.footer.get("backend") != "mmap"
+
+            def batches():
+                for ids, vectors, documents, metadatas in reader.batches(self.SNAPSHOT_BATCH):
+                    if normalise:
+                        vectors = MmapEmbeddingStore._normalise(vectors)
+                    metadata_index.add(*self._occurrence_metadata(workspace_id, ids, metadatas))
+                    if lexical is not None and lexical_log is None:
+                        lexical.add(ids, documents)
+                    yield ids, vectors, documents, metadatas
+
+            if self.backend == "mmap":
+                count = self.get_embedding_store(workspace_id).bulk_load(batches(), reader.dim, projection)
+            else:
+                count = 0
+                collection = self.get_collection(workspace_id)
+                for ids, vectors, documents, metadatas in batches():
+                    # Chroma caps the number of rows per write
+                    for start in range(0, len(ids), 5000):
+                        end = start + 5000
+                        collection.upsert(
+                            ids=ids[start:end],
+                            embeddings=vectors[start:end].astype(np.float32).tolist(),
+                            documents=documents[start:end],
+                            metadatas=metadatas[start:end]
+                        )
+                    count += len(ids)
+
+            manifest = reader.manifest
+            if manifest:
+                manifest_path = self.manifest_path(workspace_id)
+                manifest_path.parent.mkdir(parents=True, exist_ok=True)
+                manifest_path.write_text(json.dumps(manifest))
+
+        return {
+            "workspace_id": workspace_id,
+            "imported_count": count,
+            "dim": reader.dim,
+            "projection": projection is not None,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+
+    def _workspace_count(self, workspace_id: str) -> int:
+        if self.backend == "mmap":
+            return self.get_embedding_store(workspace_id).count()
+        return self.get_collection(workspace_id).count()
+
+    def _drop_workspace(self, workspace_id: str):
+        """Delete every stored artefact of a workspace."""
+        if self.backend == "mmap":
+            self._embedding_stores.pop(workspace_id, None)
+            shutil.rmtree(self._workspace_path("mmap", workspace_id), ignore_errors=True)
+        else:
+            self._collections.pop(workspace_id, None)
+            self.client.delete_collection(f"codebase_{workspace_id}")
+        for handles, path in (
+            (self._lexical_indexes, self._workspace_path("lexical", workspace_id, ".jsonl")),
+            (self._metadata_indexes, self._workspace_path("metadata", workspace_id, ".jsonl")),
+            (self._chunk_refs, self._workspace_path("refs", workspace_id, ".jsonl"))
+        ):
+            handles.pop(workspace_id, None)
+            path.unlink(missing_ok=True)
+        self.manifest_path(workspace_id).unlink(missing_ok=True)
+
+    @staticmethod
+    def chunk_id(chunk: Dict[str, Any]) -> str:
+        """
+        Stable id of a code chunk occurrence within its workspace. The
+        qualified name (or start line) keeps identical bodies in one file
+        apart, e.g. the same method in two classes; rows stay keyed by
+        content alone (``content_key``).
+        """
+        where = chunk.get("qualified_name") or chunk.get("line_start", "")
+        return f"{chunk['file_path']}:{where}:{chunk['content_hash']}"
+
+    @classmethod
+    def parent_id(cls, chunk: Dict[str, Any]) -> str:
+        """Occurrence id of the chunk enclosing ``chunk`` (a method's class outline), or ``""``."""
+        if not chunk.get("parent_hash"):
+            return ""
+        return cls.chunk_id({
+            "file_path": chunk["file_path"],
+            "qualified_name": chunk.get("parent_name"),
+            "content_hash": chunk["parent_hash"]
+        })
+
+    def content_key(self, chunk: Dict[str, Any]) -> str:
+        """Id of the stored row for a chunk: shared by identical content when deduplicating."""
+        if self.settings.CHUNK_DEDUP:
+            return f"content:{chunk['content_hash']}"
+        return self.chunk_id(chunk)
+
+    @leases_workspace
+    async def delete_chunks(self, workspace_id: str, ids: List[str]) -> int:
+        """Remove chunk occurrences by id (and vectors no occurrence references any more)."""
+        if not ids:
+            return 0
+        return await self.executor.run(
+            "delete", self._delete, workspace_id, ids,
+            timeout=self.settings.VECTOR_STORE_WRITE_TIMEOUT
+        )
+
+    def _delete(self, workspace_id: str, ids: List[str]) -> int:
+        # Stored rows go only once their content has no occurrence left
+        orphaned, unreferenced = self.get_chunk_refs(workspace_id).delete(ids)
+        row_ids = orphaned + unreferenced
+        if row_ids:
+            if self.backend == "mmap":
+                self.get_embedding_store(workspace_id).delete(row_ids)
+            else:
+                self.get_collection(workspace_id).delete(ids=row_ids)
+            if self.settings.LEXICAL_INDEX:
+                self.get_lexical_index(workspace_id).delete(row_ids)
+        self.get_metadata_index(workspace_id).delete(ids)
+        return len(ids)
+
     async def ingest_code_chunks(
         self,
         workspace_id: str,
@@ -49,117 +697,398 @@ class CodebaseVectorStore:
     ) -> Dict[str, Any]:
         """
         Batch ingest code chunks with SambaNova embeddings.
+        Content-addressed: only the first chunk of each content not yet
+        stored in the workspace is embedded; every chunk is recorded as an
+        occurrence of its content.
         """
-        collection = self.get_collection(workspace_id)
-        
+        batch = await self.embed_code_chunks(workspace_id, chunks)
+        return await self.store_code_chunks(workspace_id, batch)
+
+    @leases_workspace
+    async def embed_code_chunks(
+        self,
+        workspace_id: str,
+        chunks: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        First half of ``ingest_code_chunks``: embed the contents the
+        workspace does not store yet. Returns a batch for ``store_code_chunks``.
+        """
+        indexed_at = time.time()
+        batch = {
+            "chunks": chunks,
+            "ids": [self.chunk_id(c) for c in chunks],
+            "contents": [self.content_key(c) for c in chunks],
+            "metadatas": [{
+                "file_path": c["file_path"],
+                "line_start": c["line_start"],
+                "line_end": c["line_end"],
+                "construct_type": c.get("construct_type", "unknown"),
+                "name": c.get("name", ""),
+                "qualified_name": c.get("qualified_name", ""),
+                "parent_id": self.parent_id(c),
+                "language": c["language"],
+                "indexed_at": indexed_at
+            } for c in chunks],
+            "embedded": {}  # content key → (chunk index, embedding)
+        }
+        refs = self.get_chunk_refs(workspace_id)
+        missing = await self.executor.run("refs_lookup", refs.missing, batch["contents"])
+        await self._embed_contents(batch, missing)
+        return batch
+
+    async def _embed_contents(self, batch: Dict[str, Any], wanted: set):
+        """Embed the first chunk of each content key in ``wanted`` into ``batch["embedded"]``."""
+        first_of: Dict[str, int] = {}
+        for i, content in enumerate(batch["contents"]):
+            if content in wanted and content not in batch["embedded"]:
+                first_of.setdefault(content, i)
+        new_chunks = [batch["chunks"][i] for i in first_of.values()]
+
         # Generate embeddings in batches
         batch_size = 32
         all_embeddings = []
         
-        for i in range(0, len(chunks), batch_size):
-            batch = chunks[i:i + batch_size]
-            texts = [c["embedding_text"] for c in batch]
+        for i in range(0, len(new_chunks), batch_size):
+            group = new_chunks[i:i + batch_size]
+            texts = [c["embedding_text"] for c in group]
             
             # Parallel embedding generation
             embeddings = await asyncio.gather(*[
                 self.sambanova.create_code_embedding(text, c["file_path"])
-                for text, c in zip(texts, batch)
+                for text, c in zip(texts, group)
             ])
             all_embeddings.extend(embeddings)
-        
-        # Prepare for Chroma
-        ids = [f"{c['file_path']}:{c['content_hash']}" for c in chunks]
-        documents = [c["embedding_text"] for c in chunks]
-        metadatas = [{
-            "file_path": c["file_path"],
-            "line_start": c["line_start"],
-            "line_end": c["line_end"],
-            "construct_type": c.get("construct_type", "unknown"),
-            "name": c.get("name", ""),
-            "language": c["language"]
-        } for c in chunks]
-        
-        # Upsert in batches
-        collection.upsert(
-            ids=ids,
-            documents=documents,
-            embeddings=all_embeddings,
-            metadatas=metadatas
+
+        for (content, i), embedding in zip(first_of.items(), all_embeddings):
+            batch["embedded"][content] = (i, embedding)
+
+    @leases_workspace
+    async def store_code_chunks(self, workspace_id: str, batch: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Second half of ``ingest_code_chunks``: write the embedded rows and
+        record every chunk as an occurrence. Contents deleted since the
+        batch was embedded (their last occurrence went meanwhile) are
+        embedded again first, so no occurrence points at a missing row.
+        """
+        chunks, contents, metadatas = batch["chunks"], batch["contents"], batch["metadatas"]
+        refs = self.get_chunk_refs(workspace_id)
+        missing = await self.executor.run("refs_lookup", refs.missing, contents)
+        await self._embed_contents(batch, missing)
+
+        new_rows = [(content, i, embedding) for content, (i, embedding) in batch["embedded"].items()]
+        if new_rows:
+            row_ids = [content for content, _, _ in new_rows]
+            documents = [chunks[i]["embedding_text"] for _, i, _ in new_rows]
+            await self.executor.run(
+                "upsert", self._upsert, workspace_id, row_ids, documents,
+                [embedding for _, _, embedding in new_rows],
+                [metadatas[i] for _, i, _ in new_rows],
+                timeout=self.settings.VECTOR_STORE_WRITE_TIMEOUT
+            )
+            if self.settings.LEXICAL_INDEX:
+                await self.executor.run(
+                    "lexical_add", self.get_lexical_index(workspace_id).add, row_ids, documents,
+                    timeout=self.settings.VECTOR_STORE_WRITE_TIMEOUT
+                )
+        await self.executor.run(
+            "refs_add", self._add_occurrences, workspace_id, batch["ids"], contents, metadatas,
+            timeout=self.settings.VECTOR_STORE_WRITE_TIMEOUT
         )
+        self.dedupe_counters["chunks_ingested"] += len(chunks)
+        self.dedupe_counters["embeddings_created"] += len(new_rows)
         
         return {
             "ingested_count": len(chunks),
+            "embedded_count": len(new_rows),
             "workspace_id": workspace_id,
             "unique_files": len(set(c["file_path"] for c in chunks))
         }
+
+    def _add_occurrences(
+        self,
+        workspace_id: str,
+        ids: List[str],
+        contents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ):
+        self.get_chunk_refs(workspace_id).add(ids, contents, metadatas)
+        self.get_metadata_index(workspace_id).add(ids, metadatas)
+
+    def dedupe_metrics(self) -> Dict[str, Any]:
+        """Embedding calls saved by content deduplication, and per-workspace dedupe ratios."""
+        ingested = self.dedupe_counters["chunks_ingested"]
+        created = self.dedupe_counters["embeddings_created"]
+        return {
+            "chunks_ingested": ingested,
+            "embeddings_created": created,
+            "embeddings_saved": ingested - created,
+            "workspaces": {
+                workspace_id: refs.stats() for workspace_id, refs in self._chunk_refs.items()
+            }
+        }
     
+    async def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed search queries (with the E5 retrieval instruction).
+        Cached queries are served locally; the misses go upstream in one request.
+        """
+        texts = [
+            f"Given a code query, retrieve relevant code snippets: {query}"
+            for query in queries
+        ]
+        if self.query_cache.max_entries <= 0:
+            return await self.sambanova.create_embeddings(texts)
+
+        model = self.settings.SAMBANOVA_MODEL_EMBEDDING
+        embeddings = [self.query_cache.get(model, text) for text in texts]
+        missing = list(dict.fromkeys(t for t, e in zip(texts, embeddings) if e is None))
+        if missing:
+            fetched = dict(zip(missing, await self.sambanova.create_embeddings(missing)))
+            for text, embedding in fetched.items():
+                self.query_cache.put(model, text, embedding)
+            embeddings = [e if e is not None else fetched[t] for t, e in zip(texts, embeddings)]
+        return embeddings
+
     async def search(
     self,
-    workspace_id: str,
+    workspace_id: Union[str, List[str]],
     query: str,
     filters: Optional[Dict[str, Any]] = None,
     top_k: int = 5
     ) -> List[Dict[str, Any]]:
-        top_k = max(top_k, 1)
         """
         Semantic search over codebase with optional filters.
+        A list of workspaces is searched federated (see ``federated_search``).
         """
-        collection = self.get_collection(workspace_id)
-        
-        # Generate query embedding
-        query_embedding = await self.sambanova.create_embedding(
-            f"Given a code query, retrieve relevant code snippets: {query}"
-        )
-        
-        # Build where clause for filters
-        where_clause = {}
-        if filters:
-            if "language" in filters:
-                where_clause["language"] = filters["language"]
-            if "file_path" in filters:
-                where_clause["file_path"] = {"$contains": filters["file_path"]}
-        
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k,
-            where=where_clause if where_clause else None,
-            include=["documents", "metadatas", "distances"]
+        if not isinstance(workspace_id, str):
+            federated = await self.federated_search(workspace_id, query, top_k=top_k, filters=filters)
+            return federated["results"]
+        results = await self.search_many(workspace_id, [query], top_k=top_k, filters=filters)
+        return results[0]
+
+    async def federated_search(
+        self,
+        workspace_ids: List[str],
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        code_location: Optional[Dict[str, str]] = None,
+        hybrid: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Search several workspaces with one query embedding.
+
+        The workspaces are searched concurrently, each within
+        ``FEDERATED_SEARCH_TIMEOUT``; a workspace that times out or fails is
+        left out of the results instead of holding them up. Scores are
+        min-max normalised over the results of all workspaces together into
+        ``federated_score`` (so a workspace with only weak matches stays
+        below one with strong ones) and the overall ``top_k`` is taken with
+        a heap.
+
+        Returns ``{"results": [...], "workspaces": {id: {"status",
+        "latency_ms", "count"}}}``; every result carries its ``workspace_id``.
+        """
+        workspace_ids = list(dict.fromkeys(workspace_ids))
+        top_k = max(top_k, 1)
+        query_embedding = (await self._embed_queries([query]))[0]
+        score_key = "relevance" if hybrid else "score"
+
+        async def search_one(workspace_id: str) -> List[Dict[str, Any]]:
+            if hybrid:
+                return await self._hybrid_search(
+                    workspace_id, query, code_location, top_k, query_embedding=query_embedding, filters=filters
+                )
+            with self.workspace_in_use(workspace_id):
+                batches = await self.executor.run(
+                    "query", self._query_many, workspace_id, [query_embedding], filters, top_k
+                )
+            return batches[0]
+
+        async def timed(workspace_id: str):
+            started = time.perf_counter()
+            try:
+                results = await asyncio.wait_for(
+                    search_one(workspace_id), timeout=self.settings.FEDERATED_SEARCH_TIMEOUT
+                )
+                report = {"status": "ok", "count": len(results)}
+            except asyncio.TimeoutError:
+                results, report = [], {"status": "timeout", "count": 0}
+                print(f"⚠️ [VectorStore] Federated search timed out on workspace {workspace_id}")
+            except Exception as e:
+                results, report = [], {"status": "error", "count": 0, "error": str(e)}
+                print(f"⚠️ [VectorStore] Federated search failed on workspace {workspace_id}: {e}")
+            report["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            return results, report
+
+        outcomes = await asyncio.gather(*[timed(workspace_id) for workspace_id in workspace_ids])
+
+        candidates = []
+        for workspace_id, (results, _) in zip(workspace_ids, outcomes):
+            for result in results:
+                result["workspace_id"] = workspace_id
+                candidates.append(result)
+        if candidates:
+            scores = np.array([float(r.get(score_key, 0.0)) for r in candidates])
+            spread = scores.max() - scores.min()
+            normalized = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+            for result, score in zip(candidates, normalized):
+                result["federated_score"] = float(score)
+
+        return {
+            "results": heapq.nlargest(top_k, candidates, key=lambda r: r["federated_score"]),
+            "workspaces": {
+                workspace_id: report for workspace_id, (_, report) in zip(workspace_ids, outcomes)
+            }
+        }
+
+    @leases_workspace
+    async def search_many(
+        self,
+        workspace_id: str,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        dedupe: bool = False
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Semantic search for several queries at once: one batched embedding
+        request and one batched backend query, with filters evaluated once.
+
+        Returns one result list per query. With ``dedupe``, a chunk found by
+        several queries is kept only for the query that scored it highest.
+        """
+        if not queries:
+            return []
+        top_k = max(top_k, 1)
+
+        query_embeddings = await self._embed_queries(queries)
+        batches = await self.executor.run(
+            "query", self._query_many, workspace_id, query_embeddings, filters, top_k
         )
-        
-        # Format results
-        formatted = []
-        for i in range(len(results["ids"][0])):
-            formatted.append({
-                "id": results["ids"][0][i],
-                "content": results["documents"][0][i],
-                "metadata": results["metadatas"][0][i],
-                "distance": results["distances"][0][i],
-                "score": 1 - results["distances"][0][i]  # Convert to similarity
-            })
-        
-        return formatted
+
+        if dedupe:
+            best: Dict[str, tuple] = {}
+            for q, results in enumerate(batches):
+                for result in results:
+                    if result["id"] not in best or result["score"] > best[result["id"]][0]:
+                        best[result["id"]] = (result["score"], q)
+            batches = [
+                [r for r in results if best[r["id"]][1] == q]
+                for q, results in enumerate(batches)
+            ]
+        return batches
     
-    async def hybrid_search(
+    @leases_workspace
+    async def lexical_search(
         self,
         workspace_id: str,
         query: str,
+        top_k: int = 5,
+        exact: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        BM25 search over the local inverted index (no network calls).
+        With ``exact``, only the whole identifier the query names is matched.
+        """
+        return await self.executor.run(
+            "lexical_search", self._lexical_search, workspace_id, query, top_k, exact
+        )
+
+    def _lexical_search(
+        self,
+        workspace_id: str,
+        query: str,
+        top_k: int,
+        exact: bool
+    ) -> List[Dict[str, Any]]:
+        index = self.get_lexical_index(workspace_id)
+        if exact:
+            hits = index.search_terms([exact_identifier(query)], top_k)
+        else:
+            hits = index.search(query, top_k)
+        bm25_scores = dict(hits)
+        results = self._get(workspace_id, [doc_id for doc_id, _ in hits])
+        for result in results:
+            result["bm25_score"] = bm25_scores[result["id"]]
+            result.setdefault("score", 0.0)
+        self._expand(workspace_id, [results])
+        return sorted(results, key=lambda r: r["bm25_score"], reverse=True)
+
+    async def hybrid_search(
+        self,
+        workspace_id: Union[str, List[str]],
+        query: str,
         code_location: Optional[Dict[str, str]] = None,
-        top_k: int = 5
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
-        Combine semantic search with location-based boosting.
+        Fuse semantic and BM25 results with reciprocal rank fusion, then
+        apply location-based boosting. Queries that are a single known
+        identifier (e.g. ``get_settings``) are answered lexically only,
+        skipping the embedding call.
+
+        Hits with overlapping line ranges in one file are merged into a
+        single span and the final ``top_k`` is picked by maximal marginal
+        relevance, so near-duplicate windows do not crowd out the prompt.
+        ``filters`` restrict both the semantic and the lexical hits.
+
+        A list of workspaces is searched federated (see ``federated_search``).
         """
-        # Get semantic results
-        semantic_results = await self.search(workspace_id, query, top_k=top_k * 2)
-        
-        if not code_location:
-            return semantic_results[:top_k]
-        
+        if not isinstance(workspace_id, str):
+            federated = await self.federated_search(
+                workspace_id, query, top_k=top_k, filters=filters, code_location=code_location, hybrid=True
+            )
+            return federated["results"]
+        return await self._hybrid_search(workspace_id, query, code_location, top_k, filters=filters)
+
+    @leases_workspace
+    async def _hybrid_search(
+        self,
+        workspace_id: str,
+        query: str,
+        code_location: Optional[Dict[str, str]],
+        top_k: int,
+        query_embedding: Optional[List[float]] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        # Over-fetch so merging and MMR have alternatives to choose from
+        pool_k = top_k * 4
+        index = self.get_lexical_index(workspace_id) if self.settings.LEXICAL_INDEX else None
+        identifier = exact_identifier(query) if index is not None else ""
+        allowed = None
+        if filters and index is not None:
+            # BM25 hits are matched against the filters by stored row id
+            allowed = await self.executor.run("filter_resolve", self._filtered_rows, workspace_id, filters)
+
+        def lexical_matches(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            return results if allowed is None else [r for r in results if r["id"] in allowed]
+
+        if identifier and await self.executor.run("lexical_lookup", index.contains_term, identifier):
+            candidates = lexical_matches(await self.lexical_search(workspace_id, query, top_k=pool_k, exact=True))
+            for rank, result in enumerate(candidates):
+                result["rrf_score"] = 1.0 / (self.settings.RRF_K + rank + 1)
+        else:
+            if query_embedding is None:
+                semantic_results = await self.search(workspace_id, query, filters=filters, top_k=pool_k)
+            else:
+                semantic_results = (await self.executor.run(
+                    "query", self._query_many, workspace_id, [query_embedding], filters, pool_k
+                ))[0]
+            lexical_results = []
+            if index is not None:
+                lexical_results = lexical_matches(await self.lexical_search(workspace_id, query, top_k=pool_k))
+            candidates = self._fuse(semantic_results, lexical_results)
+
         # Boost results from same/nearby files
-        target_file = code_location.get("file_path", "")
+        target_file = (code_location or {}).get("file_path", "")
         
         def score_result(result):
-            base_score = result["score"]
+            base_score = result["rrf_score"]
+            if not target_file:
+                return base_score
             file_path = result["metadata"]["file_path"]
             
             # Exact file match
@@ -176,8 +1105,93 @@ class CodebaseVectorStore:
             
             return base_score
         
-        # Re-rank and return top_k
-        scored = [(score_result(r), r) for r in semantic_results]
-        scored.sort(key=lambda x: x[0], reverse=True)
-        
-        return [r for _, r in scored[:top_k]]
\ No newline at end of file
+        for result in candidates:
+            result["relevance"] = score_result(result)
+        candidates.sort(key=lambda r: r["relevance"], reverse=True)
+
+        if self.settings.MERGE_OVERLAPPING_RESULTS:
+            candidates = merge_overlapping(candidates)
+        results = await self._diversify(workspace_id, candidates, top_k)
+        return await self._attach_parents(workspace_id, results)
+
+    async def _attach_parents(self, workspace_id: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Expand hits to their enclosing chunk only when it is worth it: once
+        ``PARENT_CONTEXT_MIN_HITS`` hits share a parent (e.g. several methods
+        of a split class) and the parent is not a hit itself, its outline is
+        attached as ``parent`` to the best-ranked of them.
+        """
+        min_hits = self.settings.PARENT_CONTEXT_MIN_HITS
+        if min_hits <= 0:
+            return results
+        hits = Counter(r["metadata"].get("parent_id") for r in results if r["metadata"].get("parent_id"))
+        present = {r["id"] for r in results} | {o["id"] for r in results for o in r.get("occurrences", [])}
+        wanted = [parent_id for parent_id, n in hits.items() if n >= min_hits and parent_id not in present]
+        if not wanted:
+            return results
+
+        parents = await self.executor.run("get_parents", self._get_parents, workspace_id, wanted)
+        for result in results:
+            parent = parents.pop(result["metadata"].get("parent_id"), None)
+            if parent is not None:
+                result["parent"] = parent
+        return results
+
+    def _get_parents(self, workspace_id: str, parent_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored parent chunks by occurrence id (parents since deleted are skipped)."""
+        refs = self.get_chunk_refs(workspace_id)
+        row_of = {parent_id: refs.contents_of([parent_id])[0] for parent_id in parent_ids}
+        rows = {row["id"]: row for row in self._get(workspace_id, list(set(row_of.values())))}
+        return {
+            parent_id: {"id": parent_id, "content": rows[row_id]["content"], "metadata": rows[row_id]["metadata"]}
+            for parent_id, row_id in row_of.items() if row_id in rows
+        }
+
+    async def _diversify(
+        self,
+        workspace_id: str,
+        candidates: List[Dict[str, Any]],
+        top_k: int
+    ) -> List[Dict[str, Any]]:
+        """Pick ``top_k`` of the ranked candidates by maximal marginal relevance."""
+        lambda_ = self.settings.MMR_LAMBDA
+        if len(candidates) <= top_k or lambda_ >= 1.0:
+            return candidates[:top_k]
+
+        vectors = await self.executor.run(
+            "get_embeddings", self._get_embeddings, workspace_id, [r["id"] for r in candidates]
+        )
+        if not vectors:
+            return candidates[:top_k]
+        dim = len(next(iter(vectors.values())))
+        zeros = np.zeros(dim, dtype=np.float32)  # no redundancy penalty if a vector is missing
+        matrix = np.stack([vectors.get(r["id"], zeros) for r in candidates])
+        picks = mmr_select(matrix, [r["relevance"] for r in candidates], top_k, lambda_)
+        return [candidates[i] for i in picks]
+
+    def _get_embeddings(self, workspace_id: str, ids: List[str]) -> Dict[str, np.ndarray]:
+        """Stored (search-space) vectors by chunk id; missing ids are skipped."""
+        if self.backend == "mmap":
+            store = self.get_embedding_store(workspace_id)
+            records = store.get(ids)
+            vectors = store.vectors([r["row"] for r in records])
+            return {r["id"]: v for r, v in zip(records, vectors)}
+
+        found = self.get_collection(workspace_id).get(ids=ids, include=["embeddings"])
+        return {
+            id_: np.asarray(embedding, dtype=np.float32)
+            for id_, embedding in zip(found["ids"], found["embeddings"])
+        }
+
+    def _fuse(self, *ranked_lists: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Reciprocal rank fusion: sum of 1 / (k + rank) over the input rankings."""
+        fused: Dict[str, Dict[str, Any]] = {}
+        for results in ranked_lists:
+            for rank, result in enumerate(results):
+                entry = fused.setdefault(result["id"], {**result, "rrf_score": 0.0})
+                entry["rrf_score"] += 1.0 / (self.settings.RRF_K + rank + 1)
+                if "bm25_score" in result:
+                    entry["bm25_score"] = result["bm25_score"]
+                if "distance" in result:
+                    entry["score"] = result["score"]
+        return sorted(fused.values(), key=lambda r: r["rrf_score"], reverse=True)
@@ -3,7 +3,7 @@ import asyncio
 import openai
 import json
 import base64
-from typing import List, Dict, Any, Optional, AsyncGenerator, Callable
+from typing import List, Dict, Any, Optional, AsyncGenerator, Awaitable, Callable
 from tenacity import retry, stop_after_attempt, wait_exponential
 import httpx
 from app.config import get_settings
@@ -130,6 +130,28 @@ Provide:
                 print(f"❌ [SambaNova] Error type: {type(e).__name__}, Detail: {str(e)}")
                 raise
     
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts in a single request (results keep input order)."""
+        if not texts:
+            return []
+        async with self._semaphore:
+            MAX_CHARS = 12000
+            inputs = [t[:MAX_CHARS] + "..." if len(t) > MAX_CHARS else t for t in texts]
+            try:
+                response = await self.client.embeddings.create(
+                    model=self.models["embedding"],
+                    input=inputs,
+                    encoding_format="float"
+                )
+            except Exception as e:
+                print(f"❌ [SambaNova] Batch embedding failed ({len(texts)} inputs): {type(e).__name__}: {e}")
+                raise
+            data = sorted(response.data or [], key=lambda d: d.index)
+            if len(data) != len(texts):
+                raise ValueError(f"SambaNova API returned {len(data)} embeddings for {len(texts)} inputs")
+            return [d.embedding for d in data]
+    
     async def create_code_embedding(self, code: str, context: str = "") -> List[float]:
         """
         Specialized embedding for code with context prefix.
@@ -314,7 +336,7 @@ Thinking Process:
     async def agent_loop(
         self,
         initial_query: str,
-        context_retriever: Callable[[str], List[Dict[str, Any]]],
+        context_retriever: Callable[[List[str]], Awaitable[List[List[Dict[str, Any]]]]],
         action_executor: Callable[[Dict], Dict[str, Any]],
         max_iterations: int = 5
     ) -> Dict[str, Any]:
@@ -325,6 +347,9 @@ Thinking Process:
         3. Propose actions
         4. Execute and verify
         5. Iterate if needed
+
+        ``context_retriever`` takes a list of queries and returns one result
+        list per query, so all searches requested in a turn run as one batch.
         """
         
         conversation = [
@@ -355,6 +380,16 @@ Always explain your reasoning before taking action."""},
                     "iterations": iteration + 1
                 }
             
+            # Batch every search requested in this turn into one retrieval
+            search_queries = [
+                json.loads(tc.function.arguments)["query"]
+                for tc in message.tool_calls
+                if tc.function.name == "search_codebase"
+            ]
+            search_results = {}
+            if search_queries:
+                search_results = dict(zip(search_queries, await context_retriever(search_queries)))
+            
             # Execute tool calls
             for tool_call in message.tool_calls:
                 tool_name = tool_call.function.name
@@ -369,9 +404,9 @@ Always explain your reasoning before taking action."""},
                 
                 # Execute
                 if tool_name == "search_codebase":
-                    results = context_retriever(arguments["query"])
+                    results = search_results[arguments["query"]]
                     observation = f"Found {len(results)} relevant files: " + \
-                                 ", ".join([r["file_path"] for r in results[:3]])
+                                 ", ".join([r["metadata"].get("file_path", "unknown") for r in results[:3]])
                     
                 elif tool_name == "edit_file":
                     result = await action_executor({
@@ -416,6 +451,9 @@ Always explain your reasoning before taking action."""},
             formatted += f"\n--- Context {i} ---\n"
             formatted += f"File: {ctx.get('file_path', 'unknown')}\n"
             formatted += f"Type: {ctx.get('type', 'code')}\n"
+            if ctx.get("parent"):
+                # Outline of the enclosing class, attached once for several of its members
+                formatted += f"Enclosing outline:\n{ctx['parent'].get('content', '')[:2000]}\n"
             formatted += f"Content:\n{ctx.get('content', '')[:2000]}\n"
         return formatted
     
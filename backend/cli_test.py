@@ -174,6 +174,49 @@ def ingest_codebase(repo_path: str, workspace_id: str = "default"):
     result = request("POST", "/ingest/codebase", params=params)
     console.print(Panel(json.dumps(result, indent=2), title="Ingestion Started", border_style="blue"))
 
+@app.command()
+def ingest_job(job_id: str, cancel: bool = False, resume: bool = False):
+    """Show (or cancel / resume) a codebase ingestion job"""
+    if cancel:
+        result = request("POST", f"/ingest/jobs/{job_id}/cancel")
+    elif resume:
+        result = request("POST", f"/ingest/jobs/{job_id}/resume")
+    else:
+        result = request("GET", f"/ingest/jobs/{job_id}")
+    console.print(Panel(json.dumps(result, indent=2), title="Ingestion Job", border_style="blue"))
+
+@app.command()
+def rebuild_projection(workspace_id: str = "default", dim: int = 0, method: str = ""):
+    """Re-project a workspace's stored vectors without re-embedding"""
+    payload = {}
+    if dim:
+        payload["dim"] = dim
+    if method:
+        payload["method"] = method
+
+    console.print(f"[yellow]Rebuilding projection for workspace {workspace_id}...[/yellow]")
+    result = request("POST", f"/workspaces/{workspace_id}/projection/rebuild", json_data=payload)
+    console.print(Panel(json.dumps(result, indent=2), title="Projection Rebuilt", border_style="green"))
+
+@app.command()
+def export_workspace(workspace_id: str = "default", path: str = ""):
+    """Write a workspace snapshot archive on the server (path within SNAPSHOT_DIR)"""
+    payload = {"path": path} if path else {}
+
+    console.print(f"[yellow]Exporting workspace {workspace_id}...[/yellow]")
+    result = request("POST", f"/workspaces/{workspace_id}/export", json_data=payload)
+    console.print(Panel(json.dumps(result, indent=2), title="Workspace Exported", border_style="green"))
+
+@app.command()
+def import_workspace(path: str, workspace_id: str = "default", overwrite: bool = False):
+    """Load a snapshot archive (path within SNAPSHOT_DIR) into a workspace"""
+    console.print(f"[yellow]Importing {path} into workspace {workspace_id}...[/yellow]")
+    result = request(
+        "POST", f"/workspaces/{workspace_id}/import",
+        json_data={"path": path, "overwrite": overwrite}
+    )
+    console.print(Panel(json.dumps(result, indent=2), title="Workspace Imported", border_style="green"))
+
 @app.command()
 def list_endpoints():
     """Show all available test commands"""
@@ -187,6 +230,9 @@ def list_endpoints():
     table.add_row("upload-screenshot", "Test vision endpoint", "python cli_test.py upload-screenshot screenshot.png")
     table.add_row("upload-audio", "Test audio transcription", "python cli_test.py upload-audio meeting.mp3")
     table.add_row("ingest-codebase", "Trigger repo ingestion", "python cli_test.py ingest-codebase /path/to/repo")
+    table.add_row("rebuild-projection", "Re-project stored vectors", "python cli_test.py rebuild-projection --dim 512")
+    table.add_row("export-workspace", "Snapshot a workspace index", "python cli_test.py export-workspace --workspace-id demo")
+    table.add_row("import-workspace", "Restore a workspace snapshot", "python cli_test.py import-workspace demo.cvsnap --workspace-id demo")
     table.add_row("list-endpoints", "Show this help", "python cli_test.py list-endpoints")
 
     console.print(table)
@@ -0,0 +1,53 @@
+# backend/tests/conftest.py
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Settings are read once per process: point them at a scratch store first
+os.environ.setdefault("SAMBANOVA_API_KEY", "test")
+os.environ["CHROMA_PERSIST_DIR"] = tempfile.mkdtemp(prefix="chroma_test_")
+os.environ["VECTOR_BACKEND"] = "mmap"
+os.environ["EMBEDDING_DIM"] = "64"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def fake_embedding(text: str):
+    """Deterministic unit vector per text, instead of the embedding API."""
+    rng = np.random.default_rng(int(hashlib.md5(text.encode()).hexdigest()[:8], 16))
+    vector = rng.standard_normal(64)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+@pytest.fixture
+def vector_store():
+    from app.services.memory.vector_store import CodebaseVectorStore
+
+    async def create_code_embedding(text, context=""):
+        return fake_embedding(text)
+
+    async def create_embeddings(texts):
+        return [fake_embedding(text) for text in texts]
+
+    store = CodebaseVectorStore()
+    store.sambanova.create_code_embedding = create_code_embedding
+    store.sambanova.create_embeddings = create_embeddings
+    return store
+
+
+@pytest.fixture
+def ingester():
+    from app.services.ingestion.code_ingester import CodeIngester
+
+    ingester = CodeIngester(workers=1)
+    yield ingester
+    ingester.close()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
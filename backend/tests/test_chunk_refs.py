@@ -0,0 +1,70 @@
+# backend/tests/test_chunk_refs.py
+import asyncio
+
+from app.services.memory.chunk_refs import ChunkReferences
+
+
+def test_content_is_orphaned_only_when_its_last_occurrence_goes(tmp_path):
+    refs = ChunkReferences(str(tmp_path / "refs.jsonl"))
+    refs.add(["a.py:f:h1", "b.py:f:h1", "c.py:g:h2"], ["content:h1", "content:h1", "content:h2"], [{}, {}, {}])
+    assert refs.missing(["content:h1", "content:h3"]) == {"content:h3"}
+
+    assert refs.delete(["a.py:f:h1"]) == ([], [])
+    assert refs.delete(["b.py:f:h1", "legacy-row"]) == (["content:h1"], ["legacy-row"])
+    assert refs.contents_of(["c.py:g:h2", "legacy-row"]) == ["content:h2", "legacy-row"]
+    assert refs.stats() == {"contents": 1, "occurrences": 1, "dedupe_ratio": 0.0}
+
+
+def test_moving_an_occurrence_replaces_its_metadata(tmp_path):
+    refs = ChunkReferences(str(tmp_path / "refs.jsonl"))
+    refs.add(["a.py:f:h1"], ["content:h1"], [{"line_start": 1}])
+    refs.add(["a.py:f:h1"], ["content:h1"], [{"line_start": 6}])
+    assert refs.occurrences("content:h1") == [{"id": "a.py:f:h1", "line_start": 6}]
+
+
+def test_reader_replays_a_log_compacted_and_grown_by_another_handle(tmp_path):
+    path = str(tmp_path / "refs.jsonl")
+    reader, writer = ChunkReferences(path), ChunkReferences(path)
+    writer.add([f"old{i}" for i in range(50)], [f"content:{i}" for i in range(50)], [{}] * 50)
+    assert reader.stats()["occurrences"] == 50
+
+    writer.delete([f"old{i}" for i in range(40)])
+    writer.compact()
+    writer.add([f"new{i}" for i in range(200)], ["content:shared"] * 200, [{}] * 200)
+
+    assert reader.stats() == {"contents": 11, "occurrences": 210, "dedupe_ratio": 1 - 11 / 210}
+
+
+def _copy(file_path: str):
+    return {
+        "file_path": file_path,
+        "line_start": 1,
+        "line_end": 2,
+        "name": "slugify",
+        "qualified_name": "slugify",
+        "language": "python",
+        "content_hash": "shared-slugify",
+        "embedding_text": "def slugify(text):\n    return text.lower()"
+    }
+
+
+def test_identical_chunks_share_one_row_until_the_last_copy_is_deleted(vector_store):
+    copies = [_copy("app/utils.py"), _copy("scripts/utils.py")]
+    stored = asyncio.run(vector_store.ingest_code_chunks("dedup", copies))
+    assert (stored["ingested_count"], stored["embedded_count"]) == (2, 1)
+    store = vector_store.get_embedding_store("dedup")
+    assert store.count() == 1
+
+    first, second = (vector_store.chunk_id(c) for c in copies)
+    asyncio.run(vector_store.delete_chunks("dedup", [first]))
+
+    assert store.count() == 1
+    hits = asyncio.run(vector_store.lexical_search("dedup", "slugify", exact=True))
+    assert [h["metadata"]["file_path"] for h in hits] == ["scripts/utils.py"]
+    assert [o["id"] for o in hits[0]["occurrences"]] == [second]
+
+    asyncio.run(vector_store.delete_chunks("dedup", [second]))
+
+    assert store.count() == 0
+    assert asyncio.run(vector_store.lexical_search("dedup", "slugify", exact=True)) == []
+    assert vector_store.get_metadata_index("dedup").resolve({"symbol": "slugify"}) == []
@@ -0,0 +1,59 @@
+# backend/tests/test_code_hierarchy.py
+import asyncio
+
+from app.services.ingestion.manifest import IngestionManifest
+from app.services.ingestion.pipeline import IngestionPipeline
+
+
+def _big_class(name: str, header: str = "") -> str:
+    # Longer than CLASS_SPLIT_LINES, so methods become chunks of their own
+    methods = "".join(
+        f"    def handle_{i}(self, widget):\n"
+        f"        '''Handle widget {i}.'''\n"
+        f"        return widget.frobnicate({i})\n\n"
+        for i in range(20)
+    )
+    return f"class {name}:\n    '''Manages widgets.'''\n{header}\n{methods}"
+
+
+def _ingest(vector_store, ingester, workspace_id: str, repo_path: str):
+    manifest = IngestionManifest(str(vector_store.manifest_path(workspace_id)))
+    pipeline = IngestionPipeline(vector_store, ingester, workspace_id, manifest)
+    try:
+        return asyncio.run(pipeline.run(repo_path))
+    finally:
+        manifest.save()
+
+
+def _methods(vector_store, workspace_id: str):
+    ids, metadatas = vector_store.get_chunk_refs(workspace_id).all_occurrences()
+    return {i: m for i, m in zip(ids, metadatas) if m["construct_type"] == "method"}
+
+
+def test_outline_edit_keeps_parent_expansion(vector_store, ingester, tmp_path):
+    source = tmp_path / "widgets.py"
+    source.write_text(_big_class("WidgetManager", "    LIMIT = 1\n"))
+    _ingest(vector_store, ingester, "outline_edit", str(tmp_path))
+
+    # Only the class body outside the methods changes: the outline is a new chunk
+    source.write_text(_big_class("WidgetManager", "    LIMIT = 2\n"))
+    summary = _ingest(vector_store, ingester, "outline_edit", str(tmp_path))
+    assert summary["chunks_embedded"] == 1
+
+    methods = _methods(vector_store, "outline_edit")
+    assert len(methods) == 20
+    parent_ids = {m["parent_id"] for m in methods.values()}
+    parents = vector_store._get_parents("outline_edit", sorted(parent_ids))
+    assert list(parents) == sorted(parent_ids)
+    assert "LIMIT = 2" in next(iter(parents.values()))["content"]
+
+
+def test_identical_methods_in_two_classes_keep_their_own_occurrence(vector_store, ingester, tmp_path):
+    (tmp_path / "widgets.py").write_text(_big_class("First") + "\n" + _big_class("Second"))
+    _ingest(vector_store, ingester, "two_classes", str(tmp_path))
+
+    methods = _methods(vector_store, "two_classes")
+    assert len(methods) == 40
+    handle_0 = [m for m in methods.values() if m["name"] == "handle_0"]
+    assert {m["qualified_name"] for m in handle_0} == {"First.handle_0", "Second.handle_0"}
+    assert len({m["parent_id"] for m in handle_0}) == 2
@@ -0,0 +1,77 @@
+# backend/tests/test_code_ingester.py
+import asyncio
+import os
+
+import pytest
+
+from app.services.ingestion.code_ingester import CodeIngester
+from app.services.ingestion.manifest import IngestionManifest
+
+
+def _repo(tmp_path, files: int = 20):
+    for i in range(files):
+        package = tmp_path / f"pkg_{i % 3}"
+        package.mkdir(exist_ok=True)
+        (package / f"module_{i}.py").write_text(
+            f"def handler_{i}(request):\n    return request\n\n\nclass Model{i}:\n    pass\n"
+        )
+    return str(tmp_path)
+
+
+async def _collect(ingester, repo_path, manifest=None):
+    return [record async for record in ingester.ingest_repository(repo_path, manifest=manifest)]
+
+
+def _chunk_keys(records):
+    return sorted((r["file_path"], r["name"], r["line_start"]) for r in records if r.get("type") != "file")
+
+
+@pytest.fixture
+def pool_ingester():
+    ingester = CodeIngester(workers=2)
+    yield ingester
+    ingester.close()
+
+
+def test_parallel_parsing_yields_every_chunk_once(pool_ingester, ingester, tmp_path):
+    repo_path = _repo(tmp_path)
+
+    parallel = asyncio.run(_collect(pool_ingester, repo_path))
+    serial = asyncio.run(_collect(ingester, repo_path))
+
+    assert len(_chunk_keys(parallel)) == 40
+    assert _chunk_keys(parallel) == _chunk_keys(serial)
+
+
+def test_manifest_statuses_follow_each_file(ingester, tmp_path):
+    repo_path = _repo(tmp_path, files=3)
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+    for record in asyncio.run(_collect(ingester, repo_path, manifest)):
+        if record.get("type") == "file":
+            manifest.update(record["file_path"], record["size"], record["mtime_ns"], record["content_hash"])
+
+    (tmp_path / "pkg_0" / "module_0.py").write_text("def changed():\n    pass\n")
+    os.remove(tmp_path / "pkg_1" / "module_1.py")
+    records = asyncio.run(_collect(ingester, repo_path, manifest))
+
+    statuses = {r["file_path"]: r["status"] for r in records if r.get("type") == "file"}
+    assert statuses == {
+        os.path.join("pkg_0", "module_0.py"): "changed",
+        os.path.join("pkg_1", "module_1.py"): "removed",
+        os.path.join("pkg_2", "module_2.py"): "unchanged",
+    }
+    assert _chunk_keys(records) == [(os.path.join("pkg_0", "module_0.py"), "changed", 1)]
+
+
+def test_dead_parser_worker_is_reported_and_the_pool_restarted(pool_ingester, tmp_path):
+    repo_path = _repo(tmp_path, files=2)
+
+    async def crash_then_parse():
+        crashed = await pool_ingester._run_in_pool(os._exit, 1, ["broken.py"])
+        return crashed, await _collect(pool_ingester, repo_path)
+
+    crashed, records = asyncio.run(crash_then_parse())
+
+    assert [(r["type"], r["file_path"]) for r in crashed] == [("error", "broken.py")]
+    assert "parser worker died" in crashed[0]["error"]
+    assert len(_chunk_keys(records)) == 4
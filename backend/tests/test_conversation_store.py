@@ -0,0 +1,95 @@
+# backend/tests/test_conversation_store.py
+import asyncio
+
+import pytest
+
+from app.services.memory.conversation_store import ConversationStore
+from conftest import fake_embedding
+
+
+@pytest.fixture
+def conversations():
+    store = ConversationStore()
+    store.settings = store.settings.model_copy(update={"CONVERSATION_FLUSH_INTERVAL": 60.0})
+    store.failures = 0
+
+    async def create_embeddings(texts):
+        if store.failures:
+            store.failures -= 1
+            raise RuntimeError("embedding service unavailable")
+        return [fake_embedding(text) for text in texts]
+
+    async def create_embedding(text):
+        return fake_embedding(text)
+
+    store.sambanova.create_embeddings = create_embeddings
+    store.sambanova.create_embedding = create_embedding
+    return store
+
+
+async def _stop(store: ConversationStore):
+    for task in list(store._background):
+        task.cancel()
+    await asyncio.gather(*store._background, return_exceptions=True)
+
+
+@pytest.mark.anyio
+async def test_failed_flush_requeues_and_the_next_one_writes(conversations):
+    await conversations.store_message("requeue", "user", "how do I parse a config file")
+    await conversations.store_message("requeue", "assistant", "use configparser")
+    conversations.failures = 1
+
+    with pytest.raises(RuntimeError):
+        await conversations.flush()
+    assert conversations._pending_count == 2
+    assert [m[1] for m in conversations._pending["requeue"]] == [
+        "how do I parse a config file", "use configparser"
+    ]
+
+    assert await conversations.flush() == 2
+    found = await conversations.search_conversation("requeue", "use configparser", top_k=5)
+    assert {r["content"] for r in found} == {"how do I parse a config file", "use configparser"}
+    await _stop(conversations)
+
+
+@pytest.mark.anyio
+async def test_session_deleted_during_a_failing_flush_is_not_requeued(conversations):
+    release = asyncio.Event()
+
+    async def slow_failure(texts):
+        await release.wait()
+        raise RuntimeError("embedding service unavailable")
+
+    conversations.sambanova.create_embeddings = slow_failure
+    await conversations.store_message("doomed", "user", "forget me")
+    await conversations.store_message("kept", "user", "remember me")
+
+    flush = asyncio.create_task(conversations.flush())
+    await asyncio.sleep(0.05)
+    delete = asyncio.create_task(conversations.delete_session("doomed"))
+    await asyncio.sleep(0.05)
+    assert not delete.done()  # waits for the flush in progress
+    release.set()
+
+    with pytest.raises(RuntimeError):
+        await flush
+    await delete
+    assert list(conversations._pending) == ["kept"]
+    assert conversations._pending_count == 1
+    await _stop(conversations)
+
+
+def test_legacy_messages_keep_one_row_each(conversations):
+    legacy = conversations.client.get_or_create_collection("conv_legacy")
+    legacy.add(
+        ids=["m1", "m2"],
+        documents=["thanks", "thanks"],
+        embeddings=[fake_embedding("thanks")] * 2,
+        metadatas=[{"role": "user"}, {"role": "user"}]
+    )
+
+    collection = conversations.get_collection()
+
+    migrated = collection.get(where={"session_id": "legacy"})
+    assert len(migrated["ids"]) == 2 and len(set(migrated["ids"])) == 2
+    assert "conv_legacy" not in [c.name for c in conversations.client.list_collections()]
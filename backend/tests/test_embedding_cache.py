@@ -0,0 +1,77 @@
+# backend/tests/test_embedding_cache.py
+import asyncio
+
+import pytest
+
+from app.services.memory import embedding_cache
+from app.services.memory.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("m", "a", [1.0])
+    cache.put("m", "b", [2.0])
+    assert cache.get("m", "a") == [1.0]
+    cache.put("m", "c", [3.0])
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0] and cache.get("m", "c") == [3.0]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = EmbeddingCache(ttl_seconds=60)
+    cache.put("m", "q", [1.0])
+    clock[0] += 59
+    assert cache.get("m", "q") == [1.0]
+    clock[0] += 2
+
+    assert cache.get("m", "q") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["size"]) == (1, 1, 1, 0)
+
+
+def test_models_do_not_share_entries():
+    cache = EmbeddingCache()
+    cache.put("old-model", "q", [1.0])
+    assert cache.get("new-model", "q") is None
+
+
+def test_persisted_cache_keeps_unexpired_entries_in_lru_order(tmp_path, clock):
+    path = tmp_path / "cache.npz"
+    cache = EmbeddingCache(max_entries=3, ttl_seconds=100, persist_path=str(path))
+    cache.put("m", "stale", [0.0, 0.0])
+    clock[0] += 60
+    cache.put("m", "a", [1.0, 0.0])
+    cache.put("m", "b", [0.0, 1.0])
+    clock[0] += 50
+    cache.save()
+
+    restored = EmbeddingCache(max_entries=1, ttl_seconds=100, persist_path=str(path))
+
+    assert restored.stats()["size"] == 1
+    assert restored.get("m", "b") == pytest.approx([0.0, 1.0])
+    assert restored.get("m", "stale") is None
+
+
+def test_repeated_queries_skip_the_embedding_request(vector_store):
+    calls = []
+    create_embeddings = vector_store.sambanova.create_embeddings
+
+    async def counting(texts):
+        calls.append(list(texts))
+        return await create_embeddings(texts)
+
+    vector_store.sambanova.create_embeddings = counting
+    first = asyncio.run(vector_store._embed_queries(["cache query one", "cache query one", "cache query two"]))
+    again = asyncio.run(vector_store._embed_queries(["cache query two", "cache query three"]))
+
+    assert [len(texts) for texts in calls] == [2, 1]
+    assert first[0] == first[1] and again[0] == first[2]
@@ -0,0 +1,87 @@
+# backend/tests/test_embedding_store.py
+import os
+
+import numpy as np
+import pytest
+
+from app.services.memory.embedding_store import MmapEmbeddingStore
+
+
+def _unit(seed: int, dim: int = 8) -> np.ndarray:
+    vector = np.random.default_rng(seed).standard_normal(dim)
+    return vector / np.linalg.norm(vector)
+
+
+def _stored(store: MmapEmbeddingStore, id_: str) -> np.ndarray:
+    rows = {record["id"]: row for row, record in zip(store.live_rows(), store.read_rows(store.live_rows()))}
+    return store.vectors([rows[id_]])[0]
+
+
+def test_failed_upsert_leaves_no_rows(tmp_path):
+    store = MmapEmbeddingStore(str(tmp_path))
+    store.upsert(["a"], [_unit(1)], ["a"], [{}])
+    with pytest.raises(TypeError):
+        store.upsert(["b"], [_unit(2)], ["b"], [{"bad": object()}])
+    store.upsert(["c"], [_unit(3)], ["c"], [{}])
+
+    assert store.count() == 2
+    assert np.allclose(_stored(store, "c"), _unit(3), atol=1e-3)
+
+
+def test_upsert_after_interrupted_write_reads_its_own_vectors(tmp_path):
+    store = MmapEmbeddingStore(str(tmp_path))
+    store.upsert(["a"], [_unit(1)], ["a"], [{}])
+    # A writer that died before its commit point (``rows.idx``) left these behind
+    with open(store._file("append.f16"), "ab") as f:
+        f.write(np.ones((3, 8), dtype=np.float16).tobytes())
+    with open(store._file("rows.jsonl"), "ab") as f:
+        f.write(b'{"id": "orphan", "document": "", "metadata": {}}\n{"id": "trunc')
+
+    store.upsert(["b", "c"], [_unit(2), _unit(3)], ["b", "c"], [{}, {}])
+
+    reopened = MmapEmbeddingStore(str(tmp_path))
+    assert reopened.count() == 3
+    for id_, seed in (("a", 1), ("b", 2), ("c", 3)):
+        assert np.allclose(_stored(reopened, id_), _unit(seed), atol=1e-3)
+
+
+def test_rows_deleted_by_another_handle_leave_the_id_map(tmp_path):
+    ours, theirs = MmapEmbeddingStore(str(tmp_path)), MmapEmbeddingStore(str(tmp_path))
+    ours.upsert(["a", "b"], [_unit(1), _unit(2)], ["a", "b"], [{}, {}])
+    assert [r["id"] for r in ours.get(["a", "b"])] == ["a", "b"]
+
+    assert theirs.delete(["a"]) == 1
+
+    assert [r["id"] for r in ours.get(["a", "b"])] == ["b"]
+    assert len(ours.rows_for(["a", "b"])) == 1
+    assert ours.delete(["a"]) == 0
+
+
+def test_close_releases_handles_and_the_store_reopens_lazily(tmp_path):
+    store = MmapEmbeddingStore(str(tmp_path))
+    store.upsert(["a"], [_unit(1)], ["a"], [{}])
+    assert store.get(["a"]) and store._rows_fh is not None
+
+    store.close()
+    assert store._rows_fh is None and store._base is None
+
+    store.upsert(["b"], [_unit(2)], ["b"], [{}])
+    assert [r["id"] for r in store.get(["a", "b"])] == ["a", "b"]
+
+
+def test_int8_codes_realign_after_a_sync_that_died_midway(tmp_path):
+    store = MmapEmbeddingStore(str(tmp_path))
+    store.upsert([f"r{i}" for i in range(10)], [_unit(i) for i in range(10)], [""] * 10, [{}] * 10)
+    quantizer = store.quantizer("int8")
+    quantizer.sync()
+    # Scales of two more rows written, their codes not
+    with open(store._file("qscale.f32"), "ab") as f:
+        f.write(np.ones(2, dtype=np.float32).tobytes())
+
+    store.upsert([f"r{i}" for i in range(10, 20)], [_unit(i) for i in range(10, 20)], [""] * 10, [{}] * 10)
+    quantizer.sync()
+
+    assert os.path.getsize(store._file("qscale.f32")) == 20 * 4
+    assert os.path.getsize(store._file("qint8.i8")) == 20 * 8
+    for i in (3, 15):
+        assert quantizer.candidates(_unit(i)[None, :].astype(np.float32), 1)[0][0] == i
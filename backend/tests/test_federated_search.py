@@ -0,0 +1,53 @@
+# backend/tests/test_federated_search.py
+import asyncio
+
+import pytest
+
+
+def _chunk(directory: str, name: str):
+    return {
+        "file_path": f"{directory}/{name}.py",
+        "line_start": 1,
+        "line_end": 2,
+        "name": name,
+        "language": "python",
+        "content_hash": f"{directory}:{name}",
+        "embedding_text": f"def {name}(request):\n    return parse_request(request)"
+    }
+
+
+@pytest.fixture
+def workspaces(vector_store):
+    for workspace_id in ("fed_a", "fed_b"):
+        chunks = [_chunk(d, f"{workspace_id}_{d}_{i}") for d in ("src", "tests") for i in range(6)]
+        asyncio.run(vector_store.ingest_code_chunks(workspace_id, chunks))
+    return ["fed_a", "fed_b"]
+
+
+def test_federated_scores_are_merged_over_all_workspaces(vector_store, workspaces):
+    found = asyncio.run(vector_store.federated_search(workspaces, "parse_request", top_k=10))
+
+    results = found["results"]
+    assert len(results) == 10
+    assert {r["workspace_id"] for r in results} == set(workspaces)
+    scores = [r["federated_score"] for r in results]
+    assert scores == sorted(scores, reverse=True) and scores[0] == 1.0
+    assert all(found["workspaces"][w]["status"] == "ok" for w in workspaces)
+
+
+def test_failing_workspace_is_reported_and_left_out(vector_store, workspaces):
+    found = asyncio.run(vector_store.federated_search([*workspaces, "../escape"], "parse_request", top_k=5))
+
+    assert found["workspaces"]["../escape"]["status"] == "error"
+    assert len(found["results"]) == 5
+    assert {r["workspace_id"] for r in found["results"]} <= set(workspaces)
+
+
+def test_federated_hybrid_search_applies_the_filters_in_every_workspace(vector_store, workspaces):
+    results = asyncio.run(vector_store.hybrid_search(
+        workspaces, "parse_request request", top_k=8, filters={"file_path": "src"}
+    ))
+
+    assert results
+    assert {r["workspace_id"] for r in results} == set(workspaces)
+    assert all(r["metadata"]["file_path"].startswith("src/") for r in results)
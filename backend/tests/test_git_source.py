@@ -0,0 +1,55 @@
+# backend/tests/test_git_source.py
+import subprocess
+
+from app.services.ingestion.git_source import GitChangeSet, git_blob_id
+
+
+def _git(repo, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def _monorepo(tmp_path):
+    (tmp_path / "other").mkdir()
+    (tmp_path / "other" / "x.py").write_text("x = 1\n")
+    package = tmp_path / "packages" / "api"
+    package.mkdir(parents=True)
+    (package / "a.py").write_text("a = 1\n")
+    (package / "b.py").write_text("b = 1\n")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "initial")
+    return package
+
+
+def test_commit_delta_of_a_subdirectory_uses_its_relative_paths(tmp_path):
+    package = _monorepo(tmp_path)
+    first = _git(tmp_path, "rev-parse", "HEAD")
+    (package / "a.py").write_text("a = 2\n")
+    (package / "b.py").unlink()
+    (tmp_path / "other" / "x.py").write_text("x = 2\n")
+    _git(tmp_path, "commit", "-q", "-am", "change")
+
+    manifest = {"a.py": {"content_hash": ""}, "b.py": {"content_hash": ""}}
+    changes = GitChangeSet(str(package), from_commit=first).plan(manifest, lambda path: True)
+
+    assert changes.files == [("a.py", git_blob_id(b"a = 2\n"))]
+    assert changes.removed == ["b.py"]
+
+
+def test_worktree_changes_of_a_subdirectory_use_its_relative_paths(tmp_path):
+    package = _monorepo(tmp_path)
+    manifest = {
+        path: {"content_hash": git_blob_id((package / path).read_bytes())}
+        for path in ("a.py", "b.py")
+    }
+    (package / "a.py").write_text("a = 2\n")
+    (package / "b.py").unlink()
+    (tmp_path / "other" / "x.py").write_text("x = 2\n")
+
+    changes = GitChangeSet(str(package)).plan(manifest, lambda path: True)
+
+    assert changes.files == [("a.py", None)]
+    assert changes.removed == ["b.py"]
@@ -0,0 +1,64 @@
+# backend/tests/test_handle_cache.py
+import time
+
+from app.services.memory.handle_cache import HandleCache
+
+
+class Handle:
+    def __init__(self, key):
+        self.key = key
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_least_recently_used_handle_is_closed_first():
+    cache = HandleCache(Handle, max_handles=2)
+    a, b = cache.get("a"), cache.get("b")
+    cache.get("a")
+    cache.get("c")
+
+    assert "b" not in cache and b.closed
+    assert not a.closed and "a" in cache and "c" in cache
+    assert cache.get("a") is a
+    assert cache.stats()["opens"] == 3 and cache.stats()["evictions"] == 1
+
+
+def test_idle_handles_are_swept_on_access():
+    cache = HandleCache(Handle, max_handles=10, idle_seconds=0.05)
+    old = cache.get("old")
+    time.sleep(0.06)
+    cache.get("new")
+
+    assert old.closed and "old" not in cache
+    assert cache.get("old") is not old
+
+
+def test_leased_handle_outlives_the_bound_until_released():
+    cache = HandleCache(Handle, max_handles=1)
+    with cache.lease("a"):
+        a = cache.get("a")
+        b = cache.get("b")
+        assert not a.closed and len(cache) == 2
+        # The bound is restored from handles nobody uses
+        cache.get("c")
+        assert b.closed and not a.closed
+    assert a.closed and list(cache.items())[0][0] == "c"
+
+
+def test_leased_handle_is_not_swept_when_idle():
+    cache = HandleCache(Handle, max_handles=10, idle_seconds=0.05)
+    with cache.lease("busy"):
+        busy = cache.get("busy")
+        idle = cache.get("idle")
+        time.sleep(0.06)
+        cache.evict_idle()
+        assert idle.closed and not busy.closed
+    assert busy.closed
+
+
+def test_workspace_lease_covers_every_handle_kind(vector_store):
+    with vector_store.workspace_in_use("leased"):
+        assert all(stats["in_use"] == 1 for stats in vector_store.handle_stats().values())
+    assert all(stats["in_use"] == 0 for stats in vector_store.handle_stats().values())
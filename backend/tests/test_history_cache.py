@@ -0,0 +1,64 @@
+# backend/tests/test_history_cache.py
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.analysis.context_engine import ContextEngine
+from app.services.analysis.history_cache import HistoryEmbeddingCache
+from conftest import fake_embedding
+
+
+def test_top_k_ranks_cached_messages_by_similarity():
+    cache = HistoryEmbeddingCache()
+    cache.add("s", ["x", "y", "xy"], [[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]])
+
+    top, similarities = cache.top_k("s", ["y", "x", "xy"], [3.0, 0.0], 2)
+
+    assert top.tolist() == [1, 2]
+    assert similarities.tolist() == pytest.approx([1.0, np.sqrt(0.5)])
+
+
+def test_session_matrix_grows_and_keeps_earlier_rows():
+    cache = HistoryEmbeddingCache()
+    contents = [f"message {i}" for i in range(200)]
+    for start in range(0, 200, 30):
+        batch = contents[start:start + 30]
+        assert cache.missing("s", batch) == batch
+        cache.add("s", batch, [fake_embedding(c) for c in batch])
+
+    assert cache.missing("s", contents + ["new"]) == ["new"]
+    top, similarities = cache.top_k("s", contents, fake_embedding("message 3"), 1)
+    assert top.tolist() == [3] and similarities[0] == pytest.approx(1.0)
+
+
+def test_least_recently_used_session_is_dropped():
+    cache = HistoryEmbeddingCache(max_sessions=2)
+    for session in ("a", "b"):
+        cache.add(session, ["hi"], [[1.0]])
+    cache.session("a")
+    cache.add("c", ["hi"], [[1.0]])
+
+    assert cache.missing("a", ["hi"]) == []
+    assert cache.missing("b", ["hi"]) == ["hi"]
+
+
+def test_growing_history_only_embeds_new_messages():
+    engine = ContextEngine()
+    requests = []
+
+    async def create_embeddings(texts):
+        requests.append(list(texts))
+        return [fake_embedding(t) for t in texts]
+
+    engine.sambanova.create_embeddings = create_embeddings
+    history = [{"role": "user", "content": "how is the cache keyed"}, {"role": "assistant", "content": "by content hash"}]
+    asyncio.run(engine._extract_relevant_conversations("cache key", history, "chat-1"))
+    history.append({"role": "user", "content": "and evicted?"})
+    found = asyncio.run(engine._extract_relevant_conversations("by content hash", history, "chat-1"))
+
+    assert requests == [
+        ["how is the cache keyed", "by content hash", "cache key"],
+        ["and evicted?", "by content hash"]
+    ]
+    assert found[0]["content"] == "by content hash" and found[0]["metadata"]["role"] == "assistant"
@@ -0,0 +1,151 @@
+# backend/tests/test_jobs.py
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.services.ingestion import pipeline as pipeline_module
+from app.services.ingestion.jobs import IngestionJob, JobManager
+from app.services.ingestion.manifest import IngestionManifest
+
+
+class _FollowedJob:
+    def __init__(self, status: str):
+        self.status = status
+
+    def to_dict(self):
+        return {"id": "job1", "status": self.status}
+
+
+class _Jobs:
+    """Job whose progress stream only ends once it is cancelled."""
+
+    def __init__(self):
+        self.intervals = []
+        self.cancelled = None
+
+    def get(self, job_id):
+        return _FollowedJob("running") if job_id == "job1" else None
+
+    async def follow(self, job_id, interval=1.0):
+        self.intervals.append(interval)
+        self.cancelled = asyncio.Event()
+        yield {"id": job_id, "status": "running"}
+        await self.cancelled.wait()
+        yield {"id": job_id, "status": "cancelled"}
+
+    async def cancel(self, job_id):
+        self.cancelled.set()
+        return _FollowedJob("cancelled")
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    jobs = _Jobs()
+    monkeypatch.setitem(main.services, "jobs", jobs)
+    return jobs
+
+
+def test_ingest_cancel_is_received_while_a_job_is_followed(jobs):
+    with TestClient(main.app).websocket_connect("/ws") as ws:
+        ws.send_json({"type": "ingest_status", "job_id": "job1", "interval": 0})
+        assert ws.receive_json()["job"]["status"] == "running"
+
+        ws.send_json({"type": "ingest_cancel", "job_id": "job1"})
+        replies = [ws.receive_json(), ws.receive_json()]
+
+    assert [r["job"]["status"] for r in replies] == ["cancelled", "cancelled"]
+    assert jobs.intervals == [main.get_settings().INGEST_STATUS_MIN_INTERVAL]
+
+
+def test_following_an_unknown_job_reports_an_error(jobs):
+    with TestClient(main.app).websocket_connect("/ws") as ws:
+        ws.send_json({"type": "ingest_status", "job_id": "missing"})
+        assert ws.receive_json() == {"type": "error", "content": "Unknown ingestion job: missing"}
+
+
+@pytest.fixture
+def ingestion_jobs(vector_store, ingester, tmp_path, monkeypatch):
+    """Jobs running the real ingestion, checkpointing after every stored batch of two slow-to-embed chunks."""
+    settings = pipeline_module.get_settings().model_copy(update={
+        "INGEST_QUEUE_SIZE": 1, "INGEST_EMBED_BATCH": 2, "INGEST_EMBED_CONCURRENCY": 1,
+        "INGEST_CHECKPOINT_INTERVAL": 1e-6
+    })
+    monkeypatch.setattr(pipeline_module, "get_settings", lambda: settings)
+    embed = vector_store.embed_code_chunks
+
+    async def slow_embed(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return await embed(*args, **kwargs)
+
+    monkeypatch.setattr(vector_store, "embed_code_chunks", slow_embed)
+    jobs = JobManager(str(tmp_path / "jobs"), main._run_ingestion_job)
+    monkeypatch.setitem(main.services, "vector_store", vector_store)
+    monkeypatch.setitem(main.services, "ingester", ingester)
+    monkeypatch.setitem(main.services, "jobs", jobs)
+    return jobs
+
+
+def _repo(path, count: int) -> str:
+    path.mkdir()
+    for i in range(count):
+        (path / f"module_{i:02}.py").write_text(f"def handler_{i}(value):\n    return value + {i}\n")
+    return str(path)
+
+
+@pytest.mark.anyio
+async def test_cancelled_job_resumes_from_its_checkpoint(ingestion_jobs, vector_store, tmp_path):
+    job = ingestion_jobs.submit("resumed", _repo(tmp_path / "repo", 20))
+    while job.pipeline is None or job.pipeline.files_done < 4:
+        await asyncio.sleep(0.01)
+
+    await ingestion_jobs.cancel(job.id)
+
+    assert job.status == "cancelled" and job.task.done()
+    with open(ingestion_jobs._path(job.id)) as f:
+        record = json.load(f)
+    assert record["status"] == "cancelled" and record["attempts"] == 1
+    stored = IngestionManifest(str(vector_store.manifest_path("resumed"))).files
+    assert 4 <= len(stored) < 20
+    assert record["progress"]["files_done"] >= 4
+
+    ingestion_jobs.resume(job.id)
+    await job.task
+
+    assert job.status == "completed" and job.attempts == 2
+    assert job.summary["skipped"] == len(stored)
+    assert job.summary["added"] + job.summary["changed"] == 20 - len(stored)
+    ids, metadatas = vector_store.get_chunk_refs("resumed").all_occurrences()
+    assert sorted(m["name"] for m in metadatas) == sorted(f"handler_{i}" for i in range(20))
+    with pytest.raises(ValueError):
+        ingestion_jobs.resume(job.id)
+
+
+@pytest.mark.anyio
+async def test_jobs_running_at_shutdown_are_resumed_on_recovery(tmp_path):
+    runs = []
+
+    async def runner(job):
+        runs.append(job.id)
+        return {"added": 1}
+
+    directory = str(tmp_path / "jobs")
+    crashed = IngestionJob("crashed", str(tmp_path))
+    crashed.status = "running"
+    finished = IngestionJob("finished", str(tmp_path))
+    finished.status = "completed"
+    stale = JobManager(directory, runner)
+    stale.persist(crashed)
+    stale.persist(finished)
+    (tmp_path / "jobs" / "broken.json").write_text("{")
+
+    jobs = JobManager(directory, runner)
+    resumed = jobs.recover()
+
+    assert [job.id for job in resumed] == [crashed.id]
+    await resumed[0].task
+    assert runs == [crashed.id]
+    assert jobs.get(crashed.id).status == "completed" and jobs.get(crashed.id).summary == {"added": 1}
+    assert jobs.get(finished.id).status == "completed"
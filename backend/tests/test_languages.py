@@ -0,0 +1,186 @@
+# backend/tests/test_languages.py
+import pytest
+
+from app.services.ingestion.languages import parser_for
+
+
+def _chunks(ingester, tmp_path, name: str, source: str):
+    path = tmp_path / name
+    if parser_for(path.suffix) is None:
+        pytest.skip(f"no grammar installed for {path.suffix}")
+    path.write_text(source)
+    return ingester._process_file(path, str(tmp_path))
+
+
+def _spans(chunks):
+    return [(c["construct_type"], c["qualified_name"], c["line_start"], c["line_end"]) for c in chunks]
+
+
+JAVASCRIPT = """import { parse } from "./parse";
+
+// Handles one request
+export function handle(request) {
+  return parse(request);
+}
+
+const route = async (path) => {
+  return handle(path);
+};
+
+export class Router {
+  add(path) {
+    this.paths.push(path);
+  }
+}
+"""
+
+
+def test_javascript_functions_arrow_functions_and_classes(ingester, tmp_path):
+    chunks = _chunks(ingester, tmp_path, "router.js", JAVASCRIPT)
+
+    assert _spans(chunks) == [
+        ("module_block", "", 1, 1),
+        ("function_definition", "handle", 3, 6),
+        ("function_definition", "route", 8, 10),
+        ("class_definition", "Router", 12, 16),
+    ]
+    assert chunks[1]["docstring"] == "// Handles one request"
+    assert {c["language"] for c in chunks} == {"javascript"}
+
+
+TYPESCRIPT = """export interface Request {
+  path: string;
+}
+
+export type Handler = (request: Request) => string;
+
+export abstract class Base {
+  abstract run(): void;
+}
+"""
+
+
+def test_typescript_types_are_their_own_chunks(ingester, tmp_path):
+    chunks = _chunks(ingester, tmp_path, "types.ts", TYPESCRIPT)
+
+    assert _spans(chunks) == [
+        ("type_definition", "Request", 1, 3),
+        ("type_definition", "Handler", 5, 5),
+        ("class_definition", "Base", 7, 9),
+    ]
+    assert {c["language"] for c in chunks} == {"typescript"}
+
+
+GO = """package server
+
+import "fmt"
+
+// Server answers requests.
+type Server struct {
+\tname string
+}
+
+func (s *Server) Serve(path string) string {
+\treturn fmt.Sprintf("%s%s", s.name, path)
+}
+
+func New(name string) *Server {
+\treturn &Server{name: name}
+}
+"""
+
+
+def test_go_types_methods_and_functions(ingester, tmp_path):
+    chunks = _chunks(ingester, tmp_path, "server.go", GO)
+
+    assert _spans(chunks) == [
+        ("module_block", "", 1, 3),
+        ("type_definition", "Server", 5, 8),
+        ("method", "Serve", 10, 12),
+        ("function_definition", "New", 14, 16),
+    ]
+    assert chunks[1]["docstring"] == "// Server answers requests."
+
+
+RUST = """use std::fmt;
+
+/// A parsed request.
+#[derive(Debug)]
+pub struct Request {
+    path: String,
+}
+
+impl Request {
+    pub fn new(path: &str) -> Self {
+        Request { path: path.to_string() }
+    }
+
+    pub fn path(&self) -> &str {
+        &self.path
+    }
+}
+"""
+
+
+def test_rust_attributes_stay_with_their_item_and_large_impls_are_split(ingester, tmp_path):
+    ingester.CLASS_SPLIT_LINES = 5
+    chunks = _chunks(ingester, tmp_path, "request.rs", RUST)
+
+    assert _spans(chunks) == [
+        ("module_block", "", 1, 1),
+        ("type_definition", "Request", 3, 7),
+        ("class_definition", "Request", 9, 17),
+        ("method", "Request.new", 10, 12),
+        ("method", "Request.path", 14, 16),
+    ]
+    assert chunks[1]["content"].startswith("/// A parsed request.\n#[derive(Debug)]")
+    outline, new = chunks[2], chunks[3]
+    assert "pub fn new(path: &str) -> Self { ... }" in outline["content"]
+    assert "Request { path" not in outline["content"]
+    assert new["parent_hash"] == outline["content_hash"] and new["parent_name"] == "Request"
+    assert "Signature: pub fn new(path: &str) -> Self" in new["embedding_text"]
+
+
+JAVA = """package app;
+
+/** Routes requests. */
+public class Router {
+    private final String name;
+
+    public Router(String name) {
+        this.name = name;
+    }
+
+    // Route one path
+    public String route(String path) {
+        return name + path;
+    }
+}
+"""
+
+
+def test_java_classes_are_split_into_an_outline_and_members(ingester, tmp_path):
+    ingester.CLASS_SPLIT_LINES = 5
+    chunks = _chunks(ingester, tmp_path, "Router.java", JAVA)
+
+    assert _spans(chunks) == [
+        ("module_block", "", 1, 1),
+        ("class_definition", "Router", 3, 15),
+        ("method", "Router.Router", 7, 9),
+        ("method", "Router.route", 11, 14),
+    ]
+    outline = chunks[1]["content"]
+    assert "private final String name;" in outline
+    assert "public String route(String path) { ... }" in outline
+    assert "return name + path;" not in outline
+    assert chunks[3]["docstring"] == "// Route one path"
+
+
+def test_files_without_a_grammar_fall_back_to_line_windows(ingester, tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("\n".join(f"line {i}" for i in range(10)))
+
+    chunks = ingester._process_file(path, str(tmp_path))
+
+    assert chunks and chunks[0]["line_start"] == 1
+    assert {c["construct_type"] for c in chunks} == {"chunk"}
@@ -0,0 +1,66 @@
+# backend/tests/test_lexical_index.py
+import threading
+
+from app.services.memory.lexical_index import LexicalIndex, exact_identifier, tokenize_code
+
+
+def test_tokenizer_splits_identifiers_into_their_parts():
+    assert tokenize_code("getSettings") == ["getsettings", "get", "settings"]
+    assert tokenize_code("parse_config_file") == ["parse_config_file", "parse", "config", "file"]
+    assert exact_identifier("`app.config.get_settings`") == "get_settings"
+    assert exact_identifier("how do settings load") == ""
+
+
+def test_search_ranks_the_chunk_with_the_query_terms_first(tmp_path):
+    index = LexicalIndex(str(tmp_path / "lexical.jsonl"))
+    index.add(["a", "b"], ["def parse_config(path): return load(path)", "def render_widget(): pass"])
+    assert [doc_id for doc_id, _ in index.search("parse config")] == ["a"]
+    index.delete(["a"])
+    assert index.search("parse config") == []
+
+
+def test_compact_keeps_entries_added_by_another_process(tmp_path):
+    path = str(tmp_path / "lexical.jsonl")
+    ours, theirs = LexicalIndex(path), LexicalIndex(path)
+    ours.add(["a"], ["def parse_config(): pass"])
+    theirs.add(["b"], ["def render_widget(): pass"])
+
+    ours.compact()
+
+    reopened = LexicalIndex(path)
+    assert len(reopened) == 2
+    assert [doc_id for doc_id, _ in reopened.search("render_widget")] == ["b"]
+
+
+def test_reader_replays_a_log_compacted_and_grown_by_another_handle(tmp_path):
+    path = str(tmp_path / "lexical.jsonl")
+    reader, writer = LexicalIndex(path), LexicalIndex(path)
+    writer.add([f"old{i}" for i in range(50)], [f"def old_function_{i}(): pass" for i in range(50)])
+    assert len(reader) == 50
+
+    # Compacted elsewhere, then appended past the reader's offset
+    writer.delete([f"old{i}" for i in range(40)])
+    writer.compact()
+    writer.add([f"new{i}" for i in range(200)], [f"def new_function_{i}(): pass" for i in range(200)])
+
+    assert len(reader) == 210
+    assert [doc_id for doc_id, _ in reader.search("new_function_7")][0] == "new7"
+    assert "old3" not in [doc_id for doc_id, _ in reader.search("old_function_3")]
+
+
+def test_concurrent_writers_on_one_log_keep_every_record(tmp_path):
+    path = str(tmp_path / "lexical.jsonl")
+
+    def write(worker: int):
+        index = LexicalIndex(path)  # one handle per writer, as in separate processes
+        for batch in range(20):
+            ids = [f"w{worker}-{batch}-{i}" for i in range(5)]
+            index.add(ids, [f"def handler_{worker}_{batch}_{i}(): pass" for i in range(5)])
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(LexicalIndex(path)) == 4 * 20 * 5
@@ -0,0 +1,84 @@
+# backend/tests/test_metadata_index.py
+import asyncio
+
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+from app.services.memory.metadata_index import MetadataIndex
+
+
+def _meta(file_path: str, name: str, language: str = "py", construct_type: str = "function_definition"):
+    return {"file_path": file_path, "language": language, "construct_type": construct_type, "name": name}
+
+
+def test_resolve_intersects_bitmaps_path_prefixes_and_symbols(tmp_path):
+    index = MetadataIndex(str(tmp_path / "metadata.jsonl"))
+    index.add(
+        ["app/a.py:parse", "app/b.py:Parser", "web/c.ts:parse"],
+        [
+            _meta("app/a.py", "parse"),
+            _meta("app/b.py", "Parser", construct_type="class_definition"),
+            _meta("web/c.ts", "parse", language="ts"),
+        ]
+    )
+
+    assert index.resolve({}) is None
+    assert index.resolve({"file_path": "./app/"}) == ["app/a.py:parse", "app/b.py:Parser"]
+    assert index.resolve({"symbol": "parse", "language": ["py", "go"]}) == ["app/a.py:parse"]
+    assert index.resolve({"construct_type": "class_definition"}) == ["app/b.py:Parser"]
+    index.delete(["app/a.py:parse"])
+    assert index.resolve({"symbol": "parse"}) == ["web/c.ts:parse"]
+
+
+def test_compact_keeps_entries_added_by_another_process(tmp_path):
+    path = str(tmp_path / "metadata.jsonl")
+    ours, theirs = MetadataIndex(path), MetadataIndex(path)
+    ours.add(["a.py:parse"], [_meta("a.py", "parse")])
+    theirs.add(["b.py:render"], [_meta("b.py", "render")])
+
+    ours.compact()
+
+    reopened = MetadataIndex(path)
+    assert len(reopened) == 2
+    assert reopened.resolve({"symbol": "render"}) == ["b.py:render"]
+
+
+def test_reader_replays_a_log_compacted_and_grown_by_another_handle(tmp_path):
+    path = str(tmp_path / "metadata.jsonl")
+    reader, writer = MetadataIndex(path), MetadataIndex(path)
+    writer.add([f"old{i}" for i in range(50)], [_meta(f"old/{i}.py", f"old_{i}") for i in range(50)])
+    assert len(reader) == 50
+
+    writer.delete([f"old{i}" for i in range(40)])
+    writer.compact()
+    writer.add([f"new{i}" for i in range(200)], [_meta(f"new/{i}.py", f"new_{i}") for i in range(200)])
+
+    assert len(reader) == 210
+    assert reader.resolve({"file_path": "old/"}) == [f"old{i}" for i in range(40, 50)]
+
+
+def test_chroma_prefix_filter_fetches_until_top_k_candidates_survive(vector_store):
+    vector_store.backend = "chroma"
+    vector_store.settings = vector_store.settings.model_copy(update={"FILTER_LOCAL_SCORING_LIMIT": 0})
+    vector_store.client = chromadb.PersistentClient(
+        path=vector_store.settings.CHROMA_PERSIST_DIR,
+        settings=ChromaSettings(anonymized_telemetry=False)
+    )
+    chunks = [
+        {
+            "file_path": f"{'pkg/target' if i % 20 == 0 else 'pkg/other'}/module_{i}.py",
+            "line_start": 1,
+            "line_end": 2,
+            "name": f"handler_{i}",
+            "language": "python",
+            "content_hash": f"{i:032x}",
+            "embedding_text": f"def handler_{i}(request):\n    return {i}"
+        }
+        for i in range(400)
+    ]
+    asyncio.run(vector_store.ingest_code_chunks("chroma_prefix", chunks))
+
+    results = asyncio.run(vector_store.search("chroma_prefix", "handler", filters={"file_path": "pkg/target"}, top_k=8))
+
+    assert len(results) == 8
+    assert all(r["metadata"]["file_path"].startswith("pkg/target/") for r in results)
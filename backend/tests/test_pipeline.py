@@ -0,0 +1,111 @@
+# backend/tests/test_pipeline.py
+import asyncio
+import json
+
+from app.services.ingestion import pipeline as pipeline_module
+from app.services.ingestion.manifest import IngestionManifest
+from app.services.ingestion.pipeline import IngestionPipeline
+
+
+def _ingest(vector_store, ingester, workspace_id: str, repo_path: str):
+    manifest = IngestionManifest(str(vector_store.manifest_path(workspace_id)))
+    pipeline = IngestionPipeline(vector_store, ingester, workspace_id, manifest)
+    try:
+        return asyncio.run(pipeline.run(repo_path))
+    finally:
+        manifest.save()
+
+
+def _small_stages(monkeypatch, **update):
+    settings = pipeline_module.get_settings().model_copy(update={
+        "INGEST_QUEUE_SIZE": 1, "INGEST_EMBED_BATCH": 2, **update
+    })
+    monkeypatch.setattr(pipeline_module, "get_settings", lambda: settings)
+
+
+def _repo(path, count: int):
+    for i in range(count):
+        (path / f"module_{i}.py").write_text(f"def handler_{i}(value):\n    return value + {i}\n")
+    return str(path)
+
+
+def _occurrences(vector_store, workspace_id: str):
+    ids, metadatas = vector_store.get_chunk_refs(workspace_id).all_occurrences()
+    return {m["name"]: m for m in metadatas}
+
+
+FOO = "def foo(value):\n    return value + 1\n"
+
+
+def test_function_moved_within_its_file_is_recorded_at_its_new_lines(vector_store, ingester, tmp_path):
+    source = tmp_path / "module.py"
+    source.write_text(FOO)
+    _ingest(vector_store, ingester, "moved", str(tmp_path))
+    foo = _occurrences(vector_store, "moved")["foo"]
+    assert (foo["line_start"], foo["line_end"]) == (1, 2)
+
+    source.write_text("def bar():\n    return 0\n\n\n" + FOO)
+    summary = _ingest(vector_store, ingester, "moved", str(tmp_path))
+
+    assert summary["chunks_embedded"] == 1  # only bar
+    foo = _occurrences(vector_store, "moved")["foo"]
+    assert (foo["line_start"], foo["line_end"]) == (5, 6)
+    results = asyncio.run(vector_store.search("moved", FOO, top_k=2))
+    assert {r["metadata"]["name"]: r["metadata"]["line_start"] for r in results} == {"foo": 5, "bar": 1}
+
+
+def test_bounded_queues_throttle_the_stages_and_a_rerun_skips_everything(
+    vector_store, ingester, tmp_path, monkeypatch
+):
+    _small_stages(monkeypatch)
+    repo = _repo(tmp_path, 12)
+    manifest = IngestionManifest(str(vector_store.manifest_path("staged")))
+    pipeline = IngestionPipeline(vector_store, ingester, "staged", manifest)
+    summary = asyncio.run(pipeline.run(repo))
+    manifest.save()
+
+    assert summary["added"] == 12 and summary["chunks_embedded"] == 12
+    stages = pipeline.metrics()["stages"]
+    for name in ("read", "parse", "embed", "store"):
+        assert stages[name]["queue"]["capacity"] == 1
+        assert stages[name]["queue"]["max"] <= 1
+    assert stages["embed"]["items"] == 12  # six batches of two chunks
+    assert pipeline.progress()["files_done"] == 12
+
+    rerun = _ingest(vector_store, ingester, "staged", repo)
+    assert rerun["skipped"] == 12
+    assert rerun["chunks_embedded"] == 0 and rerun["chunks_deleted"] == 0
+
+
+def test_checkpoints_only_list_stored_chunks(vector_store, ingester, tmp_path, monkeypatch):
+    _small_stages(monkeypatch, INGEST_CHECKPOINT_INTERVAL=1e-6)
+    manifest = IngestionManifest(str(vector_store.manifest_path("checkpointed")))
+    pipeline = IngestionPipeline(vector_store, ingester, "checkpointed", manifest)
+    checkpoints = []
+
+    async def on_checkpoint():
+        with open(manifest.path) as f:
+            files = json.load(f)["files"]
+        ids, _ = vector_store.get_chunk_refs("checkpointed").all_occurrences()
+        listed = {chunk_id for entry in files.values() for chunk_id in entry["chunk_ids"]}
+        assert listed <= set(ids)
+        checkpoints.append(len(files))
+
+    pipeline.on_checkpoint = on_checkpoint
+    asyncio.run(pipeline.run(_repo(tmp_path, 10)))
+
+    assert checkpoints and checkpoints == sorted(checkpoints)
+    assert 0 < checkpoints[-1] <= 10
+
+
+def test_removed_file_is_forgotten_once_its_chunks_are_deleted(vector_store, ingester, tmp_path):
+    repo = _repo(tmp_path, 3)
+    _ingest(vector_store, ingester, "removal", repo)
+    (tmp_path / "module_1.py").unlink()
+
+    summary = _ingest(vector_store, ingester, "removal", repo)
+
+    assert summary["removed"] == 1 and summary["chunks_deleted"] == 1
+    assert set(_occurrences(vector_store, "removal")) == {"handler_0", "handler_2"}
+    manifest = IngestionManifest(str(vector_store.manifest_path("removal")))
+    assert set(manifest.files) == {"module_0.py", "module_2.py"}
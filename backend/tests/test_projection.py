@@ -0,0 +1,83 @@
+# backend/tests/test_projection.py
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.memory.embedding_store import MmapEmbeddingStore
+from conftest import fake_embedding
+
+
+@pytest.fixture
+def low_rank_store(tmp_path):
+    """64-d vectors spanning a 12-d subspace, so 16 dimensions keep their geometry."""
+    rng = np.random.default_rng(3)
+    vectors = rng.standard_normal((800, 12)) @ rng.standard_normal((12, 64)) + 0.01 * rng.standard_normal((800, 64))
+    store = MmapEmbeddingStore(str(tmp_path))
+    ids = [f"r{i}" for i in range(len(vectors))]
+    store.upsert(ids, vectors, ids, [{} for _ in ids])
+    return store, vectors
+
+
+def _top_ids(store, queries, k=5):
+    return [[hit["id"] for hit in hits] for hits in store.query(queries, top_k=k)]
+
+
+@pytest.mark.parametrize("method", ["pca", "random"])
+def test_reprojection_keeps_search_results_for_raw_queries(low_rank_store, method):
+    store, vectors = low_rank_store
+    queries = vectors[:20] + 0.05 * np.random.default_rng(4).standard_normal((20, 64))
+    before = _top_ids(store, queries)
+
+    info = store.reproject(16 if method == "pca" else 48, method)
+
+    assert info["version"] == 1 and info["input_dim"] == 64
+    assert store.dim == info["dim"] and store.count() == 800
+    after = _top_ids(store, queries)
+    assert [b[0] for b in before] == [a[0] for a in after]
+    # New rows arrive as raw embeddings and are projected on the way in
+    fresh = vectors[0] - vectors[1]
+    store.upsert(["new"], [fresh], ["new"], [{}])
+    assert _top_ids(store, fresh[None, :], k=1) == [["new"]]
+
+
+def test_reprojections_compose_and_survive_reopening(low_rank_store):
+    store, vectors = low_rank_store
+    store.reproject(32)
+    info = store.reproject(16)
+
+    assert info == {"version": 2, "dim": 16, "input_dim": 64}
+    reopened = MmapEmbeddingStore(str(store.path))
+    assert reopened.projection_info() == info
+    assert _top_ids(reopened, vectors[:3], k=1) == [["r0"], ["r1"], ["r2"]]
+
+
+def test_projected_workspace_round_trips_through_a_snapshot(vector_store):
+    chunks = [
+        {
+            "file_path": f"pkg/module_{i}.py",
+            "line_start": 1,
+            "line_end": 2,
+            "name": f"handler_{i}",
+            "language": "python",
+            "content_hash": f"projected:{i}",
+            "embedding_text": f"def handler_{i}(request):\n    return {i}"
+        }
+        for i in range(120)
+    ]
+    asyncio.run(vector_store.ingest_code_chunks("projected_src", chunks))
+    info = asyncio.run(vector_store.rebuild_projection("projected_src", dim=24))
+    assert info["dim"] == 24
+
+    asyncio.run(vector_store.export_workspace("projected_src", "projected.cvsnap"))
+    summary = asyncio.run(vector_store.import_workspace("projected.cvsnap", "projected_dst"))
+
+    assert summary["projection"] and summary["dim"] == 24
+    assert vector_store.get_embedding_store("projected_dst").projection_info()["input_dim"] == 64
+    # Raw embeddings map into the imported space as into the original one
+    raw = [fake_embedding(chunks[i]["embedding_text"]) for i in (0, 57, 119)]
+    source, imported = (vector_store.get_embedding_store(w) for w in ("projected_src", "projected_dst"))
+    assert [[h["id"] for h in hits] for hits in imported.query(raw, top_k=3)] == \
+        [[h["id"] for h in hits] for hits in source.query(raw, top_k=3)]
+    assert [hits[0]["content"] for hits in imported.query(raw, top_k=1)] == \
+        [chunks[i]["embedding_text"] for i in (0, 57, 119)]
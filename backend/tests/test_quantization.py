@@ -0,0 +1,52 @@
+# backend/tests/test_quantization.py
+import numpy as np
+import pytest
+
+from app.services.memory.embedding_store import MmapEmbeddingStore
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Clustered vectors, like embeddings of similar code, and queries near them."""
+    rng = np.random.default_rng(7)
+    centers = rng.standard_normal((40, 64))
+    vectors = centers[rng.integers(0, 40, 3000)] + 0.6 * rng.standard_normal((3000, 64))
+    store = MmapEmbeddingStore(str(tmp_path))
+    ids = [f"r{i}" for i in range(len(vectors))]
+    store.upsert(ids, vectors, ids, [{"i": i} for i in range(len(vectors))])
+    queries = vectors[rng.choice(len(vectors), 50, replace=False)] + 0.3 * rng.standard_normal((50, 64))
+    return store, queries
+
+
+def _top_ids(store, queries, rows=None):
+    return [[hit["id"] for hit in hits] for hits in store.query(queries, top_k=10, rows=rows)]
+
+
+def _recall(found, exact):
+    return np.mean([len(set(f) & set(e)) / len(e) for f, e in zip(found, exact)])
+
+
+@pytest.mark.parametrize("mode, min_recall", [("int8", 0.95), ("binary", 0.8)])
+def test_quantized_search_recalls_the_exact_neighbours(corpus, mode, min_recall):
+    store, queries = corpus
+    exact = _top_ids(store, queries)
+
+    store.update_config(quantization=mode, rescore_factor=10)
+    found = _top_ids(store, queries)
+
+    assert _recall(found, exact) >= min_recall
+    # Candidates are rescored with the float vectors
+    hit = store.query(queries[:1], top_k=1)[0][0]
+    exact_score = store.score(queries[:1], store.rows_for([hit["id"]]))[0][0]
+    assert hit["score"] == pytest.approx(float(exact_score), abs=1e-6)
+
+def test_quantized_codes_follow_later_upserts_and_restricted_rows(corpus):
+    store, queries = corpus
+    store.update_config(quantization="int8")
+    store.query(queries[:1], top_k=1)
+    target = queries[0] / np.linalg.norm(queries[0])
+    store.upsert(["late"], [target], ["late"], [{}])
+
+    assert store.query(queries[:1], top_k=1)[0][0]["id"] == "late"
+    rows = store.rows_for(["r1", "r2", "r3"])
+    assert {h["id"] for h in store.query(queries[:1], top_k=5, rows=rows)[0]} == {"r1", "r2", "r3"}
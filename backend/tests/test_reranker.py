@@ -0,0 +1,76 @@
+# backend/tests/test_reranker.py
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.services.analysis.context_engine import ContextEngine
+from app.services.analysis.reranker import LocalReranker
+
+
+def _context(id_, file_path="app/other/x.py", score=0.5, **meta):
+    return {
+        "id": id_,
+        "content": meta.pop("content", "pass"),
+        "score": score,
+        "bm25_score": meta.pop("bm25_score", 0.0),
+        "metadata": {"file_path": file_path, **meta}
+    }
+
+
+def test_feature_columns_follow_the_declared_order():
+    reranker = LocalReranker()
+    now = time.time()
+    contexts = [
+        _context(
+            "full", "app/api/routes.py", score=0.9, bm25_score=4.0, construct_type="function_definition",
+            indexed_at=now, name="parse_request", content="def parse_request(raw): ..."
+        ),
+        _context("bare", "docs/readme.md", score=1.7, bm25_score=2.0, construct_type="chunk"),
+    ]
+
+    features = reranker.features("parse_request", contexts, {"file_path": "app/api/routes.py"})
+
+    assert features.shape == (2, len(LocalReranker.FEATURES)) == (2, len(LocalReranker.WEIGHTS))
+    column = {name: features[:, i] for i, name in enumerate(LocalReranker.FEATURES)}
+    assert column["vector"].tolist() == pytest.approx([0.9, 1.0])  # clipped to [0, 1]
+    assert column["bm25"].tolist() == pytest.approx([1.0, 0.5])  # scaled by the best
+    assert column["proximity"].tolist() == [1.0, 0.0]
+    assert column["construct"].tolist() == [1.0, 0.5]
+    assert column["recency"][0] == pytest.approx(1.0, abs=1e-3) and column["recency"][1] == 0.0
+    assert column["identifier"].tolist() == [1.0, 0.0]
+
+
+def test_proximity_prefers_same_file_then_directory_then_extension():
+    contexts = [
+        _context("ext", "lib/util.py"),
+        _context("dir", "app/api/models.py"),
+        _context("file", "app/api/routes.py"),
+        _context("far", "web/index.ts"),
+    ]
+    ranked, scores = LocalReranker().rank("anything", contexts, {"file_path": "app/api/routes.py"})
+
+    assert [c["id"] for c in ranked] == ["file", "dir", "ext", "far"]
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_llm_rerank_only_breaks_ambiguous_cutoffs():
+    engine = ContextEngine()
+    engine.settings = engine.settings.model_copy(update={"LLM_RERANK": True, "LLM_RERANK_MARGIN": 0.05})
+    calls = []
+
+    async def llm_rerank(query, contexts, analysis_type):
+        calls.append([c["id"] for c in contexts])
+        return list(reversed(contexts))
+
+    engine._llm_rerank = llm_rerank
+    separated = [_context("a", score=0.9), _context("b", score=0.2), _context("c", score=0.1)]
+    ranked = asyncio.run(engine._rerank_contexts("q", separated, "debug", max_contexts=1))
+    assert [c["id"] for c in ranked] == ["a", "b", "c"] and not calls
+    assert ranked[0]["rerank_score"] > ranked[1]["rerank_score"]
+
+    tied = [_context("a", score=0.50), _context("b", score=0.51), _context("c", score=0.1)]
+    ranked = asyncio.run(engine._rerank_contexts("q", tied, "debug", max_contexts=1))
+    assert calls == [["b", "a", "c"]]
+    assert [c["id"] for c in ranked] == ["c", "a", "b"]
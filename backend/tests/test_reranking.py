@@ -0,0 +1,58 @@
+# backend/tests/test_reranking.py
+import numpy as np
+
+from app.services.memory.reranking import merge_overlapping, mmr_select
+
+
+def _window(id_, start, end, parent_id="", file_path="app/service.py"):
+    body = "\n".join(f"line {n}" for n in range(start, end + 1))
+    return {
+        "id": id_,
+        "content": f"File: {file_path}\nLines {start}-{end}:\n{body}",
+        "metadata": {"file_path": file_path, "line_start": start, "line_end": end, "parent_id": parent_id},
+        "relevance": 1.0
+    }
+
+
+def test_mmr_skips_near_duplicates_of_earlier_picks():
+    embeddings = np.array([[1.0, 0.0], [0.99, 0.14], [0.0, 1.0]])
+    relevance = [1.0, 0.95, 0.6]
+
+    assert mmr_select(embeddings, relevance, 2, lambda_=0.5) == [0, 2]
+    # Pure relevance ranking keeps the duplicate
+    assert mmr_select(embeddings, relevance, 2, lambda_=1.0) == [0, 1]
+
+
+def test_mmr_returns_every_index_once_when_k_exceeds_the_pool():
+    picks = mmr_select(np.eye(3), [0.2, 0.9, 0.5], 10)
+    assert picks[0] == 1 and sorted(picks) == [0, 1, 2]
+    assert mmr_select(np.eye(3), [0.2, 0.9, 0.5], 0) == []
+
+
+def test_overlapping_windows_merge_into_one_span_at_the_best_rank():
+    results = [_window("b", 10, 20), _window("other", 1, 5, file_path="app/other.py"), _window("a", 1, 12)]
+
+    merged = merge_overlapping(results)
+
+    assert [r["id"] for r in merged] == ["b", "other"]
+    span = merged[0]
+    assert (span["metadata"]["line_start"], span["metadata"]["line_end"]) == (1, 20)
+    assert span["merged_ids"] == ["b", "a"]
+    assert span["content"].startswith("File: app/service.py\nLines 1-20:\nline 1\n")
+    assert span["content"].count("line 11") == 1 and span["content"].endswith("line 20")
+
+
+def test_window_bridging_two_spans_folds_them_together():
+    merged = merge_overlapping([_window("a", 1, 5), _window("c", 9, 12), _window("b", 5, 9)])
+
+    assert len(merged) == 1
+    assert sorted(merged[0]["merged_ids"]) == ["a", "b", "c"]
+    assert (merged[0]["metadata"]["line_start"], merged[0]["metadata"]["line_end"]) == (1, 12)
+
+
+def test_nested_chunks_of_different_parents_and_unlocated_results_stay_apart():
+    outline = _window("outline", 1, 40)
+    method = _window("method", 10, 14, parent_id="app/service.py:Service:abc")
+    snippet = {"id": "chat", "content": "earlier answer", "metadata": {}}
+
+    assert merge_overlapping([outline, method, snippet]) == [outline, method, snippet]
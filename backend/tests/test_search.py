@@ -0,0 +1,66 @@
+# backend/tests/test_search.py
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def searchable(vector_store):
+    chunks = [
+        {
+            "file_path": f"pkg/{topic}_{i}.py",
+            "line_start": 1,
+            "line_end": 2,
+            "name": f"{topic}_{i}",
+            "language": "python",
+            "content_hash": f"search:{topic}:{i}",
+            "embedding_text": f"def {topic}_{i}(): pass"
+        }
+        for topic in ("parse", "render")
+        for i in range(10)
+    ]
+    asyncio.run(vector_store.ingest_code_chunks("search_many", chunks))
+    calls = []
+    create_embeddings = vector_store.sambanova.create_embeddings
+
+    async def counting(texts):
+        calls.append(list(texts))
+        return await create_embeddings(texts)
+
+    vector_store.sambanova.create_embeddings = counting
+    return vector_store, calls
+
+
+def test_search_many_embeds_all_queries_in_one_request(searchable):
+    vector_store, calls = searchable
+    queries = ["search_many parse a config", "search_many render a page", "search_many tokenize input"]
+
+    batches = asyncio.run(vector_store.search_many("search_many", queries, top_k=4))
+
+    assert len(calls) == 1 and len(calls[0]) == 3
+    assert [len(results) for results in batches] == [4, 4, 4]
+    single = asyncio.run(vector_store.search("search_many", queries[0], top_k=4))
+    assert [r["id"] for r in batches[0]] == [r["id"] for r in single]
+    assert [r["score"] for r in batches[0]] == pytest.approx([r["score"] for r in single], abs=1e-5)
+
+
+def test_search_many_dedupe_keeps_each_chunk_for_its_best_query(searchable):
+    vector_store, _ = searchable
+    queries = ["search_many dedupe first", "search_many dedupe second"]
+    plain = asyncio.run(vector_store.search_many("search_many", queries, top_k=20))
+    # Both queries rank every chunk with top_k covering the workspace
+    assert {r["id"] for r in plain[0]} == {r["id"] for r in plain[1]}
+
+    deduped = asyncio.run(vector_store.search_many("search_many", queries, top_k=20, dedupe=True))
+
+    first, second = ({r["id"] for r in results} for results in deduped)
+    assert not first & second and first | second == {r["id"] for r in plain[0]}
+    scores = [{r["id"]: r["score"] for r in results} for results in plain]
+    assert all(scores[0][i] >= scores[1][i] for i in first)
+    assert all(scores[1][i] >= scores[0][i] for i in second)
+
+
+def test_search_many_without_queries_makes_no_request(searchable):
+    vector_store, calls = searchable
+    assert asyncio.run(vector_store.search_many("search_many", [])) == []
+    assert calls == []
@@ -0,0 +1,62 @@
+# backend/tests/test_snapshot.py
+import asyncio
+
+import numpy as np
+
+from app.services.ingestion.manifest import IngestionManifest
+from app.services.ingestion.pipeline import IngestionPipeline
+from app.services.memory.snapshot import SnapshotWriter
+
+
+def _ingest(vector_store, ingester, workspace_id: str, repo_path: str):
+    manifest = IngestionManifest(str(vector_store.manifest_path(workspace_id)))
+    pipeline = IngestionPipeline(vector_store, ingester, workspace_id, manifest)
+    try:
+        return asyncio.run(pipeline.run(repo_path))
+    finally:
+        manifest.save()
+
+
+def _repo(path, *names):
+    path.mkdir()
+    for name in names:
+        (path / f"{name}.py").write_text(f"def {name}(value):\n    return value + 1\n")
+    return str(path)
+
+
+def test_import_over_a_workspace_replaces_its_open_handles(vector_store, ingester, tmp_path):
+    _ingest(vector_store, ingester, "snap_src", _repo(tmp_path / "src", "alpha_source", "beta_source"))
+    _ingest(vector_store, ingester, "snap_dst", _repo(tmp_path / "dst", "gamma_target"))
+    old_lexical = vector_store.get_lexical_index("snap_dst")
+    old_store = vector_store.get_embedding_store("snap_dst")
+    assert old_store.read_rows(old_store.live_rows())
+
+    asyncio.run(vector_store.export_workspace("snap_src", "src.cvsnap"))
+    summary = asyncio.run(vector_store.import_workspace("src.cvsnap", "snap_dst", overwrite=True))
+
+    assert summary["imported_count"] == 2
+    assert old_store._rows_fh is None
+    assert vector_store.get_lexical_index("snap_dst") is not old_lexical
+    hits = asyncio.run(vector_store.lexical_search("snap_dst", "alpha_source", exact=True))
+    assert [h["metadata"]["name"] for h in hits] == ["alpha_source"]
+    assert not asyncio.run(vector_store.lexical_search("snap_dst", "gamma_target", exact=True))
+    results = asyncio.run(vector_store.search("snap_dst", "def beta_source(value)", top_k=2))
+    assert {r["metadata"]["name"] for r in results} == {"alpha_source", "beta_source"}
+
+
+def test_vectors_exported_from_chroma_are_normalised_on_import(vector_store):
+    path = vector_store.snapshot_path("chroma.cvsnap")
+    with SnapshotWriter(str(path), "from_chroma") as writer:
+        writer.write_rows(
+            ["a", "b"],
+            np.stack([np.full(64, 3.0), np.arange(64, dtype=np.float64)]),
+            ["a", "b"],
+            [{"file_path": "a.py"}, {"file_path": "b.py"}]
+        )
+        writer.finish(backend="chroma")
+
+    asyncio.run(vector_store.import_workspace("chroma.cvsnap"))
+
+    store = vector_store.get_embedding_store("from_chroma")
+    norms = np.linalg.norm(store.vectors(store.live_rows()), axis=1)
+    assert np.allclose(norms, 1.0, atol=1e-2)
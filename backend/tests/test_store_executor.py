@@ -0,0 +1,105 @@
+# backend/tests/test_store_executor.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.memory.store_executor import StoreExecutor
+
+
+async def _ticks(gaps: list, done: asyncio.Event):
+    """Record how late each 10 ms sleep of the event loop wakes up until ``done``."""
+    last = time.perf_counter()
+    while not done.is_set():
+        await asyncio.sleep(0.01)
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+
+
+@pytest.fixture
+def executor():
+    executor = StoreExecutor(max_workers=1, default_timeout=5.0)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+@pytest.mark.anyio
+async def test_event_loop_stays_responsive_during_a_slow_store_call(executor):
+    gaps = []
+    done = asyncio.Event()
+    ticks = asyncio.create_task(_ticks(gaps, done))
+    result = await executor.run("slow", lambda: time.sleep(0.5) or "stored")
+    done.set()
+    await ticks
+
+    assert result == "stored"
+    assert len(gaps) > 10
+    assert max(gaps) < 0.2
+
+
+@pytest.mark.anyio
+async def test_queue_wait_does_not_count_against_the_timeout(executor):
+    release = threading.Event()
+    blocker = asyncio.create_task(executor.run("block", release.wait))
+    queued = asyncio.create_task(executor.run("quick", lambda: "done", timeout=0.1))
+    await asyncio.sleep(0.3)
+    release.set()
+
+    assert await queued == "done"
+    assert await blocker is True
+    assert executor.metrics()["operations"]["quick"]["timeouts"] == 0
+
+
+@pytest.mark.anyio
+async def test_cancelled_queued_call_leaves_the_queue(executor):
+    release = threading.Event()
+    ran = []
+    blocker = asyncio.create_task(executor.run("block", release.wait))
+    queued = asyncio.create_task(executor.run("never", lambda: ran.append(1)))
+    await asyncio.sleep(0.05)
+    assert executor.metrics()["queue_depth"] == 1
+
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    release.set()
+    await blocker
+
+    assert executor.metrics()["queue_depth"] == 0
+    assert ran == []
+
+
+@pytest.mark.anyio
+async def test_event_loop_stays_responsive_during_a_large_upsert(vector_store):
+    chunks = [
+        {
+            "file_path": f"pkg/module_{i // 100}.py",
+            "line_start": i % 100 * 3 + 1,
+            "line_end": i % 100 * 3 + 3,
+            "name": f"handler_{i}",
+            "language": "python",
+            "content_hash": f"{i:032x}",
+            "embedding_text": f"def handler_{i}(request):\n    return dispatch(request, {i})"
+        }
+        for i in range(20000)
+    ]
+    batch = await vector_store.embed_code_chunks("large_upsert", chunks)
+
+    gaps = []
+    done = asyncio.Event()
+    ticks = asyncio.create_task(_ticks(gaps, done))
+    started = time.perf_counter()
+    stored = await vector_store.store_code_chunks("large_upsert", batch)
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticks
+
+    assert stored["embedded_count"] == 20000
+    assert vector_store.get_embedding_store("large_upsert").count() == 20000
+    # A store call blocking the loop would stall it for the whole batch; what
+    # is left are the pauses every thread sees (gen-2 collections of the batch)
+    assert elapsed > 0.5
+    assert max(gaps) < min(0.3, elapsed / 2)
+    assert sorted(gaps)[int(len(gaps) * 0.9)] < 0.05
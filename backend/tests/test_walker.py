@@ -0,0 +1,91 @@
+# backend/tests/test_walker.py
+from app.services.ingestion.walker import IgnoreMatcher, RepositoryWalker
+
+
+def _tree(root, files):
+    for rel_path, content in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content if isinstance(content, bytes) else content.encode())
+
+
+def _walk(root, **kwargs):
+    walker = RepositoryWalker(str(root), **kwargs)
+    return walker, [rel_path for _, rel_path, _ in walker.walk()]
+
+
+def test_negation_reincludes_a_file_and_the_last_matching_pattern_wins():
+    matcher = IgnoreMatcher(["*.py", "!keep.py", "# comment", "", "keep.py.bak", "!*.bak", "drop.bak"])
+
+    assert matcher.match("module.py", False) is True
+    assert matcher.match("src/keep.py", False) is False
+    assert matcher.match("notes.txt", False) is None
+    assert matcher.match("old.bak", False) is False
+    assert matcher.match("drop.bak", False) is True
+
+
+def test_slash_anchors_a_pattern_to_its_directory():
+    matcher = IgnoreMatcher(["/build", "docs/*.md", "cache/", "**/gen/*.py"])
+
+    assert matcher.match("build", True) is True
+    assert matcher.match("src/build", True) is None
+    assert matcher.match("docs/index.md", False) is True
+    assert matcher.match("src/docs/index.md", False) is None
+    assert matcher.match("cache", False) is None  # directories only
+    assert matcher.match("src/cache", True) is True
+    assert matcher.match("gen/api.py", False) is True
+    assert matcher.match("a/b/gen/api.py", False) is True
+
+
+def test_walk_prunes_ignored_directories_and_scopes_nested_gitignores(tmp_path):
+    _tree(tmp_path, {
+        ".gitignore": "/build\n*.log\n",
+        "build/out.py": "x = 1\n",
+        "src/build/keep.py": "x = 1\n",
+        "src/app.py": "x = 1\n",
+        "src/debug.log": "trace\n",
+        "src/.gitignore": "*.py\n!app.py\n",
+        "src/extra.py": "x = 1\n",
+        "lib/extra.py": "x = 1\n"
+    })
+
+    walker, paths = _walk(tmp_path)
+
+    assert paths == [".gitignore", "lib/extra.py", "src/.gitignore", "src/app.py"]
+    assert walker.stats["dirs_pruned"] == 1  # build/, without descending into it
+    assert walker.stats["skipped_ignored"] == 3  # src/build/keep.py, src/debug.log, src/extra.py
+
+
+def test_walk_skips_binary_oversized_and_unlisted_extensions(tmp_path):
+    _tree(tmp_path, {
+        "app.py": "def main():\n    pass\n",
+        "blob.py": b"\x00\x01binary",
+        "huge.py": "#" * 2048,
+        "readme.txt": "hello\n"
+    })
+
+    walker, paths = _walk(tmp_path, extensions={".py"}, max_file_size=1024)
+
+    assert paths == ["app.py"]
+    assert walker.stats["skipped_binary"] == 1
+    assert walker.stats["skipped_too_large"] == 1
+    assert walker.stats["skipped_extension"] == 1
+    assert walker.skipped() == 3
+
+
+def test_skip_sniff_spares_the_binary_check_of_known_files(tmp_path):
+    _tree(tmp_path, {"blob.py": b"\x00binary"})
+    walker = RepositoryWalker(str(tmp_path))
+
+    paths = [rel_path for _, rel_path, _ in walker.walk(skip_sniff=lambda rel_path, stat: True)]
+
+    assert paths == ["blob.py"]
+
+
+def test_excluded_checks_listed_paths_against_the_walker_patterns(tmp_path):
+    walker = RepositoryWalker(str(tmp_path), patterns=["vendor/", "*.min.js"], extensions={".py", ".js"})
+
+    assert walker.excluded("vendor/lib/util.py") == "skipped_ignored"
+    assert walker.excluded("static/app.min.js") == "skipped_ignored"
+    assert walker.excluded("notes.md") == "skipped_extension"
+    assert walker.excluded("src/app.py") is None
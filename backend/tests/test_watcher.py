@@ -0,0 +1,127 @@
+# backend/tests/test_watcher.py
+import asyncio
+import time
+
+import pytest
+
+from app.config import get_settings
+from app.services.ingestion.walker import RepositoryWalker
+from app.services.ingestion.watcher import PathChangeSet, WatchManager, WorkspaceWatcher
+
+
+class _Reindexer:
+    """Records each reindexed batch with when it started; fails the first ``failures`` calls."""
+
+    def __init__(self, failures: int = 0):
+        self.batches = []
+        self.failures = failures
+
+    async def __call__(self, workspace_id, repo_path, paths):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("embedding service unavailable")
+        self.batches.append((time.monotonic(), set(paths)))
+        return {}
+
+
+def _walker(repo_path: str) -> RepositoryWalker:
+    return RepositoryWalker(repo_path, extensions={".py"})
+
+
+def _watcher(tmp_path, reindex, **update) -> WorkspaceWatcher:
+    watcher = WorkspaceWatcher("watched", str(tmp_path), _walker, reindex)
+    watcher.settings = watcher.settings.model_copy(update={"WATCH_DEBOUNCE": 0.1, "WATCH_MAX_DELAY": 0.4, **update})
+    # Changes are fed through _record; only the debounce loop runs
+    watcher._tasks = [asyncio.create_task(watcher._drain())]
+    return watcher
+
+
+@pytest.mark.anyio
+async def test_changes_within_the_debounce_window_are_one_batch(tmp_path):
+    reindex = _Reindexer()
+    watcher = _watcher(tmp_path, reindex)
+
+    watcher._record({"a.py"})
+    await asyncio.sleep(0.05)
+    watcher._record({"b.py", "a.py"})
+    await asyncio.sleep(0.3)
+
+    assert [paths for _, paths in reindex.batches] == [{"a.py", "b.py"}]
+    metrics = watcher.metrics()
+    assert metrics["batches"] == 1 and metrics["files_reindexed"] == 2
+    assert metrics["pending_files"] == 0 and metrics["staleness_seconds"] == 0.0
+    assert metrics["freshness_lag_seconds"]["last"] >= 0.1
+    await watcher.stop()
+
+
+@pytest.mark.anyio
+async def test_continuous_changes_are_flushed_after_the_max_delay(tmp_path):
+    reindex = _Reindexer()
+    watcher = _watcher(tmp_path, reindex)
+
+    started = time.monotonic()
+    for i in range(16):  # a change every 50 ms never leaves the 100 ms debounce quiet
+        watcher._record({f"file_{i}.py"})
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.3)
+
+    assert len(reindex.batches) >= 2
+    first_at, first_paths = reindex.batches[0]
+    assert first_at - started < 0.4 + 0.1
+    assert "file_0.py" in first_paths and "file_15.py" not in first_paths
+    assert set().union(*(paths for _, paths in reindex.batches)) == {f"file_{i}.py" for i in range(16)}
+    await watcher.stop()
+
+
+@pytest.mark.anyio
+async def test_failed_reindex_is_retried_with_the_same_paths(tmp_path):
+    reindex = _Reindexer(failures=1)
+    watcher = _watcher(tmp_path, reindex, WATCH_MAX_DELAY=0.1)
+
+    watcher._record({"a.py"})
+    await asyncio.sleep(0.1)
+    watcher._record({"b.py"})
+    await asyncio.sleep(0.5)
+
+    assert watcher.errors == 1
+    assert set().union(*(paths for _, paths in reindex.batches)) == {"a.py", "b.py"}
+    assert watcher.metrics()["pending_files"] == 0
+    await watcher.stop()
+
+
+def test_path_change_set_plans_reads_and_removals(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("x = 1\n")
+    (tmp_path / "notes.txt").write_text("hello\n")
+    manifest_files = {
+        "src/app.py": {}, "notes.txt": {}, "old/a.py": {}, "old/b.py": {}, "older.py": {}
+    }
+
+    changes = PathChangeSet(str(tmp_path), ["src/app.py", "notes.txt", "old", "missing.py"]).plan(
+        manifest_files, lambda rel_path: rel_path.endswith(".py")
+    )
+
+    assert changes.files == [("src/app.py", None)]
+    assert changes.removed == ["notes.txt", "old/a.py", "old/b.py"]
+    assert changes.commit is None
+
+
+@pytest.mark.anyio
+async def test_polling_watcher_reindexes_written_files(tmp_path, monkeypatch):
+    (tmp_path / "app.py").write_text("x = 1\n")
+    reindex = _Reindexer()
+    manager = WatchManager(reindex, _walker)
+    settings = get_settings().model_copy(update={
+        "WATCH_FORCE_POLLING": True, "WATCH_POLL_INTERVAL": 0.05, "WATCH_DEBOUNCE": 0.05, "WATCH_MAX_DELAY": 0.2
+    })
+    monkeypatch.setattr("app.services.ingestion.watcher.get_settings", lambda: settings)
+
+    metrics = await manager.start("polled", str(tmp_path))
+    assert metrics["backend"] == "polling"
+    await asyncio.sleep(0.15)
+    (tmp_path / "app.py").write_text("x = 2\n")
+    (tmp_path / "readme.md").write_text("ignored\n")
+    await asyncio.sleep(0.4)
+
+    assert [paths for _, paths in reindex.batches] == [{"app.py"}]
+    assert await manager.stop("polled") and not await manager.stop("polled")
@@ -0,0 +1,45 @@
+# backend/tests/test_workspace_paths.py
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import workspaces
+
+
+@pytest.fixture
+def client(vector_store):
+    app = FastAPI()
+    app.include_router(workspaces.router)
+    workspaces.services["vector_store"] = vector_store
+    yield TestClient(app)
+    workspaces.services.clear()
+
+
+@pytest.mark.parametrize("workspace_id", ["..", "a.b", "a%2Fb", "%2E%2E"])
+def test_routes_reject_workspace_ids_that_name_other_paths(client, workspace_id):
+    response = client.post(f"/workspaces/{workspace_id}/import", json={"path": "x.cvsnap", "overwrite": True})
+    assert response.status_code in (404, 422)
+    response = client.post(f"/workspaces/{workspace_id}/export", json={})
+    assert response.status_code in (404, 422)
+
+
+@pytest.mark.parametrize("path", ["/etc/passwd", "../manifests/x.json", "nested/../../x.cvsnap"])
+def test_snapshot_paths_outside_the_snapshot_directory_are_rejected(client, path):
+    assert client.post("/workspaces/demo/export", json={"path": path}).status_code == 400
+    assert client.post("/workspaces/demo/import", json={"path": path}).status_code == 400
+
+
+def test_snapshots_round_trip_within_the_snapshot_directory(vector_store):
+    asyncio.run(vector_store.export_workspace("round_trip", path="nested/round_trip.cvsnap"))
+    assert vector_store.snapshot_path("nested/round_trip.cvsnap").exists()
+    result = asyncio.run(vector_store.import_workspace("nested/round_trip.cvsnap", workspace_id="round_trip_copy"))
+    assert result["workspace_id"] == "round_trip_copy"
+
+
+def test_store_refuses_workspace_ids_that_name_other_paths(vector_store):
+    with pytest.raises(ValueError):
+        vector_store.manifest_path("../outside")
+    with pytest.raises(ValueError):
+        vector_store._drop_workspace("..")